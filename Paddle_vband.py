@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import ttk
-import pygame
 import threading
 import time
-import numpy as np
+from audio_backends import StreamBackend, PygameBackend
+from tone_generator import DEFAULT_AMPLITUDE
+from gap_timer import GapTimer
 
 class PaddleKeySimulator:
     def __init__(self, root):
@@ -12,7 +13,15 @@ class PaddleKeySimulator:
         self.root.geometry("850x750")
         self.root.configure(bg='#2c3e50')
         
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+        # Streaming sidetone: the pitch slider retunes it in place, no rebuilds.
+        # Where no callback device opens, fall back to the pygame mixer
+        self.audio = StreamBackend()
+        try:
+            self.audio.open(None)
+        except Exception as e:
+            print(f"✗ Audio stream unavailable ({e}); using pygame mixer")
+            self.audio = PygameBackend()
+            self.audio.open(None)
         
         self.dit_pressed = False
         self.dah_pressed = False
@@ -45,8 +54,7 @@ class PaddleKeySimulator:
         self.setup_audio()
         self.bind_keys()
         
-        self.last_release_time = time.time()
-        self.check_morse_timer()
+        self.gap_timer = GapTimer(self.root, self.decode_current_sequence, self.end_word)
 
     def update_timing_from_wpm(self):
         self.dot_duration = 60.0 / (self.wpm * 50)
@@ -161,17 +169,9 @@ class PaddleKeySimulator:
         self.paddle_visual.create_oval(222, 85, 228, 95, fill='#5d6d7e', outline='#34495e', width=1)
 
     def setup_audio(self):
-        # This function remains the same
-        sample_rate = 22050
-        duration = 0.1
-        frames = int(duration * sample_rate)
-        arr = np.zeros((frames, 2))
-        for i in range(frames):
-            wave = np.sin(2 * np.pi * self.tone_frequency * i / sample_rate)
-            arr[i][0] = wave * 0.3
-            arr[i][1] = wave * 0.3
-        arr = (arr * 32767).astype(np.int16)
-        self.tone_sound = pygame.sndarray.make_sound(arr)
+        # Frequency slider ticks land here; the stream picks up the new pitch on its
+        # next block, the mixer reuses Sounds built for earlier pitches
+        self.audio.configure(self.tone_frequency, DEFAULT_AMPLITUDE, 0.005)
 
     def bind_keys(self):
         # This function remains the same
@@ -184,6 +184,7 @@ class PaddleKeySimulator:
     def dit_down(self, event):
         if not self.dit_pressed:
             self.dit_pressed = True
+            self.gap_timer.cancel()
             self.dit_status.config(fg='#2ecc71')
             self.draw_paddle(True, self.dah_pressed)
             self.handle_paddle_logic()
@@ -197,6 +198,7 @@ class PaddleKeySimulator:
     def dah_down(self, event):
         if not self.dah_pressed:
             self.dah_pressed = True
+            self.gap_timer.cancel()
             self.dah_status.config(fg='#2ecc71')
             self.draw_paddle(self.dit_pressed, True)
             self.handle_paddle_logic()
@@ -233,7 +235,7 @@ class PaddleKeySimulator:
         self.current_letter = ''.join(self.morse_sequence)
         self.morse_display.config(text=self.current_letter)
         
-        self.tone_sound.play(-1)
+        self.audio.tone_on()
         
         if element == '.':
             duration = self.dot_duration
@@ -243,7 +245,7 @@ class PaddleKeySimulator:
         self.root.after(int(duration * 1000), self.stop_element)
 
     def stop_element(self):
-        self.tone_sound.stop()
+        self.audio.tone_off()
         self.current_element_display.config(text="")
         
         self.root.after(int(self.element_gap * 1000), self.check_continue)
@@ -277,20 +279,13 @@ class PaddleKeySimulator:
                 self.iambic_memory = None
                 self.send_element(element_to_send)
             else:
-                # No keys pressed and no memory, reset timing for letter/word spacing
-                self.last_release_time = time.time()
+                # No keys pressed and no memory, time the letter/word spacing from here
+                self.gap_timer.arm(self.letter_gap, self.word_gap)
 
-    def check_morse_timer(self):
-        # This function remains the same
-        if self.morse_sequence and not self.paddle_transmitting:
-            time_since_release = time.time() - self.last_release_time
-            if time_since_release > self.letter_gap:
-                self.decode_current_sequence()
-                if time_since_release > self.word_gap:
-                    if not self.decoded_text.endswith(" "):
-                         self.decoded_text += " "
-                         self.update_text_display()
-        self.root.after(50, self.check_morse_timer)
+    def end_word(self):
+        if not self.decoded_text.endswith(" "):
+            self.decoded_text += " "
+            self.update_text_display()
 
     def decode_current_sequence(self):
         # This function remains the same
@@ -320,15 +315,15 @@ class PaddleKeySimulator:
         self.update_text_display()
 
     def clear_morse(self):
-        # This function remains the same
+        self.gap_timer.cancel()
         self.morse_sequence = []
         self.morse_display.config(text="")
 
     def test_audio(self):
         # This function remains the same
         try:
-            self.tone_sound.play()
-            self.root.after(200, lambda: self.tone_sound.stop())
+            self.audio.tone_on()
+            self.root.after(200, self.audio.tone_off)
         except Exception as e:
             print(f"Audio test failed: {e}")
 
@@ -340,7 +335,7 @@ def main():
     try:
         root.mainloop()
     except KeyboardInterrupt:
-        pygame.mixer.quit()
+        app.audio.close()
 
 if __name__ == "__main__":
     main()
@@ -3,7 +3,9 @@ from tkinter import ttk
 import pygame
 import threading
 import time
-import numpy as np
+from audio_backends import open_mixer
+from tone_generator import make_tone
+from gap_timer import GapTimer
 
 class MorseCodeSimulator:
     def __init__(self, root):
@@ -13,7 +15,7 @@ class MorseCodeSimulator:
         self.root.configure(bg='#2c3e50')
         
         # Initialize pygame for audio
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+        self.sample_rate, self.mixer_channels = open_mixer()
         
         # Morse code variables
         self.is_transmitting = False
@@ -43,9 +45,8 @@ class MorseCodeSimulator:
         self.setup_audio()
         self.bind_keys()
         
-        # Start the morse decode timer
-        self.last_release_time = time.time()
-        self.check_morse_timer()
+        # Letter and word gap deadlines, armed on each key release
+        self.gap_timer = GapTimer(self.root, self.decode_current_sequence, self.end_word)
     
     def update_timing_from_wpm(self):
         """Calculate timing values based on WPM setting"""
@@ -191,21 +192,9 @@ class MorseCodeSimulator:
         self.key_visual.create_oval(195, 35, 215, 55, fill='#34495e', outline='#2c3e50', width=2)
     
     def setup_audio(self):
-        # Generate tone for morse code
-        sample_rate = 22050
-        duration = 0.1  # seconds
-        frames = int(duration * sample_rate)
-        
-        # Generate sine wave
-        arr = np.zeros((frames, 2))
-        for i in range(frames):
-            wave = np.sin(2 * np.pi * self.tone_frequency * i / sample_rate)
-            arr[i][0] = wave * 0.3  # Left channel
-            arr[i][1] = wave * 0.3  # Right channel
-        
-        # Convert to pygame sound
-        arr = (arr * 32767).astype(np.int16)
-        self.tone_sound = pygame.sndarray.make_sound(arr)
+        # Tone at the mixer's own rate and channel count, so SDL plays it as is
+        self.tone_sound = pygame.sndarray.make_sound(
+            make_tone(self.tone_frequency, self.sample_rate, channels=self.mixer_channels))
     
     def bind_keys(self):
         self.root.bind('<KeyPress-a>', self.key_down)
@@ -218,6 +207,7 @@ class MorseCodeSimulator:
         if not self.is_transmitting:
             self.is_transmitting = True
             self.key_down_time = time.time()
+            self.gap_timer.cancel()
             
             # Update UI
             self.key_status.config(text="KEY DOWN", fg='#2ecc71')
@@ -248,25 +238,13 @@ class MorseCodeSimulator:
             self.current_letter = ''.join(self.morse_sequence)
             self.morse_display.config(text=self.current_letter)
             
-            # Reset the timer for letter/word spacing
-            self.last_release_time = time.time()
+            # Time the letter/word spacing from the release
+            self.gap_timer.arm(self.letter_gap, self.word_gap)
     
-    def check_morse_timer(self):
-        """Check if enough time has passed to decode current morse sequence"""
-        if self.morse_sequence and not self.is_transmitting:
-            time_since_release = time.time() - self.last_release_time
-            
-            # If pause is long enough, decode the current sequence (letter gap)
-            if time_since_release > self.letter_gap:
-                self.decode_current_sequence()
-                
-                # If pause is very long, add a space (word gap)
-                if time_since_release > self.word_gap:
-                    self.decoded_text += " "
-                    self.update_text_display()
-        
-        # Schedule next check
-        self.root.after(50, self.check_morse_timer)  # Check more frequently
+    def end_word(self):
+        """Word gap deadline: add a space"""
+        self.decoded_text += " "
+        self.update_text_display()
     
     def decode_current_sequence(self):
         """Decode the current morse sequence to a letter"""
@@ -294,6 +272,7 @@ class MorseCodeSimulator:
     
     def clear_morse(self):
         """Clear current morse sequence"""
+        self.gap_timer.cancel()
         self.morse_sequence = []
         self.morse_display.config(text="")
 
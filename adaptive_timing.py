@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Adaptive Timing Module - Follows the sender's speed instead of the WPM slider
+Keeps running estimates of the two mark lengths (dot, dash) and the three
+space lengths (element, letter and word gap). Each new mark or space is
+classified against the current boundaries and then nudges its own cluster,
+so the thresholds track a hand sender who speeds up, slows down or weights
+their dashes unusually, at O(1) cost per element.
+
+Run this file directly to replay timing logs and compare the adaptive
+decoder with the fixed thresholds the slider would give.
+"""
+
+import argparse
+import math
+import random
+import sys
+
+from morse_decoder import MorseDecoder, edit_distance, wpm_thresholds
+
+# Weight of each new element in its cluster's moving average
+DEFAULT_ALPHA = 0.25
+
+# Nominal cluster centres in dot units: dot, dash / element, letter, word gap
+MARK_UNITS = (1.0, 3.0)
+GAP_UNITS = (1.0, 3.0, 7.0)
+
+# Dash/dot ratios a fist can plausibly have; keeps the clusters apart
+MIN_DASH_RATIO = 2.0
+MAX_DASH_RATIO = 5.0
+
+# Allowed range of each gap cluster, in dot units estimated from the marks
+GAP_LIMITS = ((0.5, 2.0), (2.0, 4.5), (5.0, 12.0))
+
+# Spaces longer than this many word gaps are pauses, not timing evidence
+PAUSE_FACTOR = 2.0
+
+
+def dot_from_wpm(wpm):
+    """Dot length in seconds for a speed, as morse_decoder.wpm_thresholds gives it"""
+    return wpm_thresholds(wpm)[0]
+
+
+class AdaptiveTiming:
+    """Online two-cluster mark and three-cluster space estimator"""
+
+    def __init__(self, wpm=20, alpha=DEFAULT_ALPHA):
+        """
+        Args:
+            wpm (int): Starting speed, used to seed the clusters
+            alpha (float): Weight of each new element (0 to 1)
+        """
+        self.alpha = alpha
+        self.reset(wpm)
+
+    def reset(self, wpm):
+        """
+        Start again from nominal timing at a speed
+
+        Args:
+            wpm (int): Speed to seed the clusters with
+        """
+        dot = dot_from_wpm(wpm)
+        self.marks = [dot * units for units in MARK_UNITS]
+        self.gaps = [dot * units for units in GAP_UNITS]
+        self.elements = 0
+        self.update_thresholds()
+
+    def update_thresholds(self):
+        """Recompute the decision boundaries from the cluster centres"""
+        # Boundaries sit at the geometric mean of neighbouring centres:
+        # timing errors scale with the element length
+        self.dash_threshold = math.sqrt(self.marks[0] * self.marks[1])
+        self.letter_gap = math.sqrt(self.gaps[0] * self.gaps[1])
+        self.word_gap = math.sqrt(self.gaps[1] * self.gaps[2])
+
+    @property
+    def dot_duration(self):
+        """Estimated dot length in seconds"""
+        return (self.marks[0] + self.marks[1] / MARK_UNITS[1] + self.gaps[0]) / 3
+
+    @property
+    def wpm(self):
+        """Estimated sending speed, PARIS timing"""
+        return 60.0 / (self.dot_duration * 50)
+
+    def add_mark(self, duration):
+        """
+        Classify a key-down and fold it into the mark clusters
+
+        Args:
+            duration (float): Mark length in seconds
+
+        Returns:
+            str: '.' or '-'
+        """
+        index = 0 if duration < self.dash_threshold else 1
+        self.marks[index] += self.alpha * (duration - self.marks[index])
+        # Keep the pair a plausible dot/dash apart by moving the other one
+        dot, dash = self.marks
+        if dash < dot * MIN_DASH_RATIO:
+            if index == 0:
+                self.marks[1] = dot * MIN_DASH_RATIO
+            else:
+                self.marks[0] = dash / MIN_DASH_RATIO
+        elif dash > dot * MAX_DASH_RATIO:
+            if index == 0:
+                self.marks[1] = dot * MAX_DASH_RATIO
+            else:
+                self.marks[0] = dash / MAX_DASH_RATIO
+        self.clamp_gaps()
+        self.elements += 1
+        self.update_thresholds()
+        return '.' if index == 0 else '-'
+
+    def add_gap(self, duration):
+        """
+        Classify a key-up and fold it into the space clusters
+
+        Args:
+            duration (float): Space length in seconds
+
+        Returns:
+            int: 0 for an element gap, 1 for a letter gap, 2 for a word gap
+        """
+        if duration < self.letter_gap:
+            index = 0
+        elif duration < self.word_gap:
+            index = 1
+        else:
+            index = 2
+        if duration < self.gaps[2] * PAUSE_FACTOR:
+            self.gaps[index] += self.alpha * (duration - self.gaps[index])
+            self.clamp_gaps()
+            self.update_thresholds()
+        return index
+
+    def clamp_gaps(self):
+        """Hold each space cluster within reach of the speed the marks show"""
+        # Word gaps are rare, so without this a speed change would leave
+        # them far behind
+        unit = (self.marks[0] + self.marks[1] / MARK_UNITS[1]) / 2
+        for index, (low, high) in enumerate(GAP_LIMITS):
+            self.gaps[index] = min(max(self.gaps[index], unit * low), unit * high)
+
+    def get_timing_info(self):
+        """Current estimate as display text"""
+        return (f"~{self.wpm:.0f} WPM | Dot: <{self.dash_threshold:.2f}s | "
+                f"Letter gap: {self.letter_gap:.2f}s | Word gap: {self.word_gap:.2f}s")
+
+
+class FixedTiming:
+    """The slider's thresholds, behind the same interface as AdaptiveTiming"""
+
+    def __init__(self, wpm=20):
+        self.wpm = wpm
+        # Exactly the thresholds the simulator decodes with at this speed
+        _, self.dash_threshold, self.letter_gap, self.word_gap = wpm_thresholds(wpm)
+
+    def add_mark(self, duration):
+        return '.' if duration < self.dash_threshold else '-'
+
+    def add_gap(self, duration):
+        if duration < self.letter_gap:
+            return 0
+        return 1 if duration < self.word_gap else 2
+
+
+def load_log(path):
+    """
+    Read a timing log
+
+    One duration in milliseconds per line: positive for key down, negative
+    for key up. Lines starting with '#' are comments, except '# text: ...'
+    which gives the text that was sent.
+
+    Returns:
+        tuple: (list of signed durations in seconds, reference text or None)
+    """
+    durations = []
+    text = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('#'):
+                if line[1:].strip().lower().startswith('text:'):
+                    text = line.split(':', 1)[1].strip()
+                continue
+            durations.append(float(line) / 1000.0)
+    return durations, text
+
+
+def save_log(path, durations, text=None):
+    """Write signed durations in seconds as a timing log"""
+    with open(path, 'w', encoding='utf-8') as f:
+        if text:
+            f.write(f"# text: {text}\n")
+        for duration in durations:
+            f.write(f"{duration * 1000:.1f}\n")
+
+
+def synthesize_log(text, start_wpm=15, end_wpm=30, jitter=0.15, dash_ratio=3.3, seed=1):
+    """
+    Hand-sent timing for a text: speed drifts across the message, every
+    element is stretched or shortened at random and dashes are weighted
+
+    Returns:
+        list: Signed durations in seconds
+    """
+    rng = random.Random(seed)
+    decoder = MorseDecoder()
+    words = [[decoder.letter_dict[c] for c in word if c in decoder.letter_dict]
+             for word in text.upper().split()]
+    total = max(sum(len(code) for word in words for code in word), 1)
+    durations = []
+    sent = 0
+
+    def length(units):
+        wpm = start_wpm + (end_wpm - start_wpm) * sent / total
+        return units * dot_from_wpm(wpm) * max(rng.gauss(1.0, jitter), 0.3)
+
+    for w, word in enumerate(words):
+        for c, code in enumerate(word):
+            for e, element in enumerate(code):
+                durations.append(length(1.0 if element == '.' else dash_ratio))
+                sent += 1
+                if e < len(code) - 1:
+                    durations.append(-length(1.0))
+            if c < len(word) - 1:
+                durations.append(-length(3.0))
+        if w < len(words) - 1:
+            durations.append(-length(7.0))
+    return durations
+
+
+def replay(durations, timing, decoder=None):
+    """
+    Decode a timing log the way the simulator does
+
+    Args:
+        durations (list): Signed durations in seconds
+        timing: AdaptiveTiming or FixedTiming
+
+    Returns:
+        str: Decoded text, '*' for unknown letters
+    """
+    decoder = decoder or MorseDecoder()
+    decoder.clear_sequence()
+    out = []
+
+    def flush():
+        letter = decoder.decode_current_sequence()
+        if letter:
+            out.append('*' if letter.startswith('[') else letter)
+
+    for duration in durations:
+        if duration > 0:
+            decoder.add_element(timing.add_mark(duration))
+            continue
+        kind = timing.add_gap(-duration)
+        if kind >= 1:
+            flush()
+        if kind == 2:
+            out.append(' ')
+    flush()
+    return ''.join(out)
+
+
+def character_error_rate(decoded, reference):
+    """Edits needed to turn decoded into reference, per reference character"""
+    reference = reference.upper()
+    return edit_distance(decoded, reference) / max(len(reference), 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay timing logs through fixed and adaptive decoding")
+    parser.add_argument('logs', nargs='*', help="Timing logs (ms per line, + key down, - key up)")
+    parser.add_argument('--wpm', type=int, default=20, help="Slider speed for both decoders (default 20)")
+    parser.add_argument('--text', help="Reference text for logs without a '# text:' line")
+    parser.add_argument('--synthesize', type=int, default=0, metavar='N',
+                        help="Also replay N generated hand-sent logs with drifting speed")
+    parser.add_argument('--save-log', metavar='PATH', help="Write the first generated log here")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for path in args.logs:
+        try:
+            durations, text = load_log(path)
+        except (OSError, ValueError) as e:
+            print(f"✗ {path}: {e}")
+            return 1
+        runs.append((path, durations, text or args.text))
+
+    sample = "CQ CQ DE K1ABC K1ABC PSE K THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 73"
+    for n in range(args.synthesize):
+        rng = random.Random(n)
+        start, end = rng.randint(8, 35), rng.randint(8, 35)
+        durations = synthesize_log(sample, start, end, jitter=rng.uniform(0.05, 0.2),
+                                   dash_ratio=rng.uniform(2.6, 3.8), seed=n)
+        if n == 0 and args.save_log:
+            save_log(args.save_log, durations, sample)
+            print(f"✓ Saved {args.save_log}")
+        runs.append((f"synthetic {start}->{end} WPM", durations, sample))
+
+    if not runs:
+        parser.error("give at least one log or --synthesize N")
+
+    print(f"{'log':<28} {'fixed CER':>9} {'adaptive CER':>12} {'est. WPM':>8}")
+    totals = [0.0, 0.0]
+    scored = 0
+    for name, durations, text in runs:
+        fixed = replay(durations, FixedTiming(args.wpm))
+        tracker = AdaptiveTiming(args.wpm)
+        adaptive = replay(durations, tracker)
+        if text is None:
+            print(f"{name:<28} {'-':>9} {'-':>12} {tracker.wpm:>8.1f}")
+            print(f"    fixed:    {fixed}\n    adaptive: {adaptive}")
+            continue
+        errors = (character_error_rate(fixed, text), character_error_rate(adaptive, text))
+        totals[0] += errors[0]
+        totals[1] += errors[1]
+        scored += 1
+        print(f"{name:<28} {errors[0]:>9.1%} {errors[1]:>12.1%} {tracker.wpm:>8.1f}")
+    if scored:
+        print(f"{'mean':<28} {totals[0] / scored:>9.1%} {totals[1] / scored:>12.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
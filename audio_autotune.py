@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Audio Autotune Module - Mixer latency benchmark and buffer-size tuning
+Tries a range of mixer buffer sizes and sample rates. For each one it times
+how long start_tone takes to return and how regularly the device asks for
+audio, flags underruns, and saves the smallest stable configuration for
+AudioManager to use on this machine.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from audio_backends import (PygameBackend, SETTINGS_PATH, load_audio_settings,
+                            save_audio_settings, pygame)
+from tone_generator import DEFAULT_AMPLITUDE
+
+DEFAULT_BUFFERS = (128, 256, 512, 1024, 2048)
+DEFAULT_RATES = (22050, 44100, 48000)
+
+# A callback arriving this many buffer-lengths after the previous one means
+# the device ran dry
+UNDERRUN_FACTOR = 1.5
+
+# Report column for stable, unstable and unmeasured configurations
+STABILITY_MARKS = {True: '', False: '✗', None: '?'}
+
+
+def measure_keying(sample_rate, buffer_size, presses=50):
+    """
+    Time start_tone/stop_tone on a freshly opened mixer
+
+    Returns:
+        dict: Mean and worst start/stop call times in milliseconds, and the
+            rate the mixer actually negotiated ('mixer_rate')
+    """
+    backend = PygameBackend(buffer_size=buffer_size)
+    backend.open(sample_rate)
+    mixer_rate = backend.sample_rate
+    try:
+        backend.configure(600, DEFAULT_AMPLITUDE, 0.005)
+        starts, stops = [], []
+        for _ in range(presses):
+            t = time.perf_counter()
+            backend.tone_on()
+            starts.append(time.perf_counter() - t)
+            time.sleep(0.01)
+            t = time.perf_counter()
+            backend.tone_off()
+            stops.append(time.perf_counter() - t)
+            time.sleep(0.01)
+    finally:
+        backend.close()
+    return {
+        'mixer_rate': mixer_rate,
+        'start_mean_ms': float(np.mean(starts) * 1000),
+        'start_max_ms': float(np.max(starts) * 1000),
+        'stop_mean_ms': float(np.mean(stops) * 1000),
+        'stop_max_ms': float(np.max(stops) * 1000)
+    }
+
+
+def measure_callbacks(sample_rate, buffer_size, seconds=1.0):
+    """
+    Record how regularly the audio device requests buffers
+
+    Opens the device directly through SDL with the exact rate and buffer
+    size requested and timestamps every callback.
+
+    Returns:
+        dict: Callback count, interval jitter and underruns, or None if SDL
+            audio devices are not accessible from this pygame build
+    """
+    try:
+        from pygame._sdl2 import audio as sdl2_audio, sdl2
+    except ImportError:
+        return None
+
+    sdl2.init_subsystem(sdl2.INIT_AUDIO)
+    names = sdl2_audio.get_audio_device_names(False)
+    stamps = []
+
+    def callback(device, stream):
+        stamps.append(time.perf_counter())
+        stream[:] = bytes(len(stream))  # Silence
+
+    device = sdl2_audio.AudioDevice(devicename=names[0] if names else '', iscapture=False,
+                                    frequency=sample_rate, audioformat=sdl2_audio.AUDIO_S16,
+                                    numchannels=2, chunksize=buffer_size, allowed_changes=0,
+                                    callback=callback)
+    try:
+        device.pause(0)
+        time.sleep(seconds)
+        device.pause(1)
+    finally:
+        device.close()
+
+    period = buffer_size / sample_rate
+    intervals = np.diff(stamps)
+    if len(intervals) == 0:
+        return {'callbacks': len(stamps), 'jitter_ms': None, 'underruns': 1}
+    return {
+        'callbacks': len(stamps),
+        'jitter_ms': float(np.std(intervals) * 1000),
+        'late_max_ms': float((np.max(intervals) - period) * 1000),
+        'underruns': int(np.count_nonzero(intervals > period * UNDERRUN_FACTOR))
+    }
+
+
+def measure_config(sample_rate, buffer_size, seconds=1.0, presses=50):
+    """
+    Benchmark one rate/buffer combination
+
+    Returns:
+        dict: Settings, keying times, callback regularity and a 'stable' flag,
+            which is None when callbacks could not be measured
+    """
+    result = {
+        'sample_rate': sample_rate,
+        'buffer': buffer_size,
+        'buffer_ms': buffer_size / sample_rate * 1000
+    }
+    try:
+        result.update(measure_keying(sample_rate, buffer_size, presses))
+        callbacks = measure_callbacks(sample_rate, buffer_size, seconds)
+        if callbacks is None:
+            # Without callback timings there is no evidence either way
+            result['stable'] = None
+        else:
+            result.update(callbacks)
+            result['stable'] = callbacks['underruns'] == 0
+    except Exception as e:
+        result['error'] = str(e)
+        result['stable'] = False
+    return result
+
+
+def benchmark(rates=DEFAULT_RATES, buffers=DEFAULT_BUFFERS, seconds=1.0, presses=50):
+    """
+    Measure every rate/buffer combination
+
+    Each configuration runs in a fresh process: once SDL's audio subsystem
+    is up, pygame.mixer.init() will not reopen the device at new settings.
+
+    Returns:
+        list: One result dict per configuration, smallest buffer latency first
+    """
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for sample_rate in rates:
+        for buffer_size in buffers:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results.append(pool.submit(measure_config, sample_rate, buffer_size,
+                                           seconds, presses).result())
+    results.sort(key=lambda r: r['buffer_ms'])
+    return results
+
+
+def pick_best(results):
+    """
+    Smallest-latency stable configuration
+
+    Returns:
+        dict: Chosen result, or None if nothing was measured stable
+    """
+    stable = [r for r in results if r['stable'] is True]
+    return stable[0] if stable else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark mixer latency and save the best buffer size")
+    parser.add_argument('--rates', type=int, nargs='+', default=list(DEFAULT_RATES),
+                        help="Sample rates to try")
+    parser.add_argument('--buffers', type=int, nargs='+', default=list(DEFAULT_BUFFERS),
+                        help="Buffer sizes (frames) to try")
+    parser.add_argument('--seconds', type=float, default=1.0,
+                        help="Callback recording time per configuration (default 1)")
+    parser.add_argument('--presses', type=int, default=50,
+                        help="Key presses timed per configuration (default 50)")
+    parser.add_argument('--no-save', action='store_true', help="Only report, do not save")
+    args = parser.parse_args(argv)
+
+    if pygame is None:
+        print("✗ pygame is not installed")
+        return 1
+
+    print(f"Current settings: {load_audio_settings() or 'defaults'}")
+    results = benchmark(args.rates, args.buffers, args.seconds, args.presses)
+
+    print(f"{'rate':>6} {'buffer':>6} {'buf ms':>7} {'start ms':>9} {'jitter ms':>10} {'underruns':>9}")
+    for r in results:
+        if 'error' in r:
+            print(f"{r['sample_rate']:>6} {r['buffer']:>6} {r['buffer_ms']:>7.1f}  ✗ {r['error']}")
+            continue
+        jitter = r.get('jitter_ms')
+        print(f"{r['sample_rate']:>6} {r['buffer']:>6} {r['buffer_ms']:>7.1f} "
+              f"{r['start_mean_ms']:>9.3f} {(f'{jitter:.2f}' if jitter is not None else '-'):>10} "
+              f"{r.get('underruns', '-'):>9} {STABILITY_MARKS[r['stable']]}")
+
+    best = pick_best(results)
+    if best is None:
+        if any(r['stable'] is None for r in results):
+            print("✗ Callback timing is not available from this pygame build; keeping current settings")
+        else:
+            print("✗ No stable configuration found; keeping current settings")
+        return 1
+
+    print(f"✓ Smallest stable: {best['sample_rate']}Hz, buffer {best['buffer']} "
+          f"({best['buffer_ms']:.1f}ms)")
+    if best['mixer_rate'] != best['sample_rate']:
+        print(f"✗ The mixer opened at {best['mixer_rate']}Hz instead")
+    if not args.no_save:
+        # Save what the mixer really ran at, so AudioManager reopens the measured setup
+        save_audio_settings({'sample_rate': best['mixer_rate'], 'buffer': best['buffer']})
+        print(f"✓ Saved to {SETTINGS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
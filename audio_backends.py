@@ -0,0 +1,721 @@
+#!/usr/bin/env python3
+"""
+Audio Backends Module - Sound output behind AudioManager
+The pygame backend drives the real mixer; the null backend needs no audio
+hardware and records a timestamped on/off timeline that can be rendered to
+PCM on demand, so the simulator can run on headless machines.
+"""
+
+import importlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from tone_generator import (make_tone, make_loop_tone, render_element, apply_envelope,
+                            tone_frames, StreamingOscillator, DEFAULT_AMPLITUDE, INT16_MAX)
+
+try:
+    # stdout may be carrying raw PCM (--pcm-out -), so keep pygame's banner off it
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import pygame
+except ImportError:  # Only the pygame backend needs it
+    pygame = None
+
+try:
+    from pygame._sdl2 import audio as sdl2_audio, sdl2
+except ImportError:  # Only the stream backend needs it
+    sdl2_audio = None
+
+# Per-machine mixer settings written by audio_autotune.py
+SETTINGS_PATH = os.path.join(os.path.expanduser('~'), '.cw_simulator', 'audio.json')
+
+# Rate requested when none is given or tuned: what most sound servers run at,
+# so the device opens without another resampling stage. SDL may still pick
+# a different rate; the negotiated one is what gets rendered.
+NATIVE_SAMPLE_RATE = 48000
+
+
+def open_mixer(sample_rate=None, buffer_size=512):
+    """
+    Open pygame.mixer in the device's own format
+
+    Asks for mono at the given (or native) rate and lets SDL change both, so
+    tones can be rendered at exactly the rate and channel count the device
+    runs at instead of being resampled or duplicated to stereo.
+
+    Args:
+        sample_rate (int): Preferred rate in Hz, None for NATIVE_SAMPLE_RATE
+        buffer_size (int): Mixer buffer in frames
+
+    Returns:
+        tuple: (sample_rate, channels) the mixer was opened with
+    """
+    pygame.mixer.init(frequency=sample_rate or NATIVE_SAMPLE_RATE, size=-16, channels=1,
+                      buffer=buffer_size,
+                      allowedchanges=pygame.AUDIO_ALLOW_FREQUENCY_CHANGE |
+                      pygame.AUDIO_ALLOW_CHANNELS_CHANGE)
+    frequency, _, channels = pygame.mixer.get_init()
+    return frequency, channels
+
+
+def load_audio_settings(path=SETTINGS_PATH):
+    """
+    Read saved mixer settings
+
+    Returns:
+        dict: Saved settings (e.g. sample_rate, buffer), empty if none
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+        return settings if isinstance(settings, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_audio_settings(settings, path=SETTINGS_PATH):
+    """
+    Write mixer settings for later runs
+
+    Args:
+        settings (dict): Settings to save
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(settings, f, indent=2)
+
+
+class AudioBackend:
+    """Interface AudioManager uses to make sound"""
+
+    name = 'base'
+
+    # True if frequency/volume changes apply to a sounding tone without a restart
+    live_parameters = False
+
+    def open(self, sample_rate):
+        """
+        Start the output device
+
+        Sets self.sample_rate to the rate actually opened.
+
+        Args:
+            sample_rate (int): Preferred sample rate in Hz, None for the device's own
+
+        Raises:
+            Exception: If the device cannot be opened
+        """
+        raise NotImplementedError
+
+    def configure(self, frequency, amplitude, rise_time):
+        """
+        Set the tone used by later tone_on/queue_element calls
+
+        Args:
+            frequency (float): Tone frequency in Hz
+            amplitude (float): Tone level, 0.0 to 1.0
+            rise_time (float): Raised-cosine rise/fall time in seconds
+        """
+        raise NotImplementedError
+
+    def set_volume(self, volume):
+        """Set output volume, 0.0 to 1.0"""
+        raise NotImplementedError
+
+    def tone_on(self):
+        """Key down: start the tone"""
+        raise NotImplementedError
+
+    def tone_off(self):
+        """Key up: stop the tone"""
+        raise NotImplementedError
+
+    def queue_element(self, element, dot_duration):
+        """
+        Play a mark+gap element after whatever is already queued
+
+        Args:
+            element (str): '.' for dit or '-' for dah
+            dot_duration (float): Dot length in seconds
+
+        Returns:
+            float: Length of the element buffer in seconds
+        """
+        raise NotImplementedError
+
+    def element_pending(self):
+        """True while a queued element is still waiting behind the one playing"""
+        return False
+
+    def keyer_busy(self):
+        """True while queued element or PCM audio is still playing"""
+        return False
+
+    def play_pcm(self, samples):
+        """
+        Play a ready-made buffer after whatever is already queued
+
+        Args:
+            samples (numpy.ndarray): int16 mono samples at the backend's rate
+
+        Returns:
+            float: Length of the buffer in seconds
+        """
+        raise NotImplementedError(f"The {self.name} backend cannot play PCM buffers")
+
+    def get_info(self):
+        """
+        Device details for the audio info display
+
+        Returns:
+            dict: Any of mixer_frequency, mixer_format, mixer_channels, backend
+        """
+        return {'backend': self.name}
+
+    def close(self):
+        """Release the output device"""
+
+
+class PygameBackend(AudioBackend):
+    """
+    pygame.mixer output with an LRU bank of pre-built Sounds
+
+    pygame cannot report where a looping Sound is in playback, so the shaped
+    hand-key tone is not keyed on the mixer: it comes from a StreamingOscillator
+    on a second SDL device, which ramps it sample by sample in the audio
+    callback. Where a second device cannot be opened, the mixer's own
+    fade-in/fade-out is used instead; SDL_mixer steps that volume once per
+    mixer buffer, so it softens the edges but is not a raised cosine.
+    """
+
+    name = 'pygame'
+
+    # Number of pre-built Sounds kept around for quick pitch changes
+    SOUND_CACHE_SIZE = 32
+
+    # Mixer channels reserved for queued keyer elements and the shaped hand-key tone
+    KEYER_CHANNEL = 0
+    TONE_CHANNEL = 1
+
+    # Mixer buffer in frames when no tuned setting is saved
+    DEFAULT_BUFFER = 512
+
+    def __init__(self, buffer_size=None):
+        """
+        Args:
+            buffer_size (int): Mixer buffer in frames. None uses the settings
+                saved by audio_autotune.py, falling back to DEFAULT_BUFFER.
+        """
+        self.buffer_size = buffer_size
+        self.sample_rate = None
+        self.channels = 1
+        self.frequency = None
+        self.amplitude = DEFAULT_AMPLITUDE
+        self.rise_time = 0.0
+        self.volume = 1.0
+        self.tone_sound = None
+        self.keyer_channel = None
+        self.tone_channel = None
+        # Callback-driven hand-key tone, when a second device could be opened
+        self.key_stream = None
+
+        # LRU bank of ready-made Sounds keyed by (kind, frequency, sample_rate, ...)
+        self.sound_cache = OrderedDict()
+
+    def open(self, sample_rate):
+        if pygame is None:
+            raise RuntimeError("pygame is not installed")
+        buffer_size = self.buffer_size
+        if buffer_size is None:
+            # A tuned configuration replaces both the requested rate and the default buffer
+            settings = load_audio_settings()
+            buffer_size = settings.get('buffer', self.DEFAULT_BUFFER)
+            sample_rate = settings.get('sample_rate', sample_rate)
+        self.sample_rate, self.channels = open_mixer(sample_rate, buffer_size)
+        self.buffer_size = buffer_size
+        print(f"✓ Pygame mixer initialized ({self.sample_rate}Hz, "
+              f"{'mono' if self.channels == 1 else f'{self.channels} channels'}, buffer {buffer_size})")
+        # Keep our channels out of Sound.play()'s automatic channel pick
+        pygame.mixer.set_reserved(max(self.KEYER_CHANNEL, self.TONE_CHANNEL) + 1)
+        self.keyer_channel = pygame.mixer.Channel(self.KEYER_CHANNEL)
+        self.tone_channel = pygame.mixer.Channel(self.TONE_CHANNEL)
+        self.open_key_stream()
+
+    def open_key_stream(self):
+        """Open the callback device that shapes the hand-key tone, if SDL allows a second one"""
+        if sdl2_audio is None:
+            return
+        stream = StreamBackend(self.buffer_size)
+        try:
+            stream.open(self.sample_rate)
+        except Exception as e:
+            print(f"✗ No callback device for key shaping ({e}); using mixer fades")
+            return
+        self.key_stream = stream
+
+    def configure(self, frequency, amplitude, rise_time):
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.rise_time = rise_time
+        self.tone_sound = self.get_tone_sound(frequency)
+        self.tone_sound.set_volume(self.volume)
+        if self.key_stream:
+            self.key_stream.configure(frequency, amplitude, rise_time)
+        elif rise_time > 0:
+            # Built here, never on the key-down path
+            self.get_keyed_sound()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if self.tone_sound:
+            self.tone_sound.set_volume(volume)
+        if self.tone_channel:
+            self.tone_channel.set_volume(volume)
+        if self.key_stream:
+            self.key_stream.set_volume(volume)
+
+    def get_cached_sound(self, key, build):
+        """
+        Look up an entry in the LRU Sound bank, building and inserting it on a miss
+
+        Args:
+            key (tuple): Cache key
+            build (callable): Returns the Sound (or list of Sounds) to cache
+
+        Returns:
+            Cached or newly built entry
+        """
+        sound = self.sound_cache.get(key)
+        if sound is not None:
+            self.sound_cache.move_to_end(key)
+            return sound
+
+        sound = build()
+        self.sound_cache[key] = sound
+        if len(self.sound_cache) > self.SOUND_CACHE_SIZE:
+            self.sound_cache.popitem(last=False)
+        return sound
+
+    def get_tone_sound(self, frequency):
+        """
+        Get a looping tone Sound, building it only if it is not cached
+
+        Args:
+            frequency (int): Tone frequency in Hz
+
+        Returns:
+            pygame.mixer.Sound: 0.1s tone buffer
+        """
+        key = ('tone', frequency, self.sample_rate, self.amplitude)
+        return self.get_cached_sound(key, lambda: pygame.sndarray.make_sound(
+            make_tone(frequency, self.sample_rate, self.amplitude, duration=0.1,
+                      channels=self.channels)))
+
+    def get_keyed_sound(self):
+        """
+        Get the steady tone looped while a key is held, for the mixer-fade fallback
+
+        Returns:
+            pygame.mixer.Sound: Whole-cycle loop at the current frequency, no ramp in it
+        """
+        key = ('keyed', self.frequency, self.sample_rate, self.amplitude)
+        return self.get_cached_sound(key, lambda: pygame.sndarray.make_sound(
+            make_loop_tone(self.frequency, self.sample_rate, self.amplitude,
+                           channels=self.channels)))
+
+    def fade_ms(self):
+        """Rise time in whole milliseconds for the mixer's fades"""
+        return max(1, int(round(self.rise_time * 1000)))
+
+    def get_element_sound(self, element, dot_duration):
+        """
+        Get a pre-rendered element Sound: the mark plus its one-dot gap
+
+        Args:
+            element (str): '.' for dit or '-' for dah
+            dot_duration (float): Dot length in seconds for the current WPM
+
+        Returns:
+            pygame.mixer.Sound: Element buffer
+        """
+        mark = dot_duration if element == '.' else dot_duration * 3
+        key = (element, dot_duration, self.frequency, self.sample_rate, self.amplitude,
+               self.rise_time)
+        return self.get_cached_sound(key, lambda: pygame.sndarray.make_sound(
+            render_element(mark, dot_duration, self.frequency, self.sample_rate,
+                           self.amplitude, channels=self.channels, rise_time=self.rise_time)))
+
+    def tone_on(self):
+        if self.rise_time > 0 and self.key_stream:
+            # The callback ramps the tone up on the samples actually played
+            self.key_stream.tone_on()
+        elif self.rise_time > 0 and self.tone_channel:
+            self.tone_channel.set_volume(self.volume)
+            self.tone_channel.play(self.get_keyed_sound(), -1, fade_ms=self.fade_ms())
+        elif self.tone_sound:
+            self.tone_sound.play(-1)  # Loop indefinitely - same as working code
+
+    def tone_off(self):
+        if self.rise_time > 0 and self.key_stream:
+            self.key_stream.tone_off()
+        elif self.rise_time > 0 and self.tone_channel:
+            # The mixer fades what it is really playing, wherever the loop is
+            self.tone_channel.fadeout(self.fade_ms())
+        elif self.tone_sound:
+            self.tone_sound.stop()  # Same as working code
+
+    def queue_element(self, element, dot_duration):
+        # Plays at once if the channel is idle, otherwise starts on the sample
+        # after the current buffer ends, so timing comes from the audio clock
+        sound = self.get_element_sound(element, dot_duration)
+        self.keyer_channel.set_volume(self.volume)
+        if self.keyer_channel.get_busy():
+            self.keyer_channel.queue(sound)
+        else:
+            self.keyer_channel.play(sound)
+        return sound.get_length()
+
+    def element_pending(self):
+        # Channel.queue holds a single Sound; queueing again would replace it
+        return self.keyer_channel.get_queue() is not None
+
+    def keyer_busy(self):
+        return self.keyer_channel.get_busy()
+
+    def play_pcm(self, samples):
+        if self.channels > 1:
+            samples = np.repeat(samples[:, np.newaxis], self.channels, axis=1)
+        sound = pygame.sndarray.make_sound(np.ascontiguousarray(samples))
+        self.keyer_channel.set_volume(self.volume)
+        if self.keyer_channel.get_busy():
+            self.keyer_channel.queue(sound)
+        else:
+            self.keyer_channel.play(sound)
+        return sound.get_length()
+
+    def get_info(self):
+        info = super().get_info()
+        mixer_info = pygame.mixer.get_init()
+        if mixer_info:
+            info['mixer_frequency'] = mixer_info[0]
+            info['mixer_format'] = mixer_info[1]
+            info['mixer_channels'] = mixer_info[2]
+        info['mixer_buffer'] = self.buffer_size
+        return info
+
+    def close(self):
+        if self.key_stream:
+            self.key_stream.close()
+            self.key_stream = None
+        pygame.mixer.quit()
+
+
+class StreamBackend(AudioBackend):
+    """SDL callback device fed block by block from a StreamingOscillator"""
+
+    name = 'stream'
+    live_parameters = True
+
+    def __init__(self, buffer_size=None):
+        """
+        Args:
+            buffer_size (int): Device buffer in frames, None for tuned/default
+        """
+        self.buffer_size = buffer_size
+        self.sample_rate = None
+        self.channels = 1
+        self.device = None
+        self.oscillator = None
+        # Samples where the last queued element starts and where it (mark plus gap) ends
+        self.queue_start = 0
+        self.queue_end = 0
+
+    def open(self, sample_rate):
+        if sdl2_audio is None:
+            raise RuntimeError("pygame with SDL2 audio support is required")
+        buffer_size = self.buffer_size
+        if buffer_size is None:
+            settings = load_audio_settings()
+            buffer_size = settings.get('buffer', PygameBackend.DEFAULT_BUFFER)
+            sample_rate = settings.get('sample_rate', sample_rate)
+        sdl2.init_subsystem(sdl2.INIT_AUDIO)
+        names = sdl2_audio.get_audio_device_names(False)
+        self.oscillator = StreamingOscillator(sample_rate or NATIVE_SAMPLE_RATE)
+        self.device = sdl2_audio.AudioDevice(
+            devicename=names[0] if names else None, iscapture=False,
+            frequency=sample_rate or NATIVE_SAMPLE_RATE, audioformat=sdl2_audio.AUDIO_S16,
+            numchannels=1, chunksize=buffer_size,
+            allowed_changes=sdl2_audio.AUDIO_ALLOW_FREQUENCY_CHANGE |
+            sdl2_audio.AUDIO_ALLOW_CHANNELS_CHANGE,
+            callback=self.fill)
+        self.buffer_size = buffer_size
+        self.sample_rate = self.device.frequency
+        self.channels = self.device.numchannels
+        self.oscillator.sample_rate = self.sample_rate
+        self.device.pause(0)
+        print(f"✓ Audio stream opened ({self.sample_rate}Hz, buffer {buffer_size})")
+
+    def fill(self, device, stream):
+        """SDL audio callback: render the next block straight into the device buffer"""
+        block = self.oscillator.render(len(stream) // (2 * self.channels))
+        if self.channels > 1:
+            block = np.repeat(block[:, np.newaxis], self.channels, axis=1)
+        stream[:] = block.tobytes()
+
+    def configure(self, frequency, amplitude, rise_time):
+        # Read by the callback at the start of its next block
+        self.oscillator.rise_time = rise_time
+        self.oscillator.amplitude = amplitude
+        self.oscillator.frequency = frequency
+
+    def set_volume(self, volume):
+        self.oscillator.volume = volume
+
+    def tone_on(self):
+        self.oscillator.key_down = True
+
+    def tone_off(self):
+        self.oscillator.key_down = False
+
+    def queue_element(self, element, dot_duration):
+        # Marks are placed on the sample clock back to back, like Channel.queue
+        mark = tone_frames(dot_duration if element == '.' else dot_duration * 3, self.sample_rate)
+        gap = tone_frames(dot_duration, self.sample_rate)
+        start = max(self.oscillator.position, self.queue_end)
+        self.oscillator.schedule_mark(start, mark)
+        self.queue_start = start
+        self.queue_end = start + mark + gap
+        return (mark + gap) / self.sample_rate
+
+    def play_pcm(self, samples):
+        # Mixed in by the callback from its place on the sample clock, behind any elements
+        start = max(self.oscillator.position, self.queue_end)
+        self.oscillator.schedule_pcm(start, samples)
+        self.queue_start = start
+        self.queue_end = start + len(samples)
+        return len(samples) / self.sample_rate
+
+    def element_pending(self):
+        return self.oscillator.position < self.queue_start
+
+    def keyer_busy(self):
+        return self.oscillator.position < self.queue_end
+
+    def get_info(self):
+        info = super().get_info()
+        if self.device:
+            info['mixer_frequency'] = self.device.frequency
+            info['mixer_format'] = -16
+            info['mixer_channels'] = self.device.numchannels
+            info['mixer_buffer'] = self.device.chunksize
+        return info
+
+    def close(self):
+        if self.device:
+            self.device.pause(1)
+            self.device.close()
+            self.device = None
+
+
+class NullBackend(AudioBackend):
+    """Silent backend that records what would have been played"""
+
+    name = 'null'
+
+    def __init__(self, clock=time.perf_counter):
+        """
+        Args:
+            clock (callable): Time source in seconds; pass a fake clock to drive
+                the simulator faster than real time
+        """
+        self.clock = clock
+        self.sample_rate = None
+        self.start_time = 0.0
+        # (seconds since open, event, value) with events 'tone', 'volume',
+        # 'on', 'off', 'element' and 'pcm' (the int16 samples themselves)
+        self.timeline = []
+        # Seconds since open where the last queued buffer starts and ends
+        self.queue_start = 0.0
+        self.queue_end = 0.0
+
+    def open(self, sample_rate):
+        self.sample_rate = sample_rate or NATIVE_SAMPLE_RATE
+        self.start_time = self.clock()
+        self.timeline = []
+        self.queue_start = self.queue_end = 0.0
+
+    def record(self, event, value=None):
+        """Append an event at the current clock time"""
+        self.timeline.append((self.clock() - self.start_time, event, value))
+
+    def configure(self, frequency, amplitude, rise_time):
+        self.record('tone', (frequency, amplitude, rise_time))
+
+    def set_volume(self, volume):
+        self.record('volume', volume)
+
+    def tone_on(self):
+        self.record('on')
+
+    def tone_off(self):
+        self.record('off')
+
+    def queue_element(self, element, dot_duration):
+        self.record('element', (element, dot_duration))
+        mark = dot_duration if element == '.' else dot_duration * 3
+        return self.occupy((tone_frames(mark, self.sample_rate) +
+                            tone_frames(dot_duration, self.sample_rate)) / self.sample_rate)
+
+    def play_pcm(self, samples):
+        self.record('pcm', np.array(samples, dtype=np.int16))
+        return self.occupy(len(samples) / self.sample_rate)
+
+    def occupy(self, length):
+        """Account for a buffer queued behind the others; returns its length"""
+        now = self.clock() - self.start_time
+        self.queue_start = max(now, self.queue_end)
+        self.queue_end = self.queue_start + length
+        return length
+
+    def element_pending(self):
+        return self.clock() - self.start_time < self.queue_start
+
+    def keyer_busy(self):
+        return self.clock() - self.start_time < self.queue_end
+
+    def marks(self):
+        """
+        Key-down intervals implied by the timeline
+
+        Elements queue behind each other like on the pygame keyer channel.
+
+        Returns:
+            list: (start seconds, length seconds, frequency, level, rise_time) tuples
+        """
+        return self.schedule()[0]
+
+    def buffers(self):
+        """
+        PCM buffers implied by the timeline, queued with the elements
+
+        Returns:
+            list: (start seconds, int16 samples, volume) tuples
+        """
+        return self.schedule()[1]
+
+    def schedule(self):
+        """
+        Place every timeline event on the output clock
+
+        Elements and PCM buffers share one queue, like on the pygame keyer channel.
+
+        Returns:
+            tuple: (marks, buffers) as returned by marks() and buffers()
+        """
+        frequency, amplitude, rise_time, volume = 600, DEFAULT_AMPLITUDE, 0.0, 1.0
+        key_down = None
+        queue_end = 0.0
+        marks = []
+        buffers = []
+        for t, event, value in self.timeline:
+            if event == 'tone':
+                frequency, amplitude, rise_time = value
+            elif event == 'volume':
+                volume = value
+            elif event == 'on' and key_down is None:
+                key_down = t
+            elif event == 'off' and key_down is not None:
+                marks.append((key_down, t - key_down, frequency, amplitude * volume, rise_time))
+                key_down = None
+            elif event == 'element':
+                element, dot_duration = value
+                mark = dot_duration if element == '.' else dot_duration * 3
+                start = max(t, queue_end)
+                marks.append((start, mark, frequency, amplitude * volume, rise_time))
+                queue_end = start + (tone_frames(mark, self.sample_rate) +
+                                     tone_frames(dot_duration, self.sample_rate)) / self.sample_rate
+            elif event == 'pcm':
+                start = max(t, queue_end)
+                buffers.append((start, value, volume))
+                queue_end = start + len(value) / self.sample_rate
+        if key_down is not None:
+            end = self.clock() - self.start_time
+            marks.append((key_down, end - key_down, frequency, amplitude * volume, rise_time))
+        return marks, buffers
+
+    def render(self, sample_rate=None):
+        """
+        Render the recorded timeline to PCM
+
+        Args:
+            sample_rate (int): Output rate (default: the rate the backend was opened at)
+
+        Returns:
+            numpy.ndarray: int16 mono samples
+        """
+        sample_rate = sample_rate or self.sample_rate
+        marks, buffers = self.schedule()
+        pcm = []
+        for start, samples, volume in buffers:
+            if sample_rate != self.sample_rate:
+                # Resample linearly to the output rate
+                length = tone_frames(len(samples) / self.sample_rate, sample_rate)
+                samples = np.interp(np.arange(length) * self.sample_rate / sample_rate,
+                                    np.arange(len(samples)), samples)
+            pcm.append((tone_frames(start, sample_rate), samples * volume))
+        ends = ([tone_frames(start + length, sample_rate) for start, length, *_ in marks] +
+                [first + len(samples) for first, samples in pcm])
+        if not ends:
+            return np.zeros(0, dtype=np.int16)
+        total = max(ends)
+        # Summed wide, so overlapping hand keying and buffers clip instead of wrapping
+        out = np.zeros(total, dtype=np.int32)
+        for start, length, frequency, level, rise_time in marks:
+            tone = make_tone(frequency, sample_rate, level, length, channels=1)
+            apply_envelope(tone, len(tone), rise_time, sample_rate)
+            first = tone_frames(start, sample_rate)
+            out[first:first + len(tone)] += tone[:total - first]
+        for first, samples in pcm:
+            out[first:first + len(samples)] += samples.astype(np.int32)
+        return np.clip(out, -INT16_MAX, INT16_MAX).astype(np.int16)
+
+
+BACKENDS = {
+    PygameBackend.name: PygameBackend,
+    StreamBackend.name: StreamBackend,
+    NullBackend.name: NullBackend,
+}
+
+# Backends living in their own modules, imported only when chosen: name -> (module, class)
+LAZY_BACKENDS = {
+    'process': ('audio_engine', 'ProcessBackend'),
+}
+
+
+def backend_names():
+    """All backend names create_backend accepts, sorted"""
+    return sorted([*BACKENDS, *LAZY_BACKENDS])
+
+
+def create_backend(backend=None):
+    """
+    Resolve a backend name or instance
+
+    Args:
+        backend: AudioBackend instance, a name from backend_names(), or None for pygame
+
+    Returns:
+        AudioBackend: Ready-to-open backend
+    """
+    if isinstance(backend, AudioBackend):
+        return backend
+    name = backend or PygameBackend.name
+    if name in LAZY_BACKENDS:
+        module, cls = LAZY_BACKENDS[name]
+        return getattr(importlib.import_module(module), cls)()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown audio backend '{name}' (choose from {', '.join(backend_names())})")
+    return BACKENDS[name]()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Audio Engine Module - Sidetone in its own process
+Key on/off commands are written to a lock-free ring in shared memory. A
+separate process owns the mixer and plays them as soon as it reads them, so
+a slow redraw, a modal dialog or a GC pause in the GUI process cannot hold
+up the tone. Each command carries its time.perf_counter() issue stamp; the
+engine does not schedule by it, it only reports it with the time the tone
+changed so the delay can be measured. Run this file directly to compare
+keying jitter in and out of process.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from audio_backends import AudioBackend, PygameBackend, pygame
+from tone_generator import DEFAULT_AMPLITUDE, tone_frames
+
+# Ring commands
+CMD_ON = 1
+CMD_OFF = 2
+CMD_ELEMENT = 3
+CMD_CONFIGURE = 4
+CMD_VOLUME = 5
+CMD_QUIT = 6
+
+# One command: timestamp, command code and up to three numeric arguments
+SLOT_DTYPE = np.dtype([('time', '<f8'), ('command', '<i8'), ('args', '<f8', 3)])
+
+# Write and read counters, each on its own cache line
+HEADER_BYTES = 128
+
+# Longest the engine sleeps on an empty ring before checking for queries
+IDLE_TIMEOUT = 0.05
+
+# Sleep while keyer audio is playing, so the published keyer state stays fresh
+KEYER_TIMEOUT = 0.002
+
+# Keyer state bits the engine publishes in the ring header
+KEYER_PENDING = 1
+KEYER_BUSY = 2
+
+
+class CommandRing:
+    """Single-producer, single-consumer command queue in shared memory"""
+
+    def __init__(self, name=None, slots=256):
+        """
+        Args:
+            name (str): Attach to an existing ring, None to create one
+            slots (int): Capacity when creating
+        """
+        if name is None:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=HEADER_BYTES + slots * SLOT_DTYPE.itemsize)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        slots = (self.shm.size - HEADER_BYTES) // SLOT_DTYPE.itemsize
+        # Counters only ever grow; the producer writes 'head', the consumer 'tail'
+        self.head = np.ndarray((1,), dtype='<u8', buffer=self.shm.buf, offset=0)
+        self.tail = np.ndarray((1,), dtype='<u8', buffer=self.shm.buf, offset=64)
+        # Keyer channel state (KEYER_* bits), written by the consumer
+        self.keyer = np.ndarray((1,), dtype='<u8', buffer=self.shm.buf, offset=72)
+        self.slots = np.ndarray((slots,), dtype=SLOT_DTYPE, buffer=self.shm.buf,
+                                offset=HEADER_BYTES)
+        if self.owner:
+            self.head[0] = 0
+            self.tail[0] = 0
+            self.keyer[0] = 0
+
+    def push(self, command, *args, timestamp=None):
+        """
+        Write a command for the engine
+
+        Args:
+            command (int): One of the CMD_* codes
+            *args (float): Up to three arguments
+            timestamp (float): perf_counter time of the event (default: now)
+
+        Returns:
+            bool: False if the ring is full and the command was dropped
+        """
+        head = int(self.head[0])
+        if head - int(self.tail[0]) >= len(self.slots):
+            return False
+        slot = self.slots[head % len(self.slots)]
+        slot['time'] = time.perf_counter() if timestamp is None else timestamp
+        slot['command'] = command
+        slot['args'] = (tuple(args) + (0.0, 0.0, 0.0))[:3]
+        # Publish only after the slot is filled
+        self.head[0] = head + 1
+        return True
+
+    def pop_ready(self):
+        """True if a command is waiting"""
+        return int(self.tail[0]) != int(self.head[0])
+
+    def pop(self):
+        """
+        Read the oldest command
+
+        Returns:
+            tuple: (timestamp, command, args), or None if the ring is empty
+        """
+        tail = int(self.tail[0])
+        if tail == int(self.head[0]):
+            return None
+        slot = self.slots[tail % len(self.slots)]
+        entry = (float(slot['time']), int(slot['command']), tuple(slot['args'].tolist()))
+        self.tail[0] = tail + 1
+        return entry
+
+    def close(self):
+        """Detach, and free the memory if this side created it"""
+        # numpy views must go before the buffer can be released
+        del self.head, self.tail, self.keyer, self.slots
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def run_engine(ring_name, wake, sample_rate, buffer_size, conn):
+    """
+    Engine process entry point: play ring commands on a PygameBackend
+
+    The pipe carries the open handshake and rare queries ('info', 'stats',
+    and ('pcm', segment name, frames) for Send-box buffers); every keying
+    command goes through the ring. Queries are only read once the ring is
+    empty, so they take effect after every command sent before them. Each
+    query arrives as (id, query) and is answered as (id, reply).
+
+    Args:
+        ring_name (str): Shared memory name of the CommandRing
+        wake: multiprocessing Event set by the producer after each push
+        sample_rate (int): Preferred sample rate, None for native
+        buffer_size (int): Mixer buffer in frames, None for tuned/default
+        conn: Engine end of a multiprocessing Pipe
+    """
+    ring = CommandRing(ring_name)
+    backend = PygameBackend(buffer_size)
+    try:
+        backend.open(sample_rate)
+    except Exception as e:
+        conn.send({'error': str(e)})
+        ring.close()
+        return
+    conn.send({'sample_rate': backend.sample_rate})
+
+    # (issue stamp, perf_counter after the mixer changed) for each on/off
+    changes = []
+    running = True
+    while running:
+        entry = ring.pop()
+        if entry is None:
+            ring.keyer[0] = ((KEYER_PENDING if backend.element_pending() else 0) |
+                             (KEYER_BUSY if backend.keyer_busy() else 0))
+            if conn.poll():
+                request_id, request = conn.recv()
+                reply = None
+                if request == 'info':
+                    reply = backend.get_info()
+                elif request == 'stats':
+                    reply = changes
+                    changes = []
+                elif request[0] == 'pcm':
+                    reply = play_shared_pcm(backend, *request[1:])
+                    ring.keyer[0] = KEYER_PENDING if backend.element_pending() else KEYER_BUSY
+                conn.send((request_id, reply))
+            # Clear before the last look so a push racing the wait still wakes us
+            wake.clear()
+            if ring.pop_ready():
+                continue
+            wake.wait(KEYER_TIMEOUT if ring.keyer[0] else IDLE_TIMEOUT)
+            continue
+
+        stamp, command, args = entry
+        if command == CMD_ON:
+            backend.tone_on()
+            changes.append((stamp, time.perf_counter()))
+        elif command == CMD_OFF:
+            backend.tone_off()
+            changes.append((stamp, time.perf_counter()))
+        elif command == CMD_ELEMENT:
+            backend.queue_element('.' if args[0] == 0 else '-', args[1])
+            ring.keyer[0] = KEYER_PENDING if backend.element_pending() else KEYER_BUSY
+        elif command == CMD_CONFIGURE:
+            backend.configure(args[0], args[1], args[2])
+        elif command == CMD_VOLUME:
+            backend.set_volume(args[0])
+        elif command == CMD_QUIT:
+            running = False
+
+    backend.close()
+    ring.close()
+
+
+def play_shared_pcm(backend, name, frames):
+    """
+    Queue samples the GUI process left in a shared memory segment
+
+    Args:
+        backend (PygameBackend): The engine's mixer
+        name (str): Shared memory segment name
+        frames (int): Number of int16 samples in it
+
+    Returns:
+        float or dict: Buffer length in seconds, or {'error': message}
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            samples = np.ndarray((frames,), dtype=np.int16, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+        return backend.play_pcm(samples)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+class ProcessBackend(AudioBackend):
+    """Drives a PygameBackend in a child process through a CommandRing"""
+
+    name = 'process'
+
+    # Seconds to wait for the engine to open the mixer
+    START_TIMEOUT = 10.0
+
+    def __init__(self, buffer_size=None):
+        """
+        Args:
+            buffer_size (int): Mixer buffer in frames, None for tuned/default
+        """
+        self.buffer_size = buffer_size
+        self.sample_rate = None
+        self.ring = None
+        self.wake = None
+        self.conn = None
+        self.process = None
+        # Id of the last pipe query, so a late reply is not taken for the next one's
+        self.request_id = 0
+
+    def open(self, sample_rate):
+        # spawn, not fork: the GUI process may already hold Tk and SDL state
+        context = multiprocessing.get_context('spawn')
+        self.ring = CommandRing()
+        self.wake = context.Event()
+        self.conn, engine_conn = context.Pipe()
+        self.process = context.Process(target=run_engine, name="audio-engine", daemon=True,
+                                       args=(self.ring.name, self.wake, sample_rate,
+                                             self.buffer_size, engine_conn))
+        self.process.start()
+        if not self.conn.poll(self.START_TIMEOUT):
+            self.close()
+            raise RuntimeError("Audio engine did not start")
+        reply = self.conn.recv()
+        if 'error' in reply:
+            self.close()
+            raise RuntimeError(f"Audio engine failed: {reply['error']}")
+        self.sample_rate = reply['sample_rate']
+        print(f"✓ Audio engine running (pid {self.process.pid})")
+
+    def send(self, command, *args, timestamp=None):
+        """Write a command to the ring, raising if the engine has fallen behind"""
+        if not self.ring.push(command, *args, timestamp=timestamp):
+            raise RuntimeError("Audio engine command ring is full")
+        self.wake.set()
+
+    def configure(self, frequency, amplitude, rise_time):
+        self.send(CMD_CONFIGURE, frequency, amplitude, rise_time)
+
+    def set_volume(self, volume):
+        self.send(CMD_VOLUME, volume)
+
+    def tone_on(self):
+        self.send(CMD_ON)
+
+    def tone_off(self):
+        self.send(CMD_OFF)
+
+    def queue_element(self, element, dot_duration):
+        self.send(CMD_ELEMENT, 0 if element == '.' else 1, dot_duration)
+        mark = dot_duration if element == '.' else dot_duration * 3
+        return (tone_frames(mark, self.sample_rate) +
+                tone_frames(dot_duration, self.sample_rate)) / self.sample_rate
+
+    def play_pcm(self, samples):
+        # Far too big for a ring slot: hand the samples over in a segment of their
+        # own and wait until the engine has copied them into a Sound
+        shm = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+        try:
+            view = np.ndarray(samples.shape, dtype=np.int16, buffer=shm.buf)
+            view[:] = samples
+            del view
+            reply = self.request(('pcm', shm.name, len(samples)), timeout=self.START_TIMEOUT)
+        finally:
+            shm.close()
+            shm.unlink()
+        if reply is None:
+            raise RuntimeError("Audio engine did not take the PCM buffer")
+        if isinstance(reply, dict):
+            raise RuntimeError(f"Audio engine failed: {reply.get('error')}")
+        return reply
+
+    def element_pending(self):
+        # Commands the engine has not read yet may still queue an element
+        return self.ring.pop_ready() or bool(self.ring.keyer[0] & KEYER_PENDING)
+
+    def keyer_busy(self):
+        return self.ring.pop_ready() or bool(self.ring.keyer[0] & (KEYER_PENDING | KEYER_BUSY))
+
+    def request(self, query, timeout=1.0):
+        """
+        Ask the engine a pipe query
+
+        Replies left over from earlier queries that timed out are discarded.
+
+        Returns:
+            The engine's reply, or None if it did not answer in time
+        """
+        self.request_id += 1
+        self.conn.send((self.request_id, query))
+        self.wake.set()
+        deadline = time.perf_counter() + timeout
+        while self.conn.poll(max(0.0, deadline - time.perf_counter())):
+            request_id, reply = self.conn.recv()
+            if request_id == self.request_id:
+                return reply
+        return None
+
+    def get_info(self):
+        info = self.request('info') or {}
+        info['backend'] = self.name
+        return info
+
+    def close(self):
+        if self.process is not None and self.process.is_alive():
+            self.send(CMD_QUIT)
+            self.process.join(2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+def busy_load(stop, block):
+    """Hold the GIL in pure-Python bursts, like redraws and GC in the GUI"""
+    while not stop.is_set():
+        end = time.perf_counter() + block
+        while time.perf_counter() < end:
+            pass
+        time.sleep(0.001)
+
+
+def measure_jitter(backend, presses, interval, load_block):
+    """
+    Key a backend on a fixed schedule while another thread loads the GIL
+
+    Both modes are measured the same way: from each key event's scheduled
+    time to the moment the mixer's tone state changed, in whichever process
+    owns the mixer. That includes the keying thread waiting for the GIL, and
+    for the process backend also the ring hop and engine wake-up. The
+    device buffer after the mixer is the same in both modes and is not
+    included. perf_counter is system-wide, so engine times compare directly.
+
+    Returns:
+        numpy.ndarray: Seconds from each scheduled key event to the tone change
+    """
+    backend.open(None)
+    backend.configure(600, DEFAULT_AMPLITUDE, 0.005)
+    stop = threading.Event()
+    load = threading.Thread(target=busy_load, args=(stop, load_block), daemon=True)
+    load.start()
+    scheduled = []
+    changed = []
+    try:
+        due = time.perf_counter() + 0.2
+        for press in range(presses * 2):
+            while time.perf_counter() < due:
+                time.sleep(0.0002)
+            (backend.tone_on if press % 2 == 0 else backend.tone_off)()
+            changed.append(time.perf_counter())
+            scheduled.append(due)
+            due += interval
+        time.sleep(0.1)
+        if isinstance(backend, ProcessBackend):
+            # The tone changes in the engine, not when send() returns here
+            changed = [applied for _, applied in backend.request('stats')]
+    finally:
+        stop.set()
+        load.join()
+        backend.close()
+    return np.array(changed) - np.array(scheduled)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare sidetone keying jitter in and out of process")
+    parser.add_argument('--presses', type=int, default=200, help="Key presses per mode (default 200)")
+    parser.add_argument('--interval', type=float, default=30.0,
+                        help="Milliseconds between key events (default 30)")
+    parser.add_argument('--load', type=float, default=20.0,
+                        help="Milliseconds per burst of GIL-holding background work (default 20)")
+    args = parser.parse_args(argv)
+
+    if pygame is None:
+        print("✗ pygame is not installed")
+        return 1
+
+    print("Delay from each scheduled key event to the mixer's tone change")
+    print(f"{'mode':>8} {'mean ms':>8} {'σ ms':>7} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    for backend in (PygameBackend(), ProcessBackend()):
+        latency = measure_jitter(backend, args.presses, args.interval / 1000.0,
+                                 args.load / 1000.0) * 1000
+        print(f"{backend.name:>8} {latency.mean():>8.3f} {latency.std():>7.3f} "
+              f"{np.percentile(latency, 50):>7.3f} {np.percentile(latency, 99):>7.3f} "
+              f"{latency.max():>7.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,67 +4,190 @@ Audio Manager Module - Simplified version based on working code
 Uses the same audio approach as the working simple version
 """
 
-import pygame
-import numpy as np
+import threading
 import time
+from collections import OrderedDict
+from audio_backends import create_backend
+from code_tables import DEFAULT_ALPHABET
+from tone_generator import DEFAULT_AMPLITUDE
 
 class AudioManager:
-    def __init__(self, frequency=600, sample_rate=22050):
+    # Rise/fall shaping choices offered in the UI, in seconds
+    RISE_TIMES = (0.0, 0.003, 0.005)
+    
+    # Number of open PCMBanks kept for the Send box, least recently used dropped first
+    BANK_CACHE_SIZE = 8
+    
+    def __init__(self, frequency=600, sample_rate=None, amplitude=DEFAULT_AMPLITUDE,
+                 rise_time=0.005, backend=None, background=False):
         """
         Initialize audio manager with simple, proven approach
         
         Args:
             frequency (int): Tone frequency in Hz (default 600Hz)
-            sample_rate (int): Audio sample rate (default 22050Hz)
+            sample_rate (int): Preferred sample rate, None to use the device's native rate
+            amplitude (float): Tone level, 0.0 to 1.0 (default 0.3)
+            rise_time (float): Raised-cosine rise/fall time in seconds, 0 for hard keying
+            backend: Output backend name ('pygame' or 'null') or AudioBackend instance
+            background (bool): Open the device on a worker thread and return at
+                once; keying is silent until the ready event is set
         """
         self.frequency = frequency
         self.sample_rate = sample_rate
+        self.amplitude = amplitude
+        self.rise_time = rise_time
         self.is_playing = False
-        self.tone_sound = None
         self.audio_available = False
+        self.volume = 1.0
+        self.backend = create_backend(backend)
+        # LRU of PCMBanks for play_text, keyed by
+        # (wpm, frequency, sample_rate, amplitude, rise_time, alphabet)
+        self.banks = OrderedDict()
+        
+        # Guards the backend against GUI calls while the worker is setting it up
+        self.lock = threading.RLock()
+        self.ready = threading.Event()
+        # Seconds spent in each startup step, for startup profiling
+        self.timings = {}
         
         print("Initializing audio system...")
-        self.initialize_audio()
+        if background:
+            threading.Thread(target=self.initialize_audio, name="audio-init", daemon=True).start()
+        else:
+            self.initialize_audio()
     
     def initialize_audio(self):
-        """Initialize audio using the same method as working code"""
+        """Open the output backend and build the tone, then set the ready event"""
         try:
-            # Use the exact same initialization as your working code
-            pygame.mixer.init(frequency=self.sample_rate, size=-16, channels=2, buffer=512)
-            print("✓ Pygame mixer initialized")
-            self.setup_audio()
-            self.audio_available = True
-            print("✓ Audio system ready")
+            start = time.perf_counter()
+            self.backend.open(self.sample_rate)
+            self.timings['mixer_init'] = time.perf_counter() - start
+            # Render at whatever rate the device negotiated (or was tuned to)
+            self.sample_rate = self.backend.sample_rate or self.sample_rate
+            with self.lock:
+                start = time.perf_counter()
+                self.audio_available = True
+                self.setup_audio()
+                self.timings['tone_build'] = time.perf_counter() - start
+            if self.audio_available:
+                print("✓ Audio system ready")
         except Exception as e:
             print(f"✗ Audio initialization failed: {e}")
             self.audio_available = False
+        finally:
+            self.ready.set()
+    
+    def wait_ready(self, timeout=None):
+        """
+        Block until audio initialization has finished
+        
+        Args:
+            timeout (float): Longest wait in seconds, None for no limit
+            
+        Returns:
+            bool: True if audio is ready to use
+        """
+        self.ready.wait(timeout)
+        return self.audio_available
     
     def setup_audio(self):
-        """Generate tone using the exact same method as working code"""
+        """Hand the current tone settings to the backend"""
         if not self.audio_available:
             return
             
         try:
-            # Use the exact same audio generation as your working code
-            duration = 0.1  # seconds
-            frames = int(duration * self.sample_rate)
-            
-            # Generate sine wave - same method as working code
-            arr = np.zeros((frames, 2))
-            for i in range(frames):
-                wave = np.sin(2 * np.pi * self.frequency * i / self.sample_rate)
-                arr[i][0] = wave * 0.3  # Left channel
-                arr[i][1] = wave * 0.3  # Right channel
-            
-            # Convert to pygame sound - same method as working code
-            arr = (arr * 32767).astype(np.int16)
-            self.tone_sound = pygame.sndarray.make_sound(arr)
+            self.backend.configure(self.frequency, self.amplitude, self.rise_time)
+            self.backend.set_volume(self.volume)
             print(f"✓ Tone generated ({self.frequency}Hz)")
             
         except Exception as e:
             print(f"✗ Tone generation failed: {e}")
             self.audio_available = False
     
+    def queue_element(self, element, dot_duration):
+        """
+        Hand an element buffer to the keyer
+        
+        Plays at once if the keyer is idle, otherwise queues it to start on
+        the sample after the current buffer ends, so element timing comes from
+        the audio clock rather than the GUI timer.
+        
+        Args:
+            element (str): '.' for dit or '-' for dah
+            dot_duration (float): Dot length in seconds for the current WPM
+            
+        Returns:
+            float: Length of the queued buffer (mark plus gap) in seconds
+        """
+        if not self.audio_available:
+            return 0.0
+        
+        try:
+            with self.lock:
+                return self.backend.queue_element(element, dot_duration)
+        except Exception as e:
+            print(f"Failed to queue element: {e}")
+            return 0.0
+    
+    def element_pending(self):
+        """
+        True while a queued element waits behind the one playing
+        
+        The pygame keyer channel holds only one waiting buffer, so nothing
+        more may be queued until this is False.
+        """
+        if not self.audio_available:
+            return False
+        with self.lock:
+            return self.backend.element_pending()
+    
+    def keyer_busy(self):
+        """True while queued keyer audio is still playing"""
+        if not self.audio_available:
+            return False
+        with self.lock:
+            return self.backend.keyer_busy()
+    
+    def play_text(self, text, wpm, alphabet=DEFAULT_ALPHABET):
+        """
+        Send text at the given speed from the memory-mapped PCM bank
+        
+        The bank for the current tone settings is built once and then only
+        sliced, so even long messages start at once.
+        
+        Args:
+            text (str): Plain text to send
+            wpm (int): Sending speed
+            alphabet (str): Key into code_tables.ALPHABETS to encode with
+            
+        Returns:
+            float: Length of the message in seconds, 0.0 if nothing played
+        """
+        if not self.audio_available:
+            return 0.0
+        
+        try:
+            key = (wpm, self.frequency, self.sample_rate, self.amplitude, self.rise_time, alphabet)
+            bank = self.banks.get(key)
+            if bank is not None:
+                self.banks.move_to_end(key)
+            else:
+                # Only the Send box needs the renderer, so it is imported on first use
+                from morse_decoder import MorseDecoder
+                from pcm_bank import PCMBank
+                # A decoder of its own: the GUI's switches tables in place
+                bank = self.banks[key] = PCMBank(*key[:5], decoder=MorseDecoder(alphabet))
+                if len(self.banks) > self.BANK_CACHE_SIZE:
+                    self.banks.popitem(last=False)
+            pcm = bank.render_text(text)
+            if not len(pcm):
+                return 0.0
+            with self.lock:
+                return self.backend.play_pcm(pcm)
+        except Exception as e:
+            print(f"Failed to play text: {e}")
+            return 0.0
+    
     def start_tone(self):
         """Start playing the morse code tone"""
         if not self.audio_available or self.is_playing:
@@ -72,8 +195,8 @@ class AudioManager:
         
         try:
             self.is_playing = True
-            if self.tone_sound:
-                self.tone_sound.play(-1)  # Loop indefinitely - same as working code
+            with self.lock:
+                self.backend.tone_on()
         except Exception as e:
             print(f"Failed to start tone: {e}")
             self.is_playing = False
@@ -85,27 +208,58 @@ class AudioManager:
         
         try:
             self.is_playing = False
-            if self.tone_sound:
-                self.tone_sound.stop()  # Same as working code
+            with self.lock:
+                self.backend.tone_off()
         except Exception as e:
             print(f"Failed to stop tone: {e}")
     
+    def set_rise_time(self, rise_time):
+        """
+        Select rise/fall shaping for keyed tones
+        
+        Args:
+            rise_time (float): Raised-cosine ramp in seconds, 0 for hard keying
+        """
+        if rise_time != self.rise_time:
+            with self.lock:
+                if self.audio_available and self.backend.live_parameters:
+                    self.rise_time = max(0.0, rise_time)
+                    self.backend.configure(self.frequency, self.amplitude, self.rise_time)
+                    return
+                was_playing = self.is_playing
+                if was_playing:
+                    self.stop_tone()
+                self.rise_time = max(0.0, rise_time)
+                if self.audio_available:
+                    self.backend.configure(self.frequency, self.amplitude, self.rise_time)
+                if was_playing:
+                    self.start_tone()
+    
     def set_frequency(self, frequency):
         """Change the tone frequency"""
         if frequency != self.frequency:
-            self.frequency = frequency
-            was_playing = self.is_playing
-            if was_playing:
-                self.stop_tone()
-            self.setup_audio()
-            if was_playing:
-                self.start_tone()
+            with self.lock:
+                self.frequency = frequency
+                if self.audio_available and self.backend.live_parameters:
+                    # Streaming backends glide to the new pitch in phase
+                    self.backend.configure(frequency, self.amplitude, self.rise_time)
+                    return
+                was_playing = self.is_playing
+                if was_playing:
+                    self.stop_tone()
+                if self.audio_available:
+                    self.backend.configure(frequency, self.amplitude, self.rise_time)
+                if was_playing:
+                    self.start_tone()
     
     def set_volume(self, volume):
         """Set the audio volume (0.0 to 1.0)"""
-        if self.audio_available and self.tone_sound:
+        with self.lock:
+            self.volume = max(0.0, min(1.0, volume))
+            if not self.audio_available:
+                return
             try:
-                self.tone_sound.set_volume(max(0.0, min(1.0, volume)))
+                self.backend.set_volume(self.volume)
             except Exception as e:
                 print(f"Failed to set volume: {e}")
     
@@ -137,11 +291,7 @@ class AudioManager:
         
         if self.audio_available:
             try:
-                mixer_info = pygame.mixer.get_init()
-                if mixer_info:
-                    info['mixer_frequency'] = mixer_info[0]
-                    info['mixer_format'] = mixer_info[1] 
-                    info['mixer_channels'] = mixer_info[2]
+                info.update(self.backend.get_info())
             except:
                 pass
         
@@ -154,6 +304,7 @@ class AudioManager:
         print(f"Available: {info['available']}")
         print(f"Playing: {info['playing']}")
         print(f"Tone Frequency: {info['frequency']}Hz")
+        print(f"Backend: {info.get('backend', 'unknown')}")
         
         if info['available']:
             print(f"Sample Rate: {info.get('mixer_frequency', 'unknown')}Hz")
@@ -164,10 +315,12 @@ class AudioManager:
     
     def cleanup(self):
         """Clean up audio resources"""
+        # Don't close the device while the worker is still opening it
+        self.ready.wait(2.0)
         try:
             self.stop_tone()
             if self.audio_available:
-                pygame.mixer.quit()
+                self.backend.close()
         except Exception as e:
             print(f"Audio cleanup failed: {e}")
     
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Batch Render Module - Parallel practice corpus generation
+Renders every text in a directory or manifest at every WPM/pitch combination
+across a process pool, and writes a JSON summary with per-file timing.
+Runs headless: no Tk and no pygame mixer are needed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from channel_impairments import ChannelImpairment
+from text_to_wav import render_text_file
+
+
+def find_texts(source):
+    """
+    List the text files to render
+
+    Args:
+        source (str): Directory of .txt files, or a manifest file listing one
+            path per line (relative to the manifest; '#' starts a comment)
+
+    Returns:
+        list: Text file paths
+    """
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source)
+                      if name.lower().endswith('.txt'))
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, 'r', encoding='utf-8') as manifest:
+        for line in manifest:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def build_jobs(texts, wpms, frequencies, output_dir, sample_rate, rise_time, impairment=None,
+               use_bank=False):
+    """
+    Expand the text list and settings matrix into one job per output file
+
+    Outputs keep each text's path relative to the texts' common directory, so
+    same-named lessons from different folders land in matching subfolders
+    instead of overwriting each other.
+
+    Args:
+        use_bank (bool): Render from memory-mapped PCMBanks shared by all workers
+        impairment (dict): ChannelImpairment keyword arguments, or None for
+            clean audio. A 'seed' entry is offset by the job number so every
+            file gets its own but reproducible band conditions.
+
+    Returns:
+        list: Job dictionaries accepted by render_job
+
+    Raises:
+        ValueError: If two texts would render to the same output file
+    """
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in texts]) if texts else ''
+    jobs = []
+    outputs = {}
+    for path in texts:
+        stem = os.path.relpath(os.path.splitext(os.path.abspath(path))[0], root)
+        key = os.path.normcase(stem)
+        if key in outputs:
+            raise ValueError(f"{path} and {outputs[key]} would render to the same files")
+        outputs[key] = path
+        for wpm in wpms:
+            for frequency in frequencies:
+                jobs.append({
+                    'input': path,
+                    'output': os.path.join(output_dir, f"{stem}_{wpm}wpm_{frequency:g}hz.wav"),
+                    'wpm': wpm,
+                    'frequency': frequency,
+                    'sample_rate': sample_rate,
+                    'rise_time': rise_time,
+                    'impairment': impairment,
+                    'use_bank': use_bank
+                })
+    if impairment and impairment.get('seed') is not None:
+        for number, job in enumerate(jobs):
+            job['impairment'] = dict(impairment, seed=impairment['seed'] + number)
+    return jobs
+
+
+def render_job(job):
+    """
+    Render one job in a worker process
+
+    Args:
+        job (dict): Entry from build_jobs
+
+    Returns:
+        dict: The job plus its result or error
+    """
+    result = dict(job)
+    try:
+        os.makedirs(os.path.dirname(job['output']) or '.', exist_ok=True)
+        impairment = None
+        if job['impairment']:
+            impairment = ChannelImpairment(job['sample_rate'], **job['impairment'])
+        result.update(render_text_file(job['input'], job['output'], job['wpm'],
+                                       job['frequency'], job['sample_rate'],
+                                       rise_time=job['rise_time'], impairment=impairment,
+                                       use_bank=job['use_bank']))
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    return result
+
+
+def run_batch(jobs, workers=None, progress=print, log_path=None):
+    """
+    Render jobs across a process pool
+
+    Args:
+        jobs (list): Jobs from build_jobs
+        workers (int): Worker processes (default: one per CPU)
+        progress (callable): Called with a status line as each job finishes
+        log_path (str): JSON Lines file each result is appended to as soon as
+            its job finishes, so an interrupted batch still records what it
+            rendered (None for no log)
+
+    Returns:
+        dict: Summary with totals and per-job results (realtime_factor is None
+            when no wall time was measured, so the summary stays valid JSON)
+    """
+    start = time.perf_counter()
+    results = []
+    log = open(log_path, 'a', encoding='utf-8') if log_path else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_job, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                if log is not None:
+                    log.write(json.dumps(result, allow_nan=False) + '\n')
+                    log.flush()
+                if result['status'] == 'ok':
+                    progress(f"[{done}/{len(jobs)}] ✓ {result['output']} "
+                             f"({result['wall_seconds']:.2f}s)")
+                else:
+                    progress(f"[{done}/{len(jobs)}] ✗ {result['output']}: {result['error']}")
+    finally:
+        if log is not None:
+            log.close()
+
+    results.sort(key=lambda r: r['output'])
+    ok = [r for r in results if r['status'] == 'ok']
+    wall = time.perf_counter() - start
+    audio = sum(r['audio_seconds'] for r in ok)
+    return {
+        'jobs': len(jobs),
+        'succeeded': len(ok),
+        'failed': len(results) - len(ok),
+        'audio_seconds': audio,
+        'wall_seconds': wall,
+        'realtime_factor': audio / wall if wall > 0 else None,
+        'results': results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a practice corpus at several speeds and pitches")
+    parser.add_argument('source', help="Directory of .txt files or a manifest listing them")
+    parser.add_argument('output_dir', help="Directory for the rendered WAV files")
+    parser.add_argument('--wpm', type=int, nargs='+', default=[20], help="Speeds to render (default 20)")
+    parser.add_argument('--frequency', type=float, nargs='+', default=[600],
+                        help="Tones in Hz to render (default 600)")
+    parser.add_argument('--sample-rate', type=int, default=22050, help="Sample rate (default 22050)")
+    parser.add_argument('--rise-time', type=float, default=5.0,
+                        help="Rise/fall time in ms, 0 for hard keying (default 5)")
+    parser.add_argument('--snr', type=float, default=None, help="Add white noise at this SNR in dB")
+    parser.add_argument('--qsb', type=float, default=None, help="Add fading with this bandwidth in Hz")
+    parser.add_argument('--qrn', type=float, default=None, help="Add this many static crashes per second")
+    parser.add_argument('--seed', type=int, default=None, help="Base seed for reproducible impairments")
+    parser.add_argument('--bank', action='store_true',
+                        help="Share memory-mapped letter banks between workers (see pcm_bank.py)")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--summary', default=None,
+                        help="Summary JSON path (default: OUTPUT_DIR/summary.json)")
+    parser.add_argument('--log', default=None,
+                        help="JSON Lines file each result is appended to as it finishes "
+                             "(default: OUTPUT_DIR/results.jsonl)")
+    args = parser.parse_args(argv)
+
+    texts = find_texts(args.source)
+    if not texts:
+        print(f"✗ No texts found in {args.source}")
+        return 1
+
+    impairment = None
+    if args.snr is not None or args.qsb or args.qrn:
+        impairment = {'snr_db': args.snr, 'fading_rate': args.qsb, 'qrn_rate': args.qrn,
+                      'seed': args.seed}
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    try:
+        jobs = build_jobs(texts, args.wpm, args.frequency, args.output_dir,
+                          args.sample_rate, args.rise_time / 1000.0, impairment, args.bank)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+    print(f"Rendering {len(texts)} texts x {len(args.wpm)} speeds x "
+          f"{len(args.frequency)} tones = {len(jobs)} files")
+
+    log_path = args.log or os.path.join(args.output_dir, 'results.jsonl')
+    summary = run_batch(jobs, args.jobs, log_path=log_path)
+    summary_path = args.summary or os.path.join(args.output_dir, 'summary.json')
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, allow_nan=False)
+
+    speed = summary['realtime_factor']
+    speed = f"{speed:.0f}x real time" if speed is not None else "real time not measured"
+    print(f"✓ {summary['succeeded']}/{summary['jobs']} files in {summary['wall_seconds']:.1f}s "
+          f"({speed}), summary: {summary_path}")
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
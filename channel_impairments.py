@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Channel Impairments Module - Receive-side band conditions for practice audio
+Adds white noise at a target SNR, slow Rayleigh/Rice fading (QSB) and
+impulsive static crashes (QRN) to any PCM stream, one block at a time.
+Each effect draws from its own seeded generator in sample order, so the
+same seed reproduces the same degraded audio whatever the block size.
+"""
+
+import argparse
+import sys
+import time
+import wave
+
+import numpy as np
+
+from tone_generator import DEFAULT_AMPLITUDE, INT16_MAX
+
+# Fading is generated at this control rate and interpolated per sample
+FADING_CONTROL_RATE = 100.0
+
+# Frames per block when processing files
+BLOCK_FRAMES = 8192
+
+
+class ChannelImpairment:
+    """Seedable block processor for AWGN, QSB fading and QRN crashes"""
+
+    def __init__(self, sample_rate=22050, snr_db=None, fading_rate=None, rice_k=0.0,
+                 qrn_rate=None, qrn_level=0.5, reference_amplitude=DEFAULT_AMPLITUDE, seed=None):
+        """
+        Args:
+            sample_rate (int): Sample rate in Hz
+            snr_db (float): Signal-to-noise ratio in dB, None for no noise
+            fading_rate (float): QSB bandwidth in Hz (e.g. 0.1-1), None for no fading
+            rice_k (float): Rice K factor, steady to scattered power (0 = Rayleigh)
+            qrn_rate (float): Average static crashes per second, None for none
+            qrn_level (float): Peak crash level, full scale = 1.0
+            reference_amplitude (float): Peak tone level the SNR is measured against
+            seed (int): Seed for all random draws
+        """
+        self.sample_rate = sample_rate
+        self.snr_db = snr_db
+        self.fading_rate = fading_rate
+        self.rice_k = rice_k
+        self.qrn_rate = qrn_rate
+        self.qrn_level = qrn_level
+
+        noise_seq, fading_seq, onset_seq, crash_seq = np.random.SeedSequence(seed).spawn(4)
+        self.noise_rng = np.random.default_rng(noise_seq)
+        self.fading_rng = np.random.default_rng(fading_seq)
+        self.onset_rng = np.random.default_rng(onset_seq)
+        self.crash_rng = np.random.default_rng(crash_seq)
+
+        # Noise sigma for the target SNR against a sine of the reference amplitude
+        if snr_db is not None:
+            signal_power = reference_amplitude ** 2 / 2
+            self.noise_sigma = np.sqrt(signal_power / 10 ** (snr_db / 10))
+        else:
+            self.noise_sigma = 0.0
+
+        # Fading state: one-pole low-pass over complex Gaussian control points
+        if fading_rate:
+            self.control_step = sample_rate / FADING_CONTROL_RATE
+            self.fading_pole = np.exp(-2 * np.pi * fading_rate / FADING_CONTROL_RATE)
+            # Keeps the filtered scatter component at unit power
+            self.fading_input_gain = np.sqrt((1 + self.fading_pole) / (1 - self.fading_pole) / 2)
+            self.fading_state = complex(self.fading_rng.normal(), self.fading_rng.normal()) / np.sqrt(2)
+            # Last two control points (time in samples, gain) bracket the next block's start
+            self.control_index = 0
+            gain = self.fading_gain(self.fading_state)
+            self.control_points = ([-self.control_step, 0.0], [gain, gain])
+
+        self.position = 0
+        self.qrn_tail = np.zeros(0, dtype=np.float32)
+
+    def fading_gain(self, scatter):
+        """Envelope gain for a scatter component, Rice when rice_k > 0"""
+        k = self.rice_k
+        return np.abs(np.sqrt(k / (k + 1)) + np.sqrt(1 / (k + 1)) * scatter)
+
+    def fading_block(self, frames):
+        """
+        Per-sample fading gains for the next block
+
+        Args:
+            frames (int): Block length
+
+        Returns:
+            numpy.ndarray: float32 gains
+        """
+        end = self.position + frames
+        needed = int(np.ceil(end / self.control_step)) - self.control_index
+        times, gains = self.control_points
+        if needed > 0:
+            raw = self.fading_rng.normal(size=(needed, 2)) @ np.array([1, 1j]) * self.fading_input_gain
+            state = self.fading_state
+            # Control-rate recursion: a handful of points per block
+            filtered = np.empty(needed, dtype=complex)
+            for i, x in enumerate(raw):
+                state = self.fading_pole * state + (1 - self.fading_pole) * x
+                filtered[i] = state
+            self.fading_state = state
+            times = times + list((self.control_index + 1 + np.arange(needed)) * self.control_step)
+            gains = gains + list(self.fading_gain(filtered))
+            self.control_index += needed
+            self.control_points = (times[-2:], gains[-2:])
+        return np.interp(np.arange(self.position, end), times, gains).astype(np.float32)
+
+    def qrn_block(self, frames):
+        """
+        Static crashes for the next block, including tails of earlier crashes
+
+        Args:
+            frames (int): Block length
+
+        Returns:
+            numpy.ndarray: float32 samples
+        """
+        out = np.zeros(frames, dtype=np.float32)
+        carried = min(len(self.qrn_tail), frames)
+        out[:carried] = self.qrn_tail[:carried]
+        tail = self.qrn_tail[carried:]
+
+        onsets = np.flatnonzero(self.onset_rng.random(frames) < self.qrn_rate / self.sample_rate)
+        for onset in onsets:
+            # Sharp attack, exponential decay of 2-20 ms
+            tau = self.crash_rng.uniform(0.002, 0.02) * self.sample_rate
+            length = int(5 * tau)
+            level = self.qrn_level * self.crash_rng.uniform(0.2, 1.0)
+            crash = (self.crash_rng.standard_normal(length) * level *
+                     np.exp(-np.arange(length) / tau)).astype(np.float32)
+            fits = min(length, frames - onset)
+            out[onset:onset + fits] += crash[:fits]
+            if fits < length:
+                spill = crash[fits:]
+                grown = np.zeros(max(len(tail), len(spill)), dtype=np.float32)
+                grown[:len(tail)] = tail
+                grown[:len(spill)] += spill
+                tail = grown
+        self.qrn_tail = tail
+        return out
+
+    def process(self, block):
+        """
+        Impair one block of PCM
+
+        Args:
+            block (numpy.ndarray): int16 samples, or float samples at full scale 1.0
+
+        Returns:
+            numpy.ndarray: Impaired block in the same dtype
+        """
+        is_int = block.dtype == np.int16
+        x = block.astype(np.float32) / INT16_MAX if is_int else block.astype(np.float32)
+        frames = len(x)
+
+        if self.fading_rate:
+            x *= self.fading_block(frames)
+        if self.noise_sigma:
+            x += self.noise_rng.standard_normal(frames, dtype=np.float32) * np.float32(self.noise_sigma)
+        if self.qrn_rate:
+            x += self.qrn_block(frames)
+        self.position += frames
+
+        if is_int:
+            return (np.clip(x, -1.0, 1.0) * INT16_MAX).astype(np.int16)
+        return x
+
+    def iter_blocks(self, blocks):
+        """
+        Impair a stream of blocks
+
+        Args:
+            blocks: Iterable of PCM blocks
+
+        Yields:
+            numpy.ndarray: Impaired blocks
+        """
+        for block in blocks:
+            yield self.process(block)
+
+
+def impair_wav(input_path, output_path, impairment, block_frames=BLOCK_FRAMES):
+    """
+    Stream a mono 16-bit WAV through an impairment stage
+
+    Returns:
+        float: Seconds of audio processed
+    """
+    with wave.open(input_path, 'rb') as src, wave.open(output_path, 'wb') as dst:
+        if src.getnchannels() != 1 or src.getsampwidth() != 2:
+            raise ValueError("Expected a mono 16-bit WAV")
+        dst.setnchannels(1)
+        dst.setsampwidth(2)
+        dst.setframerate(src.getframerate())
+        frames = 0
+        while True:
+            data = src.readframes(block_frames)
+            if not data:
+                break
+            block = np.frombuffer(data, dtype='<i2').astype(np.int16)
+            dst.writeframes(impairment.process(block).astype('<i2', copy=False).tobytes())
+            frames += len(block)
+        return frames / src.getframerate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add noise, fading and static to practice audio")
+    parser.add_argument('input', help="Mono 16-bit WAV to read")
+    parser.add_argument('output', help="WAV file to write")
+    parser.add_argument('--snr', type=float, default=None, help="Signal-to-noise ratio in dB")
+    parser.add_argument('--qsb', type=float, default=None, help="Fading bandwidth in Hz (e.g. 0.2)")
+    parser.add_argument('--rice-k', type=float, default=0.0,
+                        help="Rice K factor for fading, 0 for Rayleigh (default 0)")
+    parser.add_argument('--qrn', type=float, default=None, help="Static crashes per second")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for reproducible output")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Report seconds of audio processed per second of wall time")
+    args = parser.parse_args(argv)
+
+    with wave.open(args.input, 'rb') as src:
+        sample_rate = src.getframerate()
+    impairment = ChannelImpairment(sample_rate, args.snr, args.qsb, args.rice_k, args.qrn,
+                                   seed=args.seed)
+    start = time.perf_counter()
+    audio = impair_wav(args.input, args.output, impairment)
+    wall = time.perf_counter() - start
+
+    print(f"✓ {audio:.1f}s of audio -> {args.output}")
+    if args.benchmark:
+        print(f"Processed in {wall:.3f}s ({audio / wall:.0f}x real time)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Code Tables Module - Compiled Morse alphabets
+Each alphabet is defined as (symbol, code) pairs and compiled once into
+structures every MorseDecoder using it shares: a code-to-symbol list indexed
+by the binary form of the dit/dah sequence, a code-to-symbol dict, a
+symbol-to-code dict and the dit/dah state table. Two symbols claiming one
+code is an error at build time; a symbol that is just another name for a
+code (like '=' for BT) is declared as an alias, which only encodes.
+"""
+
+import argparse
+import sys
+
+# Longest code any table may hold; sets the size of the binary index
+MAX_CODE_LENGTH = 9
+
+# Digits are the same in every table here
+DIGITS = (
+    ('1', '.----'), ('2', '..---'), ('3', '...--'), ('4', '....-'), ('5', '.....'),
+    ('6', '-....'), ('7', '--...'), ('8', '---..'), ('9', '----.'), ('0', '-----'),
+)
+
+# Each alphabet: display name, (symbol, code) pairs and aliases. A symbol
+# listed more than once encodes as its first code and decodes from all.
+ALPHABETS = {
+    'itu': {
+        'name': "International (ITU)",
+        'codes': (
+            ('A', '.-'), ('B', '-...'), ('C', '-.-.'), ('D', '-..'), ('E', '.'),
+            ('F', '..-.'), ('G', '--.'), ('H', '....'), ('I', '..'), ('J', '.---'),
+            ('K', '-.-'), ('L', '.-..'), ('M', '--'), ('N', '-.'), ('O', '---'),
+            ('P', '.--.'), ('Q', '--.-'), ('R', '.-.'), ('S', '...'), ('T', '-'),
+            ('U', '..-'), ('V', '...-'), ('W', '.--'), ('X', '-..-'), ('Y', '-.--'),
+            ('Z', '--..'),
+        ) + DIGITS + (
+            (',', '--..--'), ('.', '.-.-.-'), ('?', '..--..'), ("'", '.----.'), ('!', '-.-.--'),
+            ('/', '-..-.'), ('(', '-.--.'), (')', '-.--.-'), ('&', '.-...'), (':', '---...'),
+            (';', '-.-.-.'), ('-', '-....-'), ('_', '..--.-'), ('"', '.-..-.'), ('$', '...-..-'),
+            ('@', '.--.-.'),
+            # Prosigns: sent as one character, decoded by their on-air names
+            ('AR', '.-.-.'), ('AR', '.-.-'), ('BT', '-...-'), ('SK', '...-.-'), ('VE', '...-.'),
+        ),
+        'aliases': {'=': '-...-', '+': '.-.-.'},
+    },
+    'american': {
+        'name': "American (railroad)",
+        # Only the characters made of plain dits and dahs; C, O, R, Y, Z, &
+        # need spaces inside the character and L, 0 long dashes, which the
+        # keying tabs cannot produce
+        'codes': (
+            ('A', '.-'), ('B', '-...'), ('D', '-..'), ('E', '.'), ('F', '.-.'),
+            ('G', '--.'), ('H', '....'), ('I', '..'), ('J', '-.-.'), ('K', '-.-'),
+            ('M', '--'), ('N', '-.'), ('P', '.....'), ('Q', '..-.'), ('S', '...'),
+            ('T', '-'), ('U', '..-'), ('V', '...-'), ('W', '.--'), ('X', '.-..'),
+            ('1', '.--.'), ('2', '..-..'), ('3', '...-.'), ('4', '....-'), ('5', '---'),
+            ('6', '......'), ('7', '--..'), ('8', '-....'), ('9', '-..-'),
+            ('.', '..--..'), (',', '.-.-'), ('?', '-..-.'), ('!', '---.'),
+        ),
+        'aliases': {},
+    },
+    'wabun': {
+        'name': "Wabun (Japanese kana)",
+        'codes': (
+            ('イ', '.-'), ('ロ', '.-.-'), ('ハ', '-...'), ('ニ', '-.-.'), ('ホ', '-..'),
+            ('ヘ', '.'), ('ト', '..-..'), ('チ', '..-.'), ('リ', '--.'), ('ヌ', '....'),
+            ('ル', '-.--.'), ('ヲ', '.---'), ('ワ', '-.-'), ('カ', '.-..'), ('ヨ', '--'),
+            ('タ', '-.'), ('レ', '---'), ('ソ', '---.'), ('ツ', '.--.'), ('ネ', '--.-'),
+            ('ナ', '.-.'), ('ラ', '...'), ('ム', '-'), ('ウ', '..-'), ('ヰ', '.-..-'),
+            ('ノ', '..--'), ('オ', '.-...'), ('ク', '...-'), ('ヤ', '.--'), ('マ', '-..-'),
+            ('ケ', '-.--'), ('フ', '--..'), ('コ', '----'), ('エ', '-.---'), ('テ', '.-.--'),
+            ('ア', '--.--'), ('サ', '-.-.-'), ('キ', '-.-..'), ('ユ', '-..--'), ('メ', '-...-'),
+            ('ミ', '..-.-'), ('シ', '--.-.'), ('ヱ', '.--..'), ('ヒ', '--..-'), ('モ', '-..-.'),
+            ('セ', '.---.'), ('ス', '---.-'), ('ン', '.-.-.'),
+            ('゛', '..'), ('゜', '..--.'), ('ー', '.--.-'), ('、', '.-.-.-'), ('」', '.-.-..'),
+            ('（', '-.--.-'), ('）', '.-..-.'),
+        ) + DIGITS,
+        'aliases': {},
+    },
+    'cyrillic': {
+        'name': "Cyrillic (Russian)",
+        'codes': (
+            ('А', '.-'), ('Б', '-...'), ('В', '.--'), ('Г', '--.'), ('Д', '-..'),
+            ('Е', '.'), ('Ж', '...-'), ('З', '--..'), ('И', '..'), ('Й', '.---'),
+            ('К', '-.-'), ('Л', '.-..'), ('М', '--'), ('Н', '-.'), ('О', '---'),
+            ('П', '.--.'), ('Р', '.-.'), ('С', '...'), ('Т', '-'), ('У', '..-'),
+            ('Ф', '..-.'), ('Х', '....'), ('Ц', '-.-.'), ('Ч', '---.'), ('Ш', '----'),
+            ('Щ', '--.-'), ('Ъ', '--.--'), ('Ы', '-.--'), ('Ь', '-..-'), ('Э', '..-..'),
+            ('Ю', '..--'), ('Я', '.-.-'),
+        ) + DIGITS,
+        'aliases': {'Ё': '.'},
+    },
+    'greek': {
+        'name': "Greek",
+        'codes': (
+            ('Α', '.-'), ('Β', '-...'), ('Γ', '--.'), ('Δ', '-..'), ('Ε', '.'),
+            ('Ζ', '--..'), ('Η', '....'), ('Θ', '-.-.'), ('Ι', '..'), ('Κ', '-.-'),
+            ('Λ', '.-..'), ('Μ', '--'), ('Ν', '-.'), ('Ξ', '-..-'), ('Ο', '---'),
+            ('Π', '.--.'), ('Ρ', '.-.'), ('Σ', '...'), ('Τ', '-'), ('Υ', '-.--'),
+            ('Φ', '..-.'), ('Χ', '----'), ('Ψ', '--.-'), ('Ω', '.--'),
+        ) + DIGITS,
+        'aliases': {},
+    },
+}
+
+DEFAULT_ALPHABET = 'itu'
+
+
+def code_index(code):
+    """
+    Binary form of a dit/dah sequence: a leading 1, then 0 per dit and 1 per dah
+
+    Args:
+        code (str): Sequence of '.' and '-'
+
+    Returns:
+        int: Index into CodeTable.symbols (1 for the empty sequence)
+    """
+    index = 1
+    for element in code:
+        index = index * 2 + (element == '-')
+    return index
+
+
+def compile_state_table(decode):
+    """
+    Compile a code-to-symbol dict into a dit/dah tree stored as flat lists
+
+    State 0 is the empty sequence. next_state[s] holds the states reached by
+    a dot and by a dash (-1 where no code continues), state_char[s] the
+    symbol the path to s spells (None if it is only a prefix) and
+    state_extendable[s] whether any longer code starts with that path.
+
+    Returns:
+        tuple: (next_state, state_char, state_extendable)
+    """
+    next_state = [[-1, -1]]
+    state_char = [None]
+    for sequence, char in decode.items():
+        state = 0
+        for element in sequence:
+            branch = 0 if element == '.' else 1
+            if next_state[state][branch] < 0:
+                next_state[state][branch] = len(next_state)
+                next_state.append([-1, -1])
+                state_char.append(None)
+            state = next_state[state][branch]
+        state_char[state] = char
+    state_extendable = [dot >= 0 or dash >= 0 for dot, dash in next_state]
+    return next_state, state_char, state_extendable
+
+
+class CodeTable:
+    """One alphabet compiled for lookup in both directions"""
+
+    def __init__(self, key, name, codes, aliases=None):
+        """
+        Args:
+            key (str): Short name used to select the table
+            name (str): Display name
+            codes: (symbol, code) pairs; a repeated symbol decodes from every
+                code and encodes as its first
+            aliases (dict): Extra symbol -> code entries that only encode
+
+        Raises:
+            ValueError: If two symbols share a code, an alias points at a
+                code not in the table, or a code is malformed
+        """
+        self.key = key
+        self.name = name
+        self.decode = {}
+        self.encode = {}
+        for symbol, code in codes:
+            if not code or len(code) > MAX_CODE_LENGTH or code.strip('.-'):
+                raise ValueError(f"{key}: bad code {code!r} for {symbol!r}")
+            other = self.decode.get(code)
+            if other is not None and other != symbol:
+                raise ValueError(f"{key}: {code} is both {other!r} and {symbol!r}; "
+                                 f"declare one as an alias")
+            self.decode[code] = symbol
+            self.encode.setdefault(symbol, code)
+        for symbol, code in (aliases or {}).items():
+            if code not in self.decode:
+                raise ValueError(f"{key}: alias {symbol!r} uses {code}, which is not in the table")
+            self.encode.setdefault(symbol, code)
+
+        # Symbol for every possible sequence up to MAX_CODE_LENGTH, by binary form
+        self.symbols = [None] * (2 << MAX_CODE_LENGTH)
+        for code, symbol in self.decode.items():
+            self.symbols[code_index(code)] = symbol
+        self.next_state, self.state_char, self.state_extendable = compile_state_table(self.decode)
+
+    def lookup(self, code):
+        """
+        Symbol for a dit/dah sequence
+
+        Returns:
+            str: The symbol, or None if no code matches
+        """
+        if len(code) > MAX_CODE_LENGTH:
+            return None
+        return self.symbols[code_index(code)]
+
+
+# Compiled tables, shared by every decoder
+TABLES = {}
+
+
+def get_table(key=DEFAULT_ALPHABET):
+    """
+    Compiled table for an alphabet, building it on first use
+
+    Raises:
+        KeyError: If there is no such alphabet
+    """
+    table = TABLES.get(key)
+    if table is None:
+        definition = ALPHABETS[key]
+        table = TABLES[key] = CodeTable(key, definition['name'], definition['codes'],
+                                        definition['aliases'])
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile and check the Morse code tables")
+    parser.add_argument('--show', choices=sorted(ALPHABETS), help="Print one table's codes")
+    args = parser.parse_args(argv)
+
+    print(f"{'key':<10} {'alphabet':<24} {'codes':>5} {'symbols':>7} {'longest':>7}")
+    for key in ALPHABETS:
+        try:
+            table = get_table(key)
+        except ValueError as e:
+            print(f"✗ {e}")
+            return 1
+        print(f"{key:<10} {table.name:<24} {len(table.decode):>5} {len(table.encode):>7} "
+              f"{max(map(len, table.decode)):>7}")
+    print("✓ All tables compiled without collisions")
+    if args.show:
+        table = get_table(args.show)
+        for symbol, code in table.encode.items():
+            print(f"  {symbol:<3} {code}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
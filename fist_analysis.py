@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Fist Analysis Module - Where a sender's timing departs from PARIS
+Takes a whole session's marks and spaces (MorseDecoder.timing_log, or a
+timing log file) and measures every element against its ideal length at
+the sender's local speed: per element kind with deviation histograms, per
+character, the dah:dit and gap ratios, and the characters sent worst. All
+of it is NumPy over the session arrays, so 100k+ element sessions take a
+fraction of a second.
+
+Run this file directly to analyze timing logs, or generated ones, and
+print the report or write it as JSON.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from adaptive_timing import AdaptiveTiming, load_log, synthesize_log
+from code_tables import DEFAULT_ALPHABET, MAX_CODE_LENGTH, get_table
+from morse_decoder import DOT, DASH, ELEMENT_GAP, LETTER_GAP, WORD_GAP, EVENT_UNITS, PAUSE_UNITS
+
+# Element kinds in report order
+KIND_NAMES = ('dit', 'dah', 'element gap', 'letter gap', 'word gap')
+
+# Timing samples (marks and element gaps) either side of an event that
+# set its local dot length, so speed drift is not counted as error
+UNIT_WINDOW = 25
+
+# Histogram bin edges for deviation from ideal, as a fraction of the ideal
+# length; anything beyond +-100% lands in the end bins
+DEVIATION_BINS = np.linspace(-1.0, 1.0, 21)
+
+# A character needs this many letters to be ranked, and this many are listed
+MIN_CHAR_COUNT = 3
+WORST_COUNT = 5
+
+# Blocks for the text histograms, emptiest first
+BARS = ' ▁▂▃▄▅▆▇█'
+
+
+def classify_log(durations, wpm=20):
+    """
+    Mark and space kinds for a timing log, as the adaptive decoder reads it live
+
+    Args:
+        durations: Signed durations in seconds (positive key down)
+        wpm (int): Starting speed estimate
+
+    Returns:
+        tuple: (durations in seconds, int8 kinds DOT ... WORD_GAP)
+    """
+    timing = AdaptiveTiming(wpm)
+    kinds = np.empty(len(durations), dtype=np.int8)
+    for index, duration in enumerate(durations):
+        if duration > 0:
+            kinds[index] = DOT if timing.add_mark(duration) == '.' else DASH
+        else:
+            kinds[index] = ELEMENT_GAP + timing.add_gap(-duration)
+    return np.abs(np.asarray(durations, dtype=float)), kinds
+
+
+def local_units(durations, kinds):
+    """
+    Dot length around each event: the mean of the nearest marks and element
+    gaps, each divided by its nominal length in dots
+    """
+    nominal = np.asarray(EVENT_UNITS)[kinds]
+    sample = kinds <= ELEMENT_GAP
+    samples = durations[sample] / nominal[sample]
+    sums = np.concatenate(([0.0], np.cumsum(samples)))
+    # Samples before each event; the window is centred there
+    before = np.cumsum(sample) - sample
+    low = np.clip(before - UNIT_WINDOW, 0, len(samples))
+    high = np.clip(before + UNIT_WINDOW + 1, 1, len(samples))
+    low = np.minimum(low, high - 1)
+    return (sums[high] - sums[low]) / (high - low)
+
+
+def letter_codes(kinds, letter):
+    """
+    Binary code index (see code_tables.code_index) and length of each letter
+
+    Args:
+        kinds: Mark kinds (DOT/DASH) in order
+        letter: Letter number of each mark
+
+    Returns:
+        tuple: (int64 code indexes, int64 lengths), one per letter
+    """
+    lengths = np.bincount(letter)
+    first = np.cumsum(lengths) - lengths
+    position = np.arange(len(letter)) - first[letter]
+    shift = np.clip(lengths[letter] - 1 - position, 0, 62)
+    bits = (kinds == DASH).astype(np.int64) << shift
+    indexes = (np.int64(1) << np.clip(lengths, 0, 62)) + np.bincount(letter, weights=bits).astype(np.int64)
+    return indexes, lengths
+
+
+def mean_or_none(total, count):
+    """total / count as a float rounded for the report, None when count is 0"""
+    return round(float(total) / count, 3) if count else None
+
+
+def analyze(durations, kinds, alphabet=DEFAULT_ALPHABET):
+    """
+    Measure a session's fist against PARIS timing
+
+    Args:
+        durations: Mark and space lengths in seconds (all positive)
+        kinds: Event kind of each (DOT, DASH, ELEMENT_GAP, LETTER_GAP, WORD_GAP)
+        alphabet (str): Code table the letters were keyed in
+
+    Returns:
+        dict: JSON-ready report; lengths are in local dots, deviations are
+            fractions of the ideal length (+0.2 = 20% long)
+    """
+    durations = np.asarray(durations, dtype=float)
+    kinds = np.asarray(kinds, dtype=np.int8)
+    marks = np.flatnonzero(kinds <= DASH)
+    if len(marks) == 0:
+        return {'marks': 0}
+    # Silence before the first mark is not part of the sending
+    durations = durations[marks[0]:]
+    kinds = kinds[marks[0]:]
+
+    unit = local_units(durations, kinds)
+    length = durations / unit
+    deviation = length / np.asarray(EVENT_UNITS)[kinds] - 1.0
+    pause = (kinds == WORD_GAP) & (length > PAUSE_UNITS)
+    timed = ~pause
+    is_mark = kinds <= DASH
+
+    elements = {}
+    for kind, name in enumerate(KIND_NAMES):
+        chosen = deviation[timed & (kinds == kind)]
+        histogram = np.histogram(np.clip(chosen, DEVIATION_BINS[0], DEVIATION_BINS[-1]),
+                                 bins=DEVIATION_BINS)[0]
+        elements[name] = {
+            'count': int(len(chosen)),
+            'ideal': EVENT_UNITS[kind],
+            'mean': mean_or_none(length[timed & (kinds == kind)].sum(), len(chosen)),
+            'deviation': mean_or_none(chosen.sum(), len(chosen)),
+            'spread': round(float(chosen.std()), 3) if len(chosen) else None,
+            'histogram': histogram.tolist(),
+        }
+
+    # Letters end at letter gaps, word gaps and pauses
+    ends = kinds >= LETTER_GAP
+    letter = np.cumsum(ends) - ends
+    mark_letter = letter[is_mark]
+    indexes, lengths = letter_codes(kinds[is_mark], mark_letter)
+    symbols = np.array(get_table(alphabet).symbols, dtype=object)
+    known = lengths <= MAX_CODE_LENGTH
+    chars = np.full(len(lengths), None, dtype=object)
+    chars[known] = symbols[indexes[known]]
+    unknown = np.flatnonzero(np.equal(chars, None))
+    for index in unknown:
+        # Few enough to spell out one by one
+        chars[index] = '[' + bin(indexes[index])[3:].replace('0', '.').replace('1', '-') + ']'
+    names, which = np.unique(chars.astype(str), return_inverse=True)
+    counts = np.bincount(which, minlength=len(names))
+
+    # Deviation of each letter's marks and element gaps, summed per character
+    inside = timed & (kinds <= ELEMENT_GAP)
+    owner = which[letter[inside]]
+    absolute = np.bincount(owner, weights=np.abs(deviation[inside]), minlength=len(names))
+    samples = np.bincount(owner, minlength=len(names))
+    by_kind = []
+    for kind in (DOT, DASH, ELEMENT_GAP):
+        chosen = inside & (kinds == kind)
+        by_kind.append((np.bincount(which[letter[chosen]], weights=deviation[chosen], minlength=len(names)),
+                        np.bincount(which[letter[chosen]], minlength=len(names))))
+    characters = {}
+    for index, name in enumerate(names.tolist()):
+        characters[name] = {
+            'count': int(counts[index]),
+            'deviation': mean_or_none(absolute[index], samples[index]),
+            'dit': mean_or_none(by_kind[0][0][index], by_kind[0][1][index]),
+            'dah': mean_or_none(by_kind[1][0][index], by_kind[1][1][index]),
+            'gap': mean_or_none(by_kind[2][0][index], by_kind[2][1][index]),
+        }
+
+    worst = []
+    ranked = sorted((entry['deviation'], name) for name, entry in characters.items()
+                    if entry['count'] >= MIN_CHAR_COUNT and entry['deviation'] is not None
+                    and not name.startswith('['))
+    for score, name in reversed(ranked[-WORST_COUNT:]):
+        entry = characters[name]
+        # The element kind furthest off on average says what goes wrong
+        part, off = max(((part, entry[part]) for part in ('dit', 'dah', 'gap')
+                         if entry[part] is not None), key=lambda item: abs(item[1]))
+        worst.append({'char': name, 'count': entry['count'], 'deviation': score,
+                      'fault': f"{part}s {abs(off):.0%} {'long' if off > 0 else 'short'}"})
+
+    dot = elements['dit']['mean']
+    return {
+        'marks': int(is_mark.sum()),
+        'letters': int(len(lengths)),
+        'unknown': int(len(unknown)),
+        'pauses': int(pause.sum()),
+        'wpm': round(float(60.0 / (np.median(unit[is_mark]) * 50)), 1),
+        'ratios': {
+            'dah_dit': round(elements['dah']['mean'] / dot, 2) if dot and elements['dah']['mean'] else None,
+            'element_gap': elements['element gap']['mean'],
+            'letter_gap': elements['letter gap']['mean'],
+            'word_gap': elements['word gap']['mean'],
+        },
+        'histogram_bins': DEVIATION_BINS.round(2).tolist(),
+        'elements': elements,
+        'characters': characters,
+        'worst': worst,
+    }
+
+
+def sparkline(counts):
+    """Histogram counts as one line of block characters"""
+    top = max(max(counts), 1)
+    return ''.join(BARS[int(round(count / top * (len(BARS) - 1)))] for count in counts)
+
+
+def format_report(report):
+    """
+    The report as monospaced text
+
+    Returns:
+        str: Summary, element table with histograms, ratios and worst characters
+    """
+    if not report.get('marks'):
+        return "No timed straight-key elements yet."
+    ratios = report['ratios']
+    lines = [f"{report['marks']} elements, {report['letters']} letters "
+             f"({report['unknown']} unknown), {report['pauses']} pauses, ~{report['wpm']} WPM",
+             "",
+             f"{'element':<12} {'count':>6} {'ideal':>5} {'mean':>5} {'off':>6} {'spread':>6}  "
+             f"-100% {'deviation':^10} +100%"]
+    for name, entry in report['elements'].items():
+        if not entry['count']:
+            continue
+        lines.append(f"{name:<12} {entry['count']:>6} {entry['ideal']:>5} {entry['mean']:>5.2f} "
+                     f"{entry['deviation']:>+6.0%} {entry['spread']:>6.0%}  "
+                     f"[{sparkline(entry['histogram'])}]")
+    lines.append("")
+    parts = [f"{label} {ratios[key]:.2f}" for label, key in
+             (("dah:dit", 'dah_dit'), ("element gap", 'element_gap'),
+              ("letter gap", 'letter_gap'), ("word gap", 'word_gap')) if ratios[key] is not None]
+    lines.append("Ratios (ideal 3 / 1 / 3 / 7 dits): " + ", ".join(parts))
+    if report['worst']:
+        lines.append("")
+        lines.append("Worst characters:")
+        for entry in report['worst']:
+            lines.append(f"  {entry['char']:<3} x{entry['count']:<5} {entry['deviation']:>4.0%} off, "
+                         f"{entry['fault']}")
+    unknown = sorted(((entry['count'], name) for name, entry in report['characters'].items()
+                      if name.startswith('[')), reverse=True)
+    if unknown:
+        lines.append("Unknown codes: " + ", ".join(f"{name} x{count}"
+                                                   for count, name in unknown[:WORST_COUNT]))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a sender's fist from timing logs")
+    parser.add_argument('logs', nargs='*', help="Timing logs (ms per line, + key down, - key up)")
+    parser.add_argument('--wpm', type=int, default=20, help="Starting speed estimate (default 20)")
+    parser.add_argument('--alphabet', default=DEFAULT_ALPHABET, help="Code table the logs were keyed in")
+    parser.add_argument('--synthesize', type=int, default=0, metavar='N',
+                        help="Analyze a generated sloppy-fist session of at least N elements")
+    parser.add_argument('--json', metavar='PATH', help="Write the report as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    durations = []
+    for path in args.logs:
+        try:
+            durations.extend(load_log(path)[0])
+        except (OSError, ValueError) as e:
+            print(f"✗ {path}: {e}")
+            return 1
+    if args.synthesize:
+        sample = "CQ CQ DE K1ABC K1ABC PSE K THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 73"
+        rng = random.Random(1)
+        while len(durations) < args.synthesize:
+            durations.extend(synthesize_log(sample, rng.randint(15, 25), rng.randint(15, 25),
+                                            jitter=0.15, dash_ratio=rng.uniform(2.6, 3.6),
+                                            seed=rng.randrange(1 << 30)) + [-1.0])
+    if not durations:
+        parser.error("give at least one log or --synthesize N")
+
+    start = time.perf_counter()
+    lengths, kinds = classify_log(durations, args.wpm)
+    classified = time.perf_counter()
+    report = analyze(lengths, kinds, args.alphabet)
+    analyzed = time.perf_counter()
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    else:
+        print(format_report(report))
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=1)
+            print(f"✓ Saved {args.json}")
+        print(f"✓ {len(durations)} elements: classified in {(classified - start) * 1000:.0f}ms, "
+              f"analyzed in {(analyzed - classified) * 1000:.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Gap Timer Module - Letter and word gap deadlines instead of polling
+After each key release one Tk timer is armed for the letter-gap deadline;
+when it fires it re-arms for the word-gap deadline. A key press cancels
+whatever is pending, so nothing runs while the key is idle.
+"""
+
+import math
+import time
+
+
+def ms_until(deadline):
+    """Whole milliseconds from now until a perf_counter() deadline, rounded up, never negative"""
+    return max(0, math.ceil((deadline - time.perf_counter()) * 1000))
+
+
+class GapTimer:
+    """One pending Tk timer for the gaps after a key release"""
+
+    def __init__(self, widget, on_letter, on_word):
+        """
+        Args:
+            widget: Any Tk widget, used for after()/after_cancel()
+            on_letter: Called with no arguments at the letter-gap deadline
+            on_word: Called with no arguments at the word-gap deadline
+        """
+        self.widget = widget
+        self.on_letter = on_letter
+        self.on_word = on_word
+        self.timer = None
+        self.word_deadline = None
+
+    def arm(self, letter_gap, word_gap, released=None):
+        """
+        Replace any pending deadline with the gaps after a release
+
+        Args:
+            letter_gap (float): Seconds of silence that end a letter
+            word_gap (float): Seconds of silence that end a word
+            released (float): perf_counter() time of the release (default: now)
+        """
+        self.cancel()
+        if released is None:
+            released = time.perf_counter()
+        self.word_deadline = released + word_gap
+        self.timer = self.widget.after(ms_until(released + letter_gap), self.letter_due)
+
+    def letter_due(self):
+        """Letter deadline reached: arm the word deadline, then report"""
+        # Re-arm first so the callback may cancel (e.g. a clear button)
+        self.timer = self.widget.after(ms_until(self.word_deadline), self.word_due)
+        self.on_letter()
+
+    def word_due(self):
+        """Word deadline reached"""
+        self.timer = None
+        self.on_word()
+
+    def cancel(self):
+        """Drop the pending deadline, if any (call on key down)"""
+        if self.timer is not None:
+            self.widget.after_cancel(self.timer)
+            self.timer = None
+
+    def is_armed(self):
+        """True while a letter or word deadline is pending"""
+        return self.timer is not None
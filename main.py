@@ -4,26 +4,34 @@ Morse Code Simulator - Main Application
 Supports both Straight Key and Paddle Key operation
 """
 
+import time
+STARTUP_START = time.perf_counter()
+
+import argparse
 import tkinter as tk
 from tkinter import ttk
-import pygame
-import time
 from tab1 import StraightKeyTab
 from tab2 import PaddleKeyTab
 from shared_controls import SharedControls
 from audio_manager import AudioManager
-from morse_decoder import MorseDecoder
+from audio_backends import backend_names
+from code_tables import ALPHABETS, DEFAULT_ALPHABET
+from morse_decoder import MorseDecoder, wpm_thresholds
+from adaptive_timing import AdaptiveTiming
+from gap_timer import GapTimer
+IMPORT_TIME = time.perf_counter() - STARTUP_START
 
 class MorseCodeSimulator:
-    def __init__(self, root):
+    def __init__(self, root, audio_backend=None, profile_startup=False, alphabet=DEFAULT_ALPHABET):
         self.root = root
         self.root.title("Morse Code Simulator - Straight Key & Paddle")
         self.root.geometry("850x650")
         self.root.configure(bg='#2c3e50')
         
-        # Initialize components
-        self.audio_manager = AudioManager()
-        self.morse_decoder = MorseDecoder()
+        # Audio opens on a worker thread so the window appears at once;
+        # keying is silent until it is ready
+        self.audio_manager = AudioManager(backend=audio_backend, background=True)
+        self.morse_decoder = MorseDecoder(alphabet)
         
         # Speed control (WPM - Words Per Minute)
         self.wpm = 20  # Default 20 WPM
@@ -31,6 +39,20 @@ class MorseCodeSimulator:
         # Initialize shared_controls to None first
         self.shared_controls = None
         
+        # Straight-key thresholds that follow the sender rather than the slider;
+        # opt-in, so by default decoding matches the slider (and classify_timings)
+        self.timing = AdaptiveTiming(self.wpm)
+        self.adaptive_timing = tk.BooleanVar(value=False)
+        
+        # Optional most-likely-text decoding of straight-key timing, built
+        # (and its module imported) the first time it is ticked
+        self.viterbi = None
+        self.viterbi_mode = tk.BooleanVar(value=False)
+        
+        # Optional dictionary/callsign correction of each finished word, also built on first use
+        self.word_corrector = None
+        self.word_correction = tk.BooleanVar(value=False)
+        
         # Calculate initial timing values
         self.update_timing_from_wpm()
         
@@ -38,11 +60,16 @@ class MorseCodeSimulator:
         self.last_release_time = time.time()
         
         # Setup UI
+        start = time.perf_counter()
         self.setup_ui()
         self.bind_keys()
+        self.widget_time = time.perf_counter() - start
+        
+        # Letter and word gap deadlines, armed on each key release
+        self.gap_timer = GapTimer(self.root, self.letter_gap_elapsed, self.word_gap_elapsed)
         
-        # Start the morse decode timer
-        self.check_morse_timer()
+        if profile_startup:
+            self.root.after_idle(self.report_startup)
     
     def setup_ui(self):
         # Title
@@ -67,14 +94,12 @@ class MorseCodeSimulator:
     
     def update_timing_from_wpm(self):
         """Calculate timing values based on WPM setting"""
-        # Standard: PARIS = 50 dot units, so 1 WPM = 50 dot units per minute
-        # Dot duration in seconds = 60 / (WPM * 50)
-        self.dot_duration = 60.0 / (self.wpm * 50)
-        
-        # Standard morse timing ratios
-        self.dash_threshold = self.dot_duration * 2.5  # Dash = 3 dots, threshold at 2.5
-        self.letter_gap = self.dot_duration * 3  # 3 dot units between letters
-        self.word_gap = self.dot_duration * 7    # 7 dot units between words
+        # PARIS timing; MorseDecoder.classify_timings applies the same thresholds
+        self.dot_duration, self.dash_threshold, self.letter_gap, self.word_gap = \
+            wpm_thresholds(self.wpm)
+        self.timing.reset(self.wpm)
+        if self.viterbi:
+            self.viterbi.timing.reset(self.wpm)
         
         # Update timing info display if it exists
         if self.shared_controls and hasattr(self.shared_controls, 'timing_info'):
@@ -104,6 +129,7 @@ class MorseCodeSimulator:
     def handle_a_key_down(self, event):
         """Handle A key press - works as straight key or dit depending on active tab"""
         current_tab = self.notebook.index(self.notebook.select())
+        self.gap_timer.cancel()
         if current_tab == 0:  # Straight key tab
             self.straight_key_tab.key_down(event)
         else:  # Paddle key tab
@@ -121,6 +147,7 @@ class MorseCodeSimulator:
         """Handle B key press - only works in paddle tab"""
         current_tab = self.notebook.index(self.notebook.select())
         if current_tab == 1:  # Paddle key tab only
+            self.gap_timer.cancel()
             self.paddle_key_tab.dah_down(event)
     
     def handle_b_key_up(self, event):
@@ -129,31 +156,154 @@ class MorseCodeSimulator:
         if current_tab == 1:  # Paddle key tab only
             self.paddle_key_tab.dah_up(event)
     
-    def add_morse_element(self, element):
-        """Add a morse element (dot or dash) to the current sequence"""
-        self.morse_decoder.add_element(element)
+    def add_morse_element(self, element, duration=None):
+        """Add a morse element (dot or dash) to the current sequence; duration if it was timed"""
+        self.morse_decoder.add_element(element, duration)
+        self.last_release_time = time.time()
+        if not self.use_viterbi() and self.morse_decoder.is_complete():
+            # No longer code starts this way, so there is no need to wait for the letter gap
+            self.shared_controls.add_decoded_text(self.morse_decoder.decode_current_sequence())
         self.shared_controls.update_morse_display()
+        self.shared_controls.update_rolling_display()
+        if not self.is_any_key_transmitting():
+            # Straight key: the element ends with the release
+            self.schedule_gaps()
+    
+    def schedule_gaps(self):
+        """Key released: arm the letter and word gap deadlines from now"""
         self.last_release_time = time.time()
+        self.gap_timer.arm(*self.decode_gaps())
+    
+    def classify_mark(self, duration):
+        """Dot or dash for a straight-key press; with adaptive timing the press also updates the estimate"""
+        if not self.adaptive_timing.get():
+            return '.' if duration < self.dash_threshold else '-'
+        element = self.timing.add_mark(duration)
+        self.shared_controls.update_timing_display()
+        return element
+    
+    def record_mark(self, duration):
+        """Feed a straight-key press to the Viterbi decoder, when it is in use"""
+        if self.use_viterbi():
+            self.add_viterbi_text(self.viterbi.add_mark(duration))
+    
+    def record_gap(self, duration):
+        """Feed a straight-key space to the adaptive estimate, the rolling statistics and the Viterbi decoder"""
+        if self.adaptive_timing.get():
+            kind = self.timing.add_gap(duration)
+        elif duration < self.letter_gap:
+            kind = 0
+        else:
+            kind = 1 if duration < self.word_gap else 2
+        self.morse_decoder.add_space(duration, kind)
+        if self.use_viterbi():
+            self.add_viterbi_text(self.viterbi.add_space(duration))
     
-    def check_morse_timer(self):
-        """Check if enough time has passed to decode current morse sequence"""
-        if (self.morse_decoder.has_sequence() and 
-            not self.is_any_key_transmitting()):
-            
-            time_since_release = time.time() - self.last_release_time
-            
-            # If pause is long enough, decode the current sequence (letter gap)
-            if time_since_release > self.letter_gap:
-                decoded_letter = self.morse_decoder.decode_current_sequence()
-                if decoded_letter:
-                    self.shared_controls.add_decoded_text(decoded_letter)
-                
-                # If pause is very long, add a space (word gap)
-                if time_since_release > self.word_gap:
-                    self.shared_controls.add_decoded_text(" ")
-        
-        # Schedule next check
-        self.root.after(50, self.check_morse_timer)
+    def use_viterbi(self):
+        """True when straight-key text comes from the Viterbi decoder"""
+        return self.viterbi_mode.get() and self.notebook.index(self.notebook.select()) == 0
+    
+    def add_viterbi_text(self, text):
+        """Show text the Viterbi decoder has committed"""
+        if text:
+            self.shared_controls.add_decoded_text(text)
+    
+    def set_alphabet(self, alphabet):
+        """
+        Decode with another code table
+        
+        Args:
+            alphabet (str): Key into code_tables.ALPHABETS
+        """
+        self.clear_morse()
+        self.morse_decoder.set_alphabet(alphabet)
+        # Both walk the decoder's state table, so they are rebuilt on it
+        if self.viterbi:
+            from viterbi_decoder import ViterbiDecoder
+            self.viterbi = ViterbiDecoder(self.morse_decoder, self.viterbi.timing)
+        if self.word_corrector:
+            from word_corrector import WordCorrector
+            self.word_corrector = WordCorrector(self.morse_decoder)
+        self.shared_controls.update_status(f"Alphabet: {ALPHABETS[alphabet]['name']}")
+    
+    def set_viterbi_mode(self):
+        """Decoder mode changed: build the decoder on first use, or show whatever it still holds"""
+        if self.viterbi is None:
+            from viterbi_decoder import ViterbiDecoder
+            self.viterbi = ViterbiDecoder(self.morse_decoder, AdaptiveTiming(self.wpm))
+            return
+        self.add_viterbi_text(self.viterbi.flush())
+    
+    def set_word_correction(self):
+        """Word correction ticked: load the corrector's word trie on first use"""
+        if self.word_corrector is None and self.word_correction.get():
+            from word_corrector import WordCorrector
+            self.word_corrector = WordCorrector(self.morse_decoder)
+    
+    def decode_gaps(self):
+        """Letter and word gap timeouts for the active tab"""
+        # The paddle keyer times its own elements from the slider
+        if self.adaptive_timing.get() and self.notebook.index(self.notebook.select()) == 0:
+            return self.timing.letter_gap, self.timing.word_gap
+        return self.letter_gap, self.word_gap
+    
+    def letter_gap_elapsed(self):
+        """Letter gap deadline: decode the current sequence"""
+        if self.use_viterbi():
+            # The letter is settled later, with the elements that follow
+            self.morse_decoder.clear_sequence()
+            self.shared_controls.update_morse_display()
+            return
+        # Nothing left if the letter was already committed early
+        decoded_letter = self.morse_decoder.decode_current_sequence()
+        if decoded_letter:
+            self.shared_controls.add_decoded_text(decoded_letter)
+            self.shared_controls.update_rolling_display()
+            if decoded_letter.startswith('['):
+                self.suggest_corrections(decoded_letter[1:-1])
+    
+    def word_gap_elapsed(self):
+        """Word gap deadline: end the word"""
+        if self.use_viterbi():
+            self.add_viterbi_text(self.viterbi.flush())
+        if self.word_correction.get():
+            self.correct_last_word()
+        self.shared_controls.add_decoded_text(" ")
+    
+    def correct_last_word(self):
+        """Replace the word just finished with its dictionary correction, if it needs one"""
+        text = self.shared_controls.decoded_text
+        word = text[text.rfind(' ') + 1:]
+        corrected = self.word_corrector.correct(word)
+        if corrected != word:
+            self.shared_controls.replace_last_word(corrected)
+            self.shared_controls.update_status(f"Corrected {word} to {corrected}")
+    
+    def suggest_corrections(self, sequence):
+        """Show the nearest valid codes for an unrecognized sequence"""
+        suggestions = self.morse_decoder.get_similar_sequences(sequence)
+        if suggestions:
+            options = ', '.join(f"{char} ({code})" for code, char in suggestions)
+            self.shared_controls.update_status(f"Unknown {sequence} - did you mean {options}?")
+    
+    def report_startup(self, window_time=None):
+        """Print where startup time went once the window is up and audio is ready"""
+        if window_time is None:
+            window_time = time.perf_counter() - STARTUP_START
+        if not self.audio_manager.ready.is_set():
+            self.root.after(20, self.report_startup, window_time)
+            return
+        timings = self.audio_manager.timings
+        print("\n=== STARTUP TIME ===")
+        print(f"Imports:        {IMPORT_TIME * 1000:7.1f} ms")
+        print(f"Tk widgets:     {self.widget_time * 1000:7.1f} ms")
+        print(f"Window shown:   {window_time * 1000:7.1f} ms after start")
+        for label, key in (("Mixer init", 'mixer_init'), ("Tone build", 'tone_build')):
+            value = timings.get(key)
+            print(f"{label + ':':<15} {value * 1000:7.1f} ms" if value is not None
+                  else f"{label + ':':<15}     n/a")
+        print(f"Audio ready:    {(time.perf_counter() - STARTUP_START) * 1000:7.1f} ms after start "
+              f"(background)")
     
     def is_any_key_transmitting(self):
         """Check if any key is currently being transmitted"""
@@ -166,12 +316,37 @@ class MorseCodeSimulator:
     
     def clear_morse(self):
         """Clear current morse sequence"""
+        self.gap_timer.cancel()
         self.morse_decoder.clear_sequence()
+        if self.viterbi:
+            self.viterbi.reset()
         self.shared_controls.clear_morse_display()
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Morse Code Simulator")
+    parser.add_argument('--audio', default='pygame', choices=backend_names(),
+                        help="Audio backend; 'stream' synthesizes the sidetone block by block, "
+                             "'null' runs without a sound device, 'process' plays the "
+                             "sidetone from a separate process (default pygame)")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Print a startup time breakdown (imports, mixer, tone, widgets)")
+    parser.add_argument('--pcm-out', metavar='PATH',
+                        help="Stream the sidetone as raw s16le mono PCM to PATH (a file or FIFO) "
+                             "or '-' for stdout, instead of playing it")
+    parser.add_argument('--pcm-rate', type=int, default=None,
+                        help="Sample rate for --pcm-out (default 48000)")
+    parser.add_argument('--alphabet', default=DEFAULT_ALPHABET, choices=list(ALPHABETS),
+                        help=f"Code table to decode with (default {DEFAULT_ALPHABET})")
+    args = parser.parse_args(argv)
+    
+    audio_backend = args.audio
+    if args.pcm_out:
+        from pcm_sink import PCMBackend
+        audio_backend = PCMBackend(args.pcm_out, args.pcm_rate)
+    
     root = tk.Tk()
-    app = MorseCodeSimulator(root)
+    app = MorseCodeSimulator(root, audio_backend=audio_backend, profile_startup=args.profile_startup,
+                             alphabet=args.alphabet)
     
     # Make sure the window can receive key events
     root.focus_force()
@@ -179,7 +354,7 @@ def main():
     try:
         root.mainloop()
     except KeyboardInterrupt:
-        pygame.mixer.quit()
+        app.audio_manager.cleanup()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,41 +4,327 @@ Morse Code Decoder Module - Handles morse code sequence management and decoding
 Converts dot/dash sequences to letters and manages morse code logic
 """
 
-class MorseDecoder:
-    def __init__(self):
-        """Initialize the morse code decoder with standard international morse code"""
-        self.current_sequence = []
+import time
+from array import array
+
+import numpy as np
+
+from code_tables import DEFAULT_ALPHABET, compile_state_table, get_table
+
+
+def wpm_thresholds(wpm):
+    """
+    Decision thresholds for a speed, as the simulator applies them
+    
+    Args:
+        wpm (int): Speed, PARIS timing
         
-        # International Morse Code dictionary
-        self.morse_dict = {
-            # Letters
-            '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E',
-            '..-.': 'F', '--.': 'G', '....': 'H', '..': 'I', '.---': 'J',
-            '-.-': 'K', '.-..': 'L', '--': 'M', '-.': 'N', '---': 'O',
-            '.--.': 'P', '--.-': 'Q', '.-.': 'R', '...': 'S', '-': 'T',
-            '..-': 'U', '...-': 'V', '.--': 'W', '-..-': 'X', '-.--': 'Y',
-            '--..': 'Z',
-            
-            # Numbers
-            '.----': '1', '..---': '2', '...--': '3', '....-': '4', '.....': '5',
-            '-....': '6', '--...': '7', '---..': '8', '----.': '9', '-----': '0',
-            
-            # Punctuation
-            '--..--': ',', '.-.-.-': '.', '..--..': '?', '.----.': "'", '-.-.--': '!',
-            '-..-.': '/', '-.--.': '(', '-.--.-': ')', '.-...': '&', '---...': ':',
-            '-.-.-.': ';', '-...-': '=', '.-.-.': '+', '-....-': '-', '..--.-': '_',
-            '.-..-.': '"', '...-..-': '$', '.--.-.': '@',
-            
-            # Prosigns (procedural signals)
-            '.-.-': 'AR',    # End of message
-            '-...-': 'BT',   # Break/pause
-            '...-.-': 'SK',  # End of work
-            '...-.': 'VE',   # Understood
-            '.-.-.': 'AR',   # Alternative AR
+    Returns:
+        tuple: (dot duration, dash threshold, letter gap, word gap) in seconds
+    """
+    # Standard: PARIS = 50 dot units, so 1 WPM = 50 dot units per minute
+    dot_duration = 60.0 / (wpm * 50)
+    return (dot_duration,
+            dot_duration * 2.5,  # Dash = 3 dots, threshold at 2.5
+            dot_duration * 3,    # 3 dot units between letters
+            dot_duration * 7)    # 7 dot units between words
+
+
+def edit_distance(a, b):
+    """
+    Levenshtein distance: insertions, deletions and substitutions each cost 1
+    
+    Args:
+        a (str): First sequence
+        b (str): Second sequence
+        
+    Returns:
+        int: Edit distance
+    """
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree over code sequences for nearest-code lookups"""
+    
+    def __init__(self, sequences):
+        """
+        Args:
+            sequences: Iterable of dot/dash sequences to index
+        """
+        # Each node is [sequence, {distance: child node}]
+        self.root = None
+        for sequence in sequences:
+            self.add(sequence)
+    
+    def add(self, sequence):
+        """Insert one sequence"""
+        if self.root is None:
+            self.root = [sequence, {}]
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(sequence, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [sequence, {}]
+                return
+            node = child
+    
+    def search(self, sequence, max_distance):
+        """
+        Find every indexed sequence within max_distance edits
+        
+        Returns:
+            list: (distance, sequence) tuples, unsorted
+        """
+        found = []
+        pending = [self.root] if self.root else []
+        while pending:
+            code, children = pending.pop()
+            distance = edit_distance(sequence, code)
+            if distance <= max_distance:
+                found.append((distance, code))
+            # Triangle inequality: only children in this band can be close enough
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    pending.append(child)
+        return found
+
+
+# Event kinds in the rolling windows: marks, the three spaces, pauses
+# (spaces too long to be timing evidence) and decoded letters
+DOT, DASH, ELEMENT_GAP, LETTER_GAP, WORD_GAP, PAUSE, LETTER, ERROR = range(8)
+EVENT_KINDS = 8
+
+# Nominal length of each timed kind in dot units, PARIS timing
+EVENT_UNITS = (1, 3, 1, 3, 7, 0, 0, 0)
+
+# Rolling window lengths: marks in the short window, seconds in the long one
+ROLLING_ELEMENTS = 100
+ROLLING_SECONDS = 60.0
+
+# Ring sizes: events per mark are at most about three (the mark, a space,
+# a letter); a minute at 60 WPM is well under 3000 events
+EVENTS_PER_MARK = 3
+MINUTE_CAPACITY = 4096
+
+# A word gap longer than this many dots is a pause between overs
+PAUSE_UNITS = 14
+
+
+class RollingWindow:
+    """Fixed-size ring of recent events with running per-kind sums"""
+    
+    def __init__(self, capacity, max_marks=None, seconds=None):
+        """
+        Args:
+            capacity (int): Most events held; the oldest is dropped when full
+            max_marks (int): Keep only the newest this many marks (None: no limit)
+            seconds (float): Keep only events this recent (None: no limit)
+        """
+        self.capacity = capacity
+        self.max_marks = max_marks
+        self.seconds = seconds
+        self.times = [0.0] * capacity
+        self.kinds = [0] * capacity
+        self.durations = [None] * capacity
+        self.reset()
+    
+    def reset(self):
+        """Empty the window"""
+        self.start = 0
+        self.size = 0
+        self.counts = [0] * EVENT_KINDS
+        # Events with a known duration, and the sum of those durations
+        self.timed = [0] * EVENT_KINDS
+        self.totals = [0.0] * EVENT_KINDS
+    
+    def add(self, kind, duration, now):
+        """
+        Append an event, dropping whatever falls out of the window
+        
+        Args:
+            kind (int): Event kind (DOT ... ERROR)
+            duration (float): Length in seconds, or None if not timed
+            now (float): perf_counter() time of the event
+        """
+        if self.size == self.capacity:
+            self.drop()
+        index = (self.start + self.size) % self.capacity
+        self.times[index] = now
+        self.kinds[index] = kind
+        self.durations[index] = duration
+        self.size += 1
+        self.counts[kind] += 1
+        if duration is not None:
+            self.timed[kind] += 1
+            self.totals[kind] += duration
+        self.trim(now)
+    
+    def trim(self, now):
+        """Drop events older than the time span or beyond the mark count"""
+        if self.seconds is not None:
+            oldest = now - self.seconds
+            while self.size and self.times[self.start] < oldest:
+                self.drop()
+        if self.max_marks is not None:
+            while self.counts[DOT] + self.counts[DASH] > self.max_marks:
+                self.drop()
+    
+    def drop(self):
+        """Remove the oldest event from the running sums"""
+        index = self.start
+        kind = self.kinds[index]
+        self.counts[kind] -= 1
+        duration = self.durations[index]
+        if duration is not None:
+            self.timed[kind] -= 1
+            # Subtraction drifts; an empty sum is exactly zero again
+            self.totals[kind] = self.totals[kind] - duration if self.timed[kind] else 0.0
+        self.start = (index + 1) % self.capacity
+        self.size -= 1
+    
+    def mean(self, kind):
+        """Mean duration of a kind, or None if none is timed"""
+        return self.totals[kind] / self.timed[kind] if self.timed[kind] else None
+    
+    def summary(self):
+        """
+        Window statistics, computed from the running sums
+        
+        Returns:
+            dict: 'elements', 'letters', 'errors', 'words' counts; 'wpm'
+                (effective, PARIS timing), 'dash_ratio' (mean dash/dot),
+                'gap_ratios' (element, letter, word gap in dots) and 'cer'
+                (unknown letters per letter); each None without data
+        """
+        counts = self.counts
+        letters = counts[LETTER] + counts[ERROR]
+        elapsed = sum(self.totals)
+        units = sum(units * timed for units, timed in zip(EVENT_UNITS, self.timed))
+        dot = self.mean(DOT)
+        dash = self.mean(DASH)
+        gap_ratios = None
+        if dot:
+            gap_ratios = tuple(None if self.mean(kind) is None else self.mean(kind) / dot
+                               for kind in (ELEMENT_GAP, LETTER_GAP, WORD_GAP))
+        return {
+            'elements': counts[DOT] + counts[DASH],
+            'letters': counts[LETTER],
+            'errors': counts[ERROR],
+            'words': counts[WORD_GAP] + counts[PAUSE],
+            'wpm': units / elapsed * 60.0 / 50 if elapsed > 0 else None,
+            'dash_ratio': dash / dot if dot and dash else None,
+            'gap_ratios': gap_ratios,
+            'cer': counts[ERROR] / letters if letters else None,
         }
+
+
+class SendingStats:
+    """Rolling sending statistics over the last N marks and the last minute"""
+    
+    def __init__(self, elements=ROLLING_ELEMENTS, seconds=ROLLING_SECONDS):
+        """
+        Args:
+            elements (int): Marks in the short window
+            seconds (float): Span of the long window
+        """
+        self.recent = RollingWindow(elements * EVENTS_PER_MARK, max_marks=elements)
+        self.minute = RollingWindow(MINUTE_CAPACITY, seconds=seconds)
+    
+    def reset(self):
+        """Empty both windows"""
+        self.recent.reset()
+        self.minute.reset()
+    
+    def add(self, kind, duration=None, now=None):
+        """Record one event in both windows"""
+        if now is None:
+            now = time.perf_counter()
+        self.recent.add(kind, duration, now)
+        self.minute.add(kind, duration, now)
+    
+    def add_space(self, duration, kind, now=None):
+        """
+        Record a timed space
+        
+        Args:
+            duration (float): Space length in seconds
+            kind (int): 0 element gap, 1 letter gap, 2 word gap
+            now (float): perf_counter() time (default: now)
+        """
+        kind = ELEMENT_GAP + kind
+        dot = self.recent.mean(DOT)
+        if kind == WORD_GAP and (dot is None or duration > dot * PAUSE_UNITS):
+            # Counts as a word break but says nothing about speed
+            kind, duration = PAUSE, None
+        self.add(kind, duration, now)
+    
+    def summary(self):
+        """
+        Returns:
+            dict: 'recent' and 'minute' window summaries (see RollingWindow.summary)
+        """
+        return {'recent': self.recent.summary(), 'minute': self.minute.summary()}
+
+
+class TimingLog:
+    """Every timed mark and space of a session, in compact typed arrays"""
+    
+    def __init__(self):
+        # Five bytes per event: duration in seconds and event kind (DOT ... WORD_GAP)
+        self.durations = array('f')
+        self.kinds = array('b')
+    
+    def __len__(self):
+        return len(self.kinds)
+    
+    def append(self, kind, duration):
+        """Record one mark or space"""
+        self.kinds.append(kind)
+        self.durations.append(duration)
+    
+    def clear(self):
+        """Forget the session"""
+        del self.durations[:]
+        del self.kinds[:]
+    
+    def as_arrays(self):
+        """
+        The log as NumPy arrays (copies, so recording can carry on)
         
-        # Reverse dictionary for encoding (letter to morse)
-        self.letter_dict = {v: k for k, v in self.morse_dict.items()}
+        Returns:
+            tuple: (float32 durations, int8 kinds)
+        """
+        return (np.frombuffer(self.durations, dtype=np.float32).copy(),
+                np.frombuffer(self.kinds, dtype=np.int8).copy())
+    
+    def signed_durations(self):
+        """Durations as adaptive_timing logs hold them: marks positive, spaces negative"""
+        durations, kinds = self.as_arrays()
+        return np.where(kinds <= DASH, durations, -durations).astype(float)
+
+
+class MorseDecoder:
+    def __init__(self, alphabet=DEFAULT_ALPHABET):
+        """
+        Initialize the morse code decoder
+        
+        Args:
+            alphabet (str): Code table key from code_tables.ALPHABETS
+                (default: International Morse)
+        """
+        self.current_sequence = []
+        self.set_alphabet(alphabet)
         
         # Statistics
         self.stats = {
@@ -49,21 +335,90 @@ class MorseDecoder:
             'dashes': 0,
             'errors': 0
         }
+        # Recent sending, for live speed and trend
+        self.rolling = SendingStats()
+        # The whole session's timed marks and spaces, for fist analysis
+        self.timing_log = TimingLog()
     
-    def add_element(self, element):
+    def set_alphabet(self, alphabet):
+        """
+        Switch to another compiled code table
+        
+        morse_dict (code to symbol) and letter_dict (symbol to code) are the
+        table's shared dicts, so treat them as read-only; the state table
+        comes precompiled with the table.
+        
+        Args:
+            alphabet (str): Code table key from code_tables.ALPHABETS
+            
+        Raises:
+            KeyError: If there is no such alphabet
+        """
+        self.code_table = get_table(alphabet)
+        self.alphabet = alphabet
+        self.morse_dict = self.code_table.decode
+        self.letter_dict = self.code_table.encode
+        self.next_state = self.code_table.next_state
+        self.state_char = self.code_table.state_char
+        self.state_extendable = self.code_table.state_extendable
+        self.clear_sequence()
+        
+        # Nearest-code index for error suggestions
+        self.build_suggestion_index()
+    
+    def build_state_table(self):
+        """
+        Recompile the dit/dah state table from morse_dict
+        
+        Only needed after replacing morse_dict with a dict of your own;
+        set_alphabet() uses the table's precompiled copy. See
+        code_tables.compile_state_table for the layout.
+        """
+        self.next_state, self.state_char, self.state_extendable = \
+            compile_state_table(self.morse_dict)
+        self.clear_sequence()
+    
+    def build_suggestion_index(self):
+        """
+        Index morse_dict for get_similar_sequences and drop memoized results
+        
+        Call again after changing morse_dict.
+        """
+        self.suggestion_index = BKTree(self.morse_dict)
+        self.suggestion_cache = {}
+    
+    def add_element(self, element, duration=None):
         """
         Add a morse element (dot or dash) to the current sequence
         
         Args:
             element (str): Either '.' for dot or '-' for dash
+            duration (float): Key-down time in seconds, if it was timed
         """
         if element in ['.', '-']:
             self.current_sequence.append(element)
+            if self.state >= 0:
+                self.state = self.next_state[self.state][element == '-']
             self.stats['total_elements'] += 1
             if element == '.':
                 self.stats['dots'] += 1
             else:
                 self.stats['dashes'] += 1
+            kind = DOT if element == '.' else DASH
+            self.rolling.add(kind, duration)
+            if duration is not None:
+                self.timing_log.append(kind, duration)
+    
+    def add_space(self, duration, kind):
+        """
+        Record a timed space for the rolling statistics
+        
+        Args:
+            duration (float): Key-up time in seconds
+            kind (int): 0 element gap, 1 letter gap, 2 word gap
+        """
+        self.rolling.add_space(duration, kind)
+        self.timing_log.append(ELEMENT_GAP + kind, duration)
     
     def get_current_sequence(self):
         """
@@ -74,6 +429,34 @@ class MorseDecoder:
         """
         return ''.join(self.current_sequence)
     
+    def get_candidate(self):
+        """
+        Character the sequence so far would decode to if it ended now
+        
+        Returns:
+            str: Candidate character, or None
+        """
+        return self.state_char[self.state] if self.state >= 0 else None
+    
+    def is_extendable(self):
+        """
+        Check if a longer code could still start with the current sequence
+        
+        Returns:
+            bool: True if more elements can still lead to a valid code
+        """
+        return self.state >= 0 and self.state_extendable[self.state]
+    
+    def is_complete(self):
+        """
+        Check if the sequence is a valid code that no longer code extends,
+        so it can be decoded without waiting for the letter gap
+        
+        Returns:
+            bool: True if the letter can be committed early
+        """
+        return self.get_candidate() is not None and not self.is_extendable()
+    
     def has_sequence(self):
         """
         Check if there's a current sequence being built
@@ -93,22 +476,26 @@ class MorseDecoder:
         if not self.current_sequence:
             return None
         
+        decoded_char = self.get_candidate()
         sequence_str = ''.join(self.current_sequence)
-        decoded_char = self.morse_dict.get(sequence_str)
         
         # Clear the sequence
-        self.current_sequence = []
+        self.clear_sequence()
         
         if decoded_char:
             self.stats['total_letters'] += 1
+            self.rolling.add(LETTER)
             return decoded_char
         else:
             self.stats['errors'] += 1
+            self.rolling.add(ERROR)
             return f'[{sequence_str}]'  # Return unknown sequence in brackets
     
     def clear_sequence(self):
         """Clear the current morse sequence"""
         self.current_sequence = []
+        # Where the current sequence has led; -1 once it matches no code
+        self.state = 0
     
     def encode_text(self, text):
         """
@@ -148,32 +535,31 @@ class MorseDecoder:
         char = self.morse_dict.get(sequence)
         return char is not None, char
     
-    def get_similar_sequences(self, sequence, max_suggestions=3):
+    def get_similar_sequences(self, sequence, max_suggestions=3, max_distance=2):
         """
         Get similar valid sequences for error correction
         
+        Uses true edit distance, so a dropped or extra element (the usual
+        fist error) counts as one edit just like a wrong one. Results are
+        memoized per sequence.
+        
         Args:
             sequence (str): Invalid morse sequence
             max_suggestions (int): Maximum number of suggestions
+            max_distance (int): Largest edit distance to suggest
             
         Returns:
-            list: List of (sequence, character) tuples for similar valid sequences
+            list: List of (sequence, character) tuples, closest first
         """
-        suggestions = []
-        seq_len = len(sequence)
-        
-        # Look for sequences with similar length
-        for morse_seq, char in self.morse_dict.items():
-            if abs(len(morse_seq) - seq_len) <= 1:  # Within 1 element
-                # Calculate similarity (simple character difference count)
-                diff_count = sum(1 for i, c in enumerate(sequence) 
-                               if i < len(morse_seq) and c != morse_seq[i])
-                if diff_count <= 1:  # Allow 1 character difference
-                    suggestions.append((morse_seq, char, diff_count))
-        
-        # Sort by similarity and return top suggestions
-        suggestions.sort(key=lambda x: x[2])
-        return [(seq, char) for seq, char, _ in suggestions[:max_suggestions]]
+        key = (sequence, max_distance)
+        ranked = self.suggestion_cache.get(key)
+        if ranked is None:
+            found = self.suggestion_index.search(sequence, max_distance)
+            # Closest first; among equals prefer the same length, then a stable order
+            found.sort(key=lambda match: (match[0], abs(len(match[1]) - len(sequence)), match[1]))
+            ranked = [(code, self.morse_dict[code]) for _, code in found]
+            self.suggestion_cache[key] = ranked
+        return ranked[:max_suggestions]
     
     def get_stats(self):
         """
@@ -205,6 +591,19 @@ class MorseDecoder:
             'dashes': 0,
             'errors': 0
         }
+        self.rolling.reset()
+        self.timing_log.clear()
+    
+    def get_rolling_stats(self):
+        """
+        Statistics over the last ROLLING_ELEMENTS marks and ROLLING_SECONDS
+        
+        Constant time, so it can be read on every display refresh.
+        
+        Returns:
+            dict: 'recent' and 'minute' window summaries (see RollingWindow.summary)
+        """
+        return self.rolling.summary()
     
     def get_morse_reference(self):
         """
@@ -260,4 +659,80 @@ class MorseDecoder:
         # Replace dashes with longer visual representation
         formatted = sequence.replace('-', '—')  # Em dash for better visibility
         
-        return formatted if formatted else "..."  # Show dots when empty
\ No newline at end of file
+        return formatted if formatted else "..."  # Show dots when empty
+    
+    def classify_timings(self, marks, spaces, wpm):
+        """
+        Decode recorded key timing in one vectorized pass
+        
+        Gives exactly what the simulator shows for the same timing at a fixed
+        speed: a mark shorter than the dash threshold is a dot, a space of at
+        least the letter gap ends the letter, at least the word gap adds a
+        space, and a letter that no longer code extends ends at once. The
+        trie is walked one element position at a time across all letters,
+        so the only Python loop is over the longest run of elements.
+        
+        Args:
+            marks: Key-down durations in seconds
+            spaces: Key-up durations after each mark (the last may be left
+                out; the final letter always ends)
+            wpm (int): Speed whose thresholds to apply
+            
+        Returns:
+            dict: 'elements' ('.'/'-' per mark), 'letter_end' and 'word_end'
+                (bool per mark) and 'text'
+        """
+        marks = np.asarray(marks, dtype=np.float64)
+        spaces = np.asarray(spaces, dtype=np.float64)
+        count = len(marks)
+        if count == 0:
+            empty = np.zeros(0, dtype=bool)
+            return {'elements': np.zeros(0, dtype='<U1'), 'letter_end': empty,
+                    'word_end': empty, 'text': ''}
+        _, dash_threshold, letter_gap, word_gap = wpm_thresholds(wpm)
+        
+        dash = marks >= dash_threshold
+        gap_end = np.ones(count, dtype=bool)
+        word_end = np.zeros(count, dtype=bool)
+        gap_end[:len(spaces)] = spaces[:count] >= letter_gap
+        word_end[:len(spaces)] = spaces[:count] >= word_gap
+        
+        # Letters as the gaps cut them: start index and length of each run
+        starts = np.flatnonzero(np.concatenate(([True], gap_end[:-1])))
+        lengths = np.diff(np.append(starts, count))
+        
+        # Walk the state table for every run at once, position by position
+        next_state = np.array(self.next_state)
+        ends_early = np.array([char is not None and not extendable for char, extendable
+                               in zip(self.state_char, self.state_extendable)])
+        element_state = np.zeros(count, dtype=np.int64)
+        letter_end = gap_end.copy()
+        state = np.zeros(len(starts), dtype=np.int64)
+        for position in range(int(lengths.max())):
+            runs = np.flatnonzero(lengths > position)
+            index = starts[runs] + position
+            previous = state[runs]
+            # -1 (no code starts this way) stays -1 until the gap
+            current = next_state[np.maximum(previous, 0), dash[index].astype(np.int64)]
+            current = np.where(previous >= 0, current, -1)
+            element_state[index] = current
+            # A complete, unextendable code is committed without waiting for the gap
+            early = (current >= 0) & ends_early[np.maximum(current, 0)]
+            letter_end[index[early]] = True
+            state[runs] = np.where(early, 0, current)
+        
+        ends = np.flatnonzero(letter_end)
+        # Index -1 picks the None appended for sequences no code starts with
+        chars = np.array(self.state_char + [None], dtype=object)[element_state[ends]]
+        known = np.array([char is not None for char in self.state_char] + [False])
+        unknown = np.flatnonzero(~known[element_state[ends]])
+        if len(unknown):
+            # Unknown letters need their elements spelled out, as in decode_current_sequence
+            elements = np.where(dash, '-', '.')
+            first = np.concatenate(([0], ends[:-1] + 1))
+            for letter in unknown:
+                chars[letter] = f"[{''.join(elements[first[letter]:ends[letter] + 1])}]"
+        spaced = word_end[ends]
+        chars[spaced] = chars[spaced] + ' '
+        return {'elements': np.where(dash, '-', '.'), 'letter_end': letter_end,
+                'word_end': word_end, 'text': ''.join(chars.tolist())}
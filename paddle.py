@@ -3,7 +3,9 @@ from tkinter import ttk
 import pygame
 import threading
 import time
-import numpy as np
+from audio_backends import open_mixer
+from tone_generator import make_tone
+from gap_timer import GapTimer
 
 class PaddleKeySimulator:
     def __init__(self, root):
@@ -13,7 +15,7 @@ class PaddleKeySimulator:
         self.root.configure(bg='#2c3e50')
         
         # Initialize pygame for audio
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+        self.sample_rate, self.mixer_channels = open_mixer()
         
         # Paddle key variables
         self.dit_pressed = False
@@ -50,9 +52,8 @@ class PaddleKeySimulator:
         self.setup_audio()
         self.bind_keys()
         
-        # Start the morse decode timer
-        self.last_release_time = time.time()
-        self.check_morse_timer()
+        # Letter and word gap deadlines, armed when the paddles go quiet
+        self.gap_timer = GapTimer(self.root, self.decode_current_sequence, self.end_word)
     
     def update_timing_from_wpm(self):
         """Calculate timing values based on WPM setting"""
@@ -243,21 +244,9 @@ class PaddleKeySimulator:
         self.paddle_visual.create_oval(222, 85, 228, 95, fill='#5d6d7e', outline='#34495e', width=1)
     
     def setup_audio(self):
-        # Generate tone for morse code using the same method as working code
-        sample_rate = 22050
-        duration = 0.1  # seconds
-        frames = int(duration * sample_rate)
-        
-        # Generate sine wave
-        arr = np.zeros((frames, 2))
-        for i in range(frames):
-            wave = np.sin(2 * np.pi * self.tone_frequency * i / sample_rate)
-            arr[i][0] = wave * 0.3  # Left channel
-            arr[i][1] = wave * 0.3  # Right channel
-        
-        # Convert to pygame sound
-        arr = (arr * 32767).astype(np.int16)
-        self.tone_sound = pygame.sndarray.make_sound(arr)
+        # Tone at the mixer's own rate and channel count, so SDL plays it as is
+        self.tone_sound = pygame.sndarray.make_sound(
+            make_tone(self.tone_frequency, self.sample_rate, channels=self.mixer_channels))
     
     def bind_keys(self):
         # Dit paddle (A key)
@@ -278,6 +267,7 @@ class PaddleKeySimulator:
         """Handle dit paddle press"""
         if not self.dit_pressed:
             self.dit_pressed = True
+            self.gap_timer.cancel()
             self.dit_status.config(fg='#2ecc71')
             self.draw_paddle(True, self.dah_pressed)
             self.handle_paddle_logic()
@@ -293,6 +283,7 @@ class PaddleKeySimulator:
         """Handle dah paddle press"""
         if not self.dah_pressed:
             self.dah_pressed = True
+            self.gap_timer.cancel()
             self.dah_status.config(fg='#2ecc71')
             self.draw_paddle(self.dit_pressed, True)
             self.handle_paddle_logic()
@@ -368,25 +359,13 @@ class PaddleKeySimulator:
             else:
                 self.send_element('.')
         else:
-            # No keys pressed, reset timing for letter/word spacing
-            self.last_release_time = time.time()
+            # No keys pressed, time the letter/word spacing from here
+            self.gap_timer.arm(self.letter_gap, self.word_gap)
     
-    def check_morse_timer(self):
-        """Check if enough time has passed to decode current morse sequence"""
-        if self.morse_sequence and not self.paddle_transmitting:
-            time_since_release = time.time() - self.last_release_time
-            
-            # If pause is long enough, decode the current sequence (letter gap)
-            if time_since_release > self.letter_gap:
-                self.decode_current_sequence()
-                
-                # If pause is very long, add a space (word gap)
-                if time_since_release > self.word_gap:
-                    self.decoded_text += " "
-                    self.update_text_display()
-        
-        # Schedule next check
-        self.root.after(50, self.check_morse_timer)
+    def end_word(self):
+        """Word gap deadline: add a space"""
+        self.decoded_text += " "
+        self.update_text_display()
     
     def decode_current_sequence(self):
         """Decode the current morse sequence to a letter"""
@@ -418,6 +397,7 @@ class PaddleKeySimulator:
     
     def clear_morse(self):
         """Clear current morse sequence"""
+        self.gap_timer.cancel()
         self.morse_sequence = []
         self.morse_display.config(text="")
     
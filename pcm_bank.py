@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+PCM Bank Module - Memory-mapped per-character audio for instant playback
+For one (WPM, pitch, sample rate, level, envelope, alphabet) setting,
+renders every code in MorseDecoder.morse_dict plus the word gap once into a
+raw file under ~/.cw_simulator/banks. Later loads map the file with
+numpy.memmap, so playing text is only slicing and joining, and every
+process using the same setting shares one copy in the page cache.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from morse_decoder import MorseDecoder
+from text_to_wav import MorseRenderer
+from tone_generator import DEFAULT_AMPLITUDE
+
+BANK_DIR = os.path.join(os.path.expanduser('~'), '.cw_simulator', 'banks')
+
+# Bumped whenever the bank layout or rendering changes
+BANK_VERSION = 1
+
+
+class PCMBank:
+    """Read-only, memory-mapped PCM for every letter code and the word gap"""
+
+    def __init__(self, wpm=20, frequency=600, sample_rate=22050, amplitude=DEFAULT_AMPLITUDE,
+                 rise_time=0.005, bank_dir=BANK_DIR, decoder=None):
+        """
+        Opens the bank for these settings, building it first if needed.
+
+        Args:
+            wpm (int): Sending speed, PARIS timing
+            frequency (float): Tone frequency in Hz
+            sample_rate (int): Sample rate in Hz
+            amplitude (float): Tone level, 0.0 to 1.0
+            rise_time (float): Raised-cosine rise/fall time in seconds
+            bank_dir (str): Directory holding bank files
+            decoder (MorseDecoder): Code table (a new one if None)
+        """
+        self.renderer = MorseRenderer(wpm, frequency, sample_rate, amplitude, rise_time, decoder)
+        self.sample_rate = sample_rate
+        name = (f"v{BANK_VERSION}_{self.renderer.decoder.alphabet}_{wpm}wpm_{frequency:g}hz_"
+                f"{sample_rate}_{amplitude:g}_{rise_time * 1000:g}ms")
+        self.path = os.path.join(bank_dir, name + '.pcm')
+        # The index is written last, so its presence marks a complete bank
+        self.index_path = os.path.join(bank_dir, name + '.json')
+        self.built = False
+        if not os.path.exists(self.index_path):
+            self.build()
+            self.built = True
+
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.samples = np.memmap(self.path, dtype='<i2', mode='r')
+        self.letters = {code: self.samples[start:end] for code, (start, end) in index['codes'].items()}
+        start, end = index['word_space']
+        self.word_space = self.samples[start:end]
+
+    def build(self):
+        """Render every code and the word gap into the bank files"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        codes = {}
+        position = 0
+        # Unique temporary names so concurrent builders cannot clash; each
+        # file is moved into place whole
+        suffix = f".{os.getpid()}.tmp"
+        with open(self.path + suffix, 'wb') as f:
+            for code in self.renderer.decoder.morse_dict:
+                pcm = self.renderer.render_letter(code)
+                f.write(pcm.astype('<i2', copy=False).tobytes())
+                codes[code] = (position, position + len(pcm))
+                position += len(pcm)
+            f.write(self.renderer.word_space.astype('<i2', copy=False).tobytes())
+            word_space = (position, position + len(self.renderer.word_space))
+        os.replace(self.path + suffix, self.path)
+        with open(self.index_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump({'version': BANK_VERSION, 'sample_rate': self.sample_rate,
+                       'codes': codes, 'word_space': word_space}, f)
+        os.replace(self.index_path + suffix, self.index_path)
+
+    def iter_slices(self, words):
+        """
+        Bank slices for a word stream, with no copying
+
+        Characters with no code are skipped.
+
+        Args:
+            words: Iterable of words
+
+        Yields:
+            numpy.memmap: Read-only int16 views, letter by letter, each word
+                followed by the word gap
+        """
+        for word in words:
+            codes = self.renderer.word_codes(word)
+            if not codes:
+                continue
+            for code in codes:
+                yield self.letters[code]
+            yield self.word_space
+
+    def iter_pcm(self, words):
+        """
+        One array per word, like MorseRenderer.iter_pcm
+
+        Yields:
+            numpy.ndarray: int16 samples for each word
+        """
+        for word in words:
+            codes = self.renderer.word_codes(word)
+            if codes:
+                yield np.concatenate([self.letters[code] for code in codes] + [self.word_space])
+
+    def render_text(self, text):
+        """
+        Whole text as one contiguous array, ready for a Sound
+
+        Args:
+            text (str): Plain text
+
+        Returns:
+            numpy.ndarray: int16 samples (empty if nothing was encodable)
+        """
+        parts = list(self.iter_slices(text.split()))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or time a memory-mapped PCM bank")
+    parser.add_argument('text', nargs='?', default="CQ CQ CQ DE K1ABC K1ABC PSE K",
+                        help="Text to render from the bank")
+    parser.add_argument('--wpm', type=int, default=20, help="Sending speed (default 20)")
+    parser.add_argument('--frequency', type=float, default=600, help="Tone in Hz (default 600)")
+    parser.add_argument('--sample-rate', type=int, default=48000, help="Sample rate (default 48000)")
+    parser.add_argument('--rise-time', type=float, default=5.0,
+                        help="Rise/fall time in ms, 0 for hard keying (default 5)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    bank = PCMBank(args.wpm, args.frequency, args.sample_rate, rise_time=args.rise_time / 1000.0)
+    opened = time.perf_counter() - start
+    print(f"{'✓ Built' if bank.built else '✓ Mapped'} {bank.path} "
+          f"({len(bank.samples) * 2 / 1024:.0f} KB) in {opened * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    pcm = bank.render_text(args.text)
+    bank_time = time.perf_counter() - start
+    start = time.perf_counter()
+    renderer = MorseRenderer(args.wpm, args.frequency, args.sample_rate,
+                             rise_time=args.rise_time / 1000.0, decoder=MorseDecoder())
+    list(renderer.iter_pcm(args.text.split()))
+    synth_time = time.perf_counter() - start
+    print(f"{len(pcm) / args.sample_rate:.1f}s of audio: bank {bank_time * 1000:.2f}ms, "
+          f"synthesis {synth_time * 1000:.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+PCM Sink Module - Raw audio out to stdout or a named pipe
+Writes mono little-endian int16 PCM with no header, so simulator and
+renderer output can be piped straight into other tools:
+
+    python main.py --pcm-out - | sox -t raw -r 48000 -e signed -b 16 -c 1 - out.wav
+
+Blocks pass through a small bounded queue to a writer thread. When the
+reader falls behind the queue fills and write() blocks, so memory stays
+fixed however slow the consumer is.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+from audio_backends import StreamBackend, NATIVE_SAMPLE_RATE
+from tone_generator import StreamingOscillator
+
+# Blocks held between producer and writer before write() blocks
+MAX_QUEUED_BLOCKS = 16
+
+# Frames per block rendered by the live PCM backend
+BLOCK_FRAMES = 512
+
+# Seconds the live backend waits for its writer on close before giving up on it
+CLOSE_TIMEOUT = 1.0
+
+
+class PCMSink:
+    """Bounded, backpressured raw PCM writer for a file, FIFO or stdout ('-')"""
+
+    def __init__(self, path, max_blocks=MAX_QUEUED_BLOCKS):
+        """
+        Args:
+            path (str): Output path, a FIFO, or '-' for stdout
+            max_blocks (int): Blocks buffered before write() blocks
+        """
+        self.path = path
+        self.queue = queue.Queue(max_blocks)
+        self.error = None
+        self.bytes_written = 0
+        self.output = None
+        if path == '-':
+            # Keep the real stdout for PCM and send everything printed
+            # (including C-level output) to stderr from here on
+            sys.stdout.flush()
+            self.output = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+            os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        self.thread = threading.Thread(target=self.run, name="pcm-sink", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Writer thread: drain the queue into the output"""
+        try:
+            if self.output is None:
+                # Opening a FIFO waits here for a reader, not in the producer
+                self.output = open(self.path, 'wb')
+            while True:
+                data = self.queue.get()
+                if data is None:
+                    break
+                self.output.write(data)
+                self.output.flush()
+                self.bytes_written += len(data)
+        except OSError as e:  # Includes BrokenPipeError when the reader exits
+            self.error = e
+            # Keep draining so a blocked producer wakes up and sees the error
+            while self.queue.get() is not None:
+                pass
+        finally:
+            if self.output is not None:
+                try:
+                    self.output.close()
+                except OSError:
+                    pass
+
+    def write(self, samples):
+        """
+        Queue int16 samples, blocking while the queue is full
+
+        Args:
+            samples (numpy.ndarray): int16 samples
+
+        Raises:
+            OSError: If the reader has gone away
+        """
+        self.writeframes(np.asarray(samples).astype('<i2', copy=False).tobytes())
+
+    def writeframes(self, data):
+        """Queue raw little-endian int16 bytes (same call as wave's writer)"""
+        if self.error is not None:
+            raise self.error
+        self.queue.put(data)
+
+    def close(self, timeout=None):
+        """
+        Flush everything queued and close the output
+
+        Args:
+            timeout (float): Seconds to wait for the writer, None to wait as
+                long as the reader takes
+
+        Returns:
+            bool: False if the writer was still busy (e.g. a FIFO nobody opened)
+                and was left behind with its data; it is a daemon thread
+        """
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return False
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class PCMBackend(StreamBackend):
+    """
+    Streaming sidetone rendered on a real-time clock into a PCMSink
+
+    Everything StreamBackend schedules on the oscillator, keyed elements and
+    the Send box's play_pcm buffers alike, is rendered into the same blocks,
+    so it reaches the sink in order and paced by the clock.
+    """
+
+    name = 'pcm'
+
+    def __init__(self, path, sample_rate=None, block_frames=BLOCK_FRAMES):
+        """
+        Args:
+            path (str): Output path, a FIFO, or '-' for stdout
+            sample_rate (int): Output rate, None for whatever open() is asked for
+            block_frames (int): Frames rendered per block
+        """
+        super().__init__(block_frames)
+        self.path = path
+        self.requested_rate = sample_rate
+        self.sink = None
+        self.running = False
+        self.clock_thread = None
+
+    def open(self, sample_rate):
+        self.sample_rate = self.requested_rate or sample_rate or NATIVE_SAMPLE_RATE
+        self.oscillator = StreamingOscillator(self.sample_rate)
+        self.sink = PCMSink(self.path)
+        self.running = True
+        self.clock_thread = threading.Thread(target=self.run_clock, name="pcm-clock", daemon=True)
+        self.clock_thread.start()
+        print(f"✓ Streaming PCM to {'stdout' if self.path == '-' else self.path} "
+              f"(s16le, {self.sample_rate}Hz, mono)")
+
+    def run_clock(self):
+        """Render one block per block period; a full sink holds the clock back"""
+        period = self.buffer_size / self.sample_rate
+        due = time.perf_counter()
+        try:
+            while self.running:
+                self.sink.write(self.oscillator.render(self.buffer_size))
+                due += period
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -1.0:
+                    # The reader stalled us for a while; resume from now
+                    # rather than bursting out the backlog
+                    due = time.perf_counter()
+        except OSError as e:
+            print(f"✗ PCM output stopped: {e}")
+            self.running = False
+
+    def get_info(self):
+        return {'backend': self.name, 'mixer_frequency': self.sample_rate, 'mixer_format': -16,
+                'mixer_channels': 1, 'mixer_buffer': self.buffer_size}
+
+    def close(self):
+        self.running = False
+        if self.clock_thread is not None:
+            # Bounded wait: the clock may be held up by a stalled reader
+            self.clock_thread.join(1.0)
+            self.clock_thread = None
+        if self.sink is not None:
+            # A reader that never came (or stopped reading) must not hang quitting
+            if not self.sink.close(CLOSE_TIMEOUT):
+                print("✗ PCM reader is not draining; unwritten audio dropped")
+            self.sink = None
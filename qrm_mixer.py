@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+QRM Mixer Module - Multi-station band simulation for training audio
+Renders any number of stations with their own text, speed, pitch, level and
+start time, then sums and soft-clips them block by block into one stream.
+Output can go to a WAV file or a pygame Sound.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from text_to_wav import MorseRenderer, open_output
+from tone_generator import INT16_MAX
+
+# text, wpm, frequency (Hz), amplitude (0.0-1.0), offset (seconds from start)
+Station = namedtuple('Station', 'text wpm frequency amplitude offset')
+
+# Frames summed and clipped per output block
+BLOCK_FRAMES = 8192
+
+
+def render_station(station, sample_rate, rise_time=0.005):
+    """
+    Render one station's signal at its own level
+
+    Args:
+        station (Station): Station spec
+        sample_rate (int): Sample rate in Hz
+        rise_time (float): Raised-cosine rise/fall time in seconds
+
+    Returns:
+        numpy.ndarray: float32 samples, full scale = 1.0
+    """
+    renderer = MorseRenderer(station.wpm, station.frequency, sample_rate,
+                             amplitude=1.0, rise_time=rise_time)
+    words = list(renderer.iter_pcm(station.text.split()))
+    if not words:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(words).astype(np.float32) * np.float32(station.amplitude / INT16_MAX)
+
+
+class QRMMixer:
+    """Sums pre-rendered stations into one soft-clipped PCM stream"""
+
+    def __init__(self, stations, sample_rate=22050, rise_time=0.005):
+        """
+        Args:
+            stations (list): Station specs
+            sample_rate (int): Sample rate in Hz
+            rise_time (float): Raised-cosine rise/fall time in seconds
+        """
+        self.sample_rate = sample_rate
+        self.tracks = []
+        for station in stations:
+            pcm = render_station(station, sample_rate, rise_time)
+            if len(pcm):
+                start = int(round(station.offset * sample_rate))
+                self.tracks.append((start, start + len(pcm), pcm))
+        # Sorted by start so each block only touches stations that overlap it
+        self.tracks.sort(key=lambda track: track[0])
+        self.total_frames = max((end for _, end, _ in self.tracks), default=0)
+
+    def iter_blocks(self, block_frames=BLOCK_FRAMES):
+        """
+        Yield the mix as float32 blocks, soft-clipped with tanh
+
+        Args:
+            block_frames (int): Frames per block
+
+        Yields:
+            numpy.ndarray: float32 samples in -1.0..1.0, a new array per block
+                so callers may keep or queue them
+        """
+        for block_start in range(0, self.total_frames, block_frames):
+            block_end = min(block_start + block_frames, self.total_frames)
+            out = np.zeros(block_end - block_start, dtype=np.float32)
+            for start, end, pcm in self.tracks:
+                if start >= block_end:
+                    break
+                if end <= block_start:
+                    continue
+                lo = max(start, block_start)
+                hi = min(end, block_end)
+                out[lo - block_start:hi - block_start] += pcm[lo - start:hi - start]
+            np.tanh(out, out=out)
+            yield out
+
+    def iter_pcm(self, block_frames=BLOCK_FRAMES):
+        """
+        Yield the mix as int16 blocks
+
+        Yields:
+            numpy.ndarray: int16 samples
+        """
+        for out in self.iter_blocks(block_frames):
+            yield (out * INT16_MAX).astype(np.int16)
+
+    def write_wav(self, path, raw_pcm=False):
+        """
+        Write the mix to a mono 16-bit WAV
+
+        Args:
+            path (str): Output file (with raw_pcm: file, FIFO or '-' for stdout)
+            raw_pcm (bool): Write headerless s16le PCM instead of a WAV
+
+        Returns:
+            float: Seconds of audio written
+        """
+        with open_output(path, self.sample_rate, raw_pcm) as wav:
+            for pcm in self.iter_pcm():
+                wav.writeframes(pcm.astype('<i2', copy=False).tobytes())
+        return self.total_frames / self.sample_rate
+
+    def make_sound(self):
+        """
+        Build a pygame Sound of the mix for the live mixer
+
+        The mixer must already be initialized at this mixer's sample rate; the
+        mix is duplicated across however many channels it was opened with.
+
+        Returns:
+            pygame.mixer.Sound: Playable mix
+        """
+        import pygame
+
+        mixer_rate, _, channels = pygame.mixer.get_init()
+        if mixer_rate != self.sample_rate:
+            raise ValueError(f"Mixer runs at {mixer_rate}Hz but the mix was rendered at "
+                             f"{self.sample_rate}Hz")
+        pcm = np.concatenate(list(self.iter_pcm())) if self.total_frames else np.zeros(1, np.int16)
+        if channels > 1:
+            pcm = np.repeat(pcm[:, np.newaxis], channels, axis=1)
+        return pygame.sndarray.make_sound(pcm)
+
+
+def load_stations(path):
+    """
+    Read station specs from a JSON list of objects with Station's fields
+
+    Returns:
+        list: Station specs
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [Station(s['text'], s.get('wpm', 20), s.get('frequency', 600),
+                        s.get('amplitude', 0.3), s.get('offset', 0.0)) for s in json.load(f)]
+
+
+def random_stations(count, duration=60.0, seed=None):
+    """
+    Make a crowded band of random CQ callers, for benchmarking
+
+    Args:
+        count (int): Number of stations
+        duration (float): Spread of start offsets in seconds
+        seed (int): Random seed
+
+    Returns:
+        list: Station specs
+    """
+    rng = random.Random(seed)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    stations = []
+    for _ in range(count):
+        call = (rng.choice(['K', 'W', 'N', 'G', 'DL', 'JA', 'VK']) + str(rng.randint(0, 9)) +
+                ''.join(rng.choice(letters) for _ in range(rng.randint(2, 3))))
+        stations.append(Station(f"CQ CQ CQ DE {call} {call} K", rng.randint(12, 35),
+                                rng.uniform(400, 1000), rng.uniform(0.05, 0.3),
+                                rng.uniform(0, duration)))
+    return stations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mix several morse stations into one recording")
+    parser.add_argument('output', nargs='?', help="WAV file to write")
+    parser.add_argument('--pcm-out', metavar='PATH',
+                        help="Write raw s16le mono PCM to PATH (file or FIFO) or '-' for stdout")
+    parser.add_argument('--stations', help="JSON list of {text, wpm, frequency, amplitude, offset}")
+    parser.add_argument('--random', type=int, default=0, metavar='N',
+                        help="Use N random CQ callers instead of a station file")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for --random")
+    parser.add_argument('--sample-rate', type=int, default=22050, help="Sample rate (default 22050)")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Report seconds of audio mixed per second of wall time")
+    args = parser.parse_args(argv)
+    if not args.output and not args.pcm_out:
+        parser.error("give an output WAV or --pcm-out PATH")
+
+    if args.stations:
+        stations = load_stations(args.stations)
+    elif args.random:
+        stations = random_stations(args.random, seed=args.seed)
+    else:
+        parser.error("give --stations FILE or --random N")
+
+    start = time.perf_counter()
+    output = args.pcm_out or args.output
+    mixer = QRMMixer(stations, args.sample_rate)
+    try:
+        audio = mixer.write_wav(output, raw_pcm=bool(args.pcm_out))
+    except BrokenPipeError:
+        print("✗ PCM reader closed the stream")
+        return 1
+    wall = time.perf_counter() - start
+
+    print(f"✓ {len(stations)} stations, {audio:.1f}s of audio -> {output}")
+    if args.benchmark:
+        print(f"Mixed in {wall:.3f}s ({audio / wall:.0f}x real time)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,14 @@ Shared Controls Module - Common UI elements for Morse Code Simulator
 Handles morse display, text output, speed control, and control buttons
 """
 
+import json
 import tkinter as tk
 from tkinter import ttk
 
+from adaptive_timing import save_log
+from code_tables import ALPHABETS
+from fist_analysis import analyze, format_report
+
 class SharedControls:
     def __init__(self, parent, main_app):
         self.parent = parent
@@ -28,6 +33,9 @@ class SharedControls:
         
         # Control buttons
         self.setup_control_buttons()
+        
+        # Canned message sender
+        self.setup_send_text()
     
     def setup_morse_display(self):
         """Setup the morse code sequence and decoded text display"""
@@ -82,11 +90,36 @@ class SharedControls:
         self.speed_slider.set(self.main_app.wpm)
         self.speed_slider.pack(pady=5, padx=20, fill='x')
         
+        # Decoder options: track the sender's speed, Viterbi decoding (both
+        # straight key only) and dictionary correction of finished words
+        options_frame = tk.Frame(speed_frame, bg='#34495e')
+        options_frame.pack()
+        for text, variable, command in (
+                ("Follow my speed", self.main_app.adaptive_timing, self.update_timing_display),
+                ("Viterbi decoding", self.main_app.viterbi_mode, self.main_app.set_viterbi_mode),
+                ("Correct words", self.main_app.word_correction, self.main_app.set_word_correction)):
+            tk.Checkbutton(options_frame, text=text, variable=variable, command=command,
+                          font=('Courier', 9), fg='#ecf0f1', bg='#34495e', selectcolor='#2c3e50',
+                          activebackground='#34495e', takefocus=0).pack(side='left', padx=5)
+        
+        # Code table the decoder reads keyed elements with
+        self.alphabet_box = ttk.Combobox(options_frame, state='readonly', width=22,
+                                         font=('Courier', 9), takefocus=0,
+                                         values=[a['name'] for a in ALPHABETS.values()])
+        self.alphabet_box.set(ALPHABETS[self.main_app.morse_decoder.alphabet]['name'])
+        self.alphabet_box.bind('<<ComboboxSelected>>', self.select_alphabet)
+        self.alphabet_box.pack(side='left', padx=5)
+        
         # Timing info display
         self.timing_info = tk.Label(speed_frame, text=self.get_timing_info_text(),
                                    font=('Courier', 8), fg='#95a5a6', bg='#34495e', justify='center')
         self.timing_info.pack(pady=5)
         
+        # Rolling sending statistics (last 100 marks and last minute)
+        self.rolling_info = tk.Label(speed_frame, text=self.get_rolling_info_text(),
+                                    font=('Courier', 8), fg='#95a5a6', bg='#34495e', justify='center')
+        self.rolling_info.pack(pady=2)
+        
         # Status info (shows which tab is active and current state)
         self.status_info = tk.Label(speed_frame, text="Ready", font=('Courier', 9),
                                    fg='#bdc3c7', bg='#34495e')
@@ -110,6 +143,9 @@ class SharedControls:
         tk.Button(button_frame, text="Save Text", command=self.save_text,
                  font=('Courier', 10), bg='#27ae60', fg='white', padx=20).pack(side='left', padx=5)
         
+        tk.Button(button_frame, text="Fist Report", command=self.show_fist_report,
+                 font=('Courier', 10), bg='#16a085', fg='white', padx=20).pack(side='left', padx=5)
+        
         # Audio controls
         audio_frame = tk.Frame(self.shared_frame, bg='#2c3e50')
         audio_frame.pack(pady=5)
@@ -133,9 +169,66 @@ class SharedControls:
                                    highlightthickness=0, length=80, command=self.update_volume)
         self.volume_scale.set(30)  # Default 30% volume
         self.volume_scale.pack(side='left')
+        
+        # Keying envelope (raised-cosine rise/fall) selector
+        shape_frame = tk.Frame(audio_frame, bg='#2c3e50')
+        shape_frame.pack(side='left', padx=10)
+        
+        tk.Label(shape_frame, text="Shape:", font=('Courier', 8),
+                fg='#bdc3c7', bg='#2c3e50').pack(side='left')
+        
+        audio_manager = self.main_app.audio_manager
+        self.shape_options = {self.format_rise_time(t): t for t in audio_manager.RISE_TIMES}
+        self.shape_var = tk.StringVar(value=self.format_rise_time(audio_manager.rise_time))
+        shape_menu = tk.OptionMenu(shape_frame, self.shape_var, *self.shape_options,
+                                   command=self.update_shaping)
+        shape_menu.config(font=('Courier', 8), bg='#34495e', fg='white',
+                         activebackground='#9b59b6', highlightthickness=0)
+        shape_menu.pack(side='left')
+    
+    def setup_send_text(self):
+        """Setup the entry for sending a typed or canned message"""
+        send_frame = tk.Frame(self.shared_frame, bg='#2c3e50')
+        send_frame.pack(pady=5)
+        
+        tk.Label(send_frame, text="Send:", font=('Courier', 9),
+                fg='#bdc3c7', bg='#2c3e50').pack(side='left')
+        
+        self.send_entry = tk.Entry(send_frame, font=('Courier', 10), width=40,
+                                  bg='#34495e', fg='#ecf0f1', insertbackground='#ecf0f1')
+        self.send_entry.insert(0, "CQ CQ CQ DE")
+        self.send_entry.pack(side='left', padx=5)
+        self.send_entry.bind('<Return>', lambda event: self.send_text())
+        # Typing here must not reach the window-level A/B key bindings
+        self.send_entry.bindtags((self.send_entry, 'Entry', 'all'))
+        
+        tk.Button(send_frame, text="Play", command=self.send_text,
+                 font=('Courier', 9), bg='#16a085', fg='white', padx=15).pack(side='left', padx=3)
+    
+    def send_text(self):
+        """Play the message in the send entry at the current speed"""
+        text = self.send_entry.get().strip()
+        if not text:
+            return
+        seconds = self.main_app.audio_manager.play_text(text, self.main_app.wpm,
+                                                        self.main_app.morse_decoder.alphabet)
+        if seconds:
+            self.update_status(f"Sending {len(text)} characters ({seconds:.1f}s)")
+        else:
+            self.update_status("Nothing to send (audio unavailable?)")
+        # Give the keys their focus back
+        self.parent.focus_set()
+    
+    def select_alphabet(self, event=None):
+        """Switch the decoder to the alphabet picked in the box"""
+        self.main_app.set_alphabet(list(ALPHABETS)[self.alphabet_box.current()])
+        # Give the keys their focus back
+        self.parent.focus_set()
     
     def get_timing_info_text(self):
         """Generate timing information text"""
+        if self.main_app.adaptive_timing.get():
+            return self.main_app.timing.get_timing_info()
         return (f"Dot: <{self.main_app.dash_threshold:.2f}s | Dash: ≥{self.main_app.dash_threshold:.2f}s | "
                 f"Letter gap: {self.main_app.letter_gap:.2f}s | Word gap: {self.main_app.word_gap:.2f}s")
     
@@ -144,14 +237,47 @@ class SharedControls:
         if hasattr(self, 'timing_info'):
             self.timing_info.config(text=self.get_timing_info_text())
     
+    def get_rolling_info_text(self):
+        """Generate the rolling statistics text: recent fist, then the minute's trend"""
+        stats = self.main_app.morse_decoder.get_rolling_stats()
+        recent, minute = stats['recent'], stats['minute']
+        if recent['wpm'] is None:
+            return "Sending: waiting for straight-key timing"
+        parts = [f"Last {recent['elements']}: {recent['wpm']:.1f} WPM"]
+        if minute['wpm'] is not None:
+            # Slower than the minute's average means the fist is tiring
+            trend = recent['wpm'] - minute['wpm']
+            arrow = '▲' if trend > 0.5 else '▼' if trend < -0.5 else '='
+            parts[0] += f" {arrow} (60s: {minute['wpm']:.1f})"
+        if recent['dash_ratio'] is not None:
+            parts.append(f"Dah/dit {recent['dash_ratio']:.1f}")
+        if recent['gap_ratios'] is not None:
+            parts.append("Gaps " + "/".join('-' if ratio is None else f"{ratio:.1f}"
+                                            for ratio in recent['gap_ratios']))
+        if recent['cer'] is not None:
+            parts.append(f"Errors {recent['cer']:.0%}")
+        return " | ".join(parts)
+    
+    def update_rolling_display(self):
+        """Update the rolling statistics display"""
+        if hasattr(self, 'rolling_info'):
+            self.rolling_info.config(text=self.get_rolling_info_text())
+    
     def update_wpm_display(self):
         """Update the WPM display"""
         if hasattr(self, 'wpm_display'):
             self.wpm_display.config(text=f"{self.main_app.wpm} WPM")
     
     def update_morse_display(self):
-        """Update the morse sequence display"""
-        current_sequence = self.main_app.morse_decoder.get_current_sequence()
+        """Update the morse sequence display, with the live candidate letter"""
+        decoder = self.main_app.morse_decoder
+        current_sequence = decoder.get_current_sequence()
+        if current_sequence:
+            candidate = decoder.get_candidate()
+            if candidate:
+                current_sequence += f"   probably {candidate}"
+            elif not decoder.is_extendable():
+                current_sequence += "   no match"
         self.morse_display.config(text=current_sequence)
     
     def clear_morse_display(self):
@@ -163,6 +289,11 @@ class SharedControls:
         self.decoded_text += text
         self.update_text_display()
     
+    def replace_last_word(self, word):
+        """Swap the text after the last space for a corrected word"""
+        self.decoded_text = self.decoded_text[:self.decoded_text.rfind(' ') + 1] + word
+        self.update_text_display()
+    
     def update_text_display(self):
         """Update the text display with decoded text"""
         self.text_display.delete(1.0, tk.END)
@@ -198,6 +329,64 @@ class SharedControls:
             except Exception as e:
                 self.update_status(f"Error saving file: {str(e)}")
     
+    def show_fist_report(self):
+        """Analyze the session's straight-key timing and show the report in a window"""
+        decoder = self.main_app.morse_decoder
+        if not len(decoder.timing_log):
+            self.update_status("No straight-key timing yet - key something on the Straight Key tab")
+            return
+        durations, kinds = decoder.timing_log.as_arrays()
+        report = analyze(durations, kinds, decoder.alphabet)
+        
+        window = tk.Toplevel(self.parent)
+        window.title("Fist Report")
+        window.configure(bg='#2c3e50')
+        text = tk.Text(window, font=('Courier', 10), bg='#ecf0f1', fg='#2c3e50',
+                      width=84, height=24, wrap='none')
+        text.insert('1.0', format_report(report))
+        text.config(state='disabled')
+        text.pack(padx=10, pady=10, fill='both', expand=True)
+        
+        buttons = tk.Frame(window, bg='#2c3e50')
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Save JSON", command=lambda: self.save_fist_report(report),
+                 font=('Courier', 9), bg='#27ae60', fg='white', padx=15).pack(side='left', padx=3)
+        tk.Button(buttons, text="Save Timing Log", command=self.save_timing_log,
+                 font=('Courier', 9), bg='#3498db', fg='white', padx=15).pack(side='left', padx=3)
+        tk.Button(buttons, text="Close", command=window.destroy,
+                 font=('Courier', 9), bg='#e74c3c', fg='white', padx=15).pack(side='left', padx=3)
+    
+    def save_fist_report(self, report):
+        """Save a fist report as JSON"""
+        try:
+            from tkinter import filedialog
+            filename = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                title="Save Fist Report"
+            )
+            if filename:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, ensure_ascii=False, indent=1)
+                self.update_status(f"Report saved to {filename}")
+        except Exception as e:
+            self.update_status(f"Error saving report: {str(e)}")
+    
+    def save_timing_log(self):
+        """Save the session's marks and spaces as a timing log (see adaptive_timing.py)"""
+        try:
+            from tkinter import filedialog
+            filename = filedialog.asksaveasfilename(
+                defaultextension=".log",
+                filetypes=[("Timing logs", "*.log"), ("All files", "*.*")],
+                title="Save Timing Log"
+            )
+            if filename:
+                save_log(filename, self.main_app.morse_decoder.timing_log.signed_durations())
+                self.update_status(f"Timing log saved to {filename}")
+        except Exception as e:
+            self.update_status(f"Error saving timing log: {str(e)}")
+    
     def update_status(self, message):
         """Update the status information"""
         if hasattr(self, 'status_info'):
@@ -226,6 +415,7 @@ class SharedControls:
                 message = f"""Audio System: WORKING ✓
                 
 Tone Frequency: {info['frequency']} Hz
+Backend: {info.get('backend', 'unknown')}
 Sample Rate: {info.get('mixer_frequency', 'unknown')} Hz
 Format: {info.get('mixer_format', 'unknown')}
 Channels: {info.get('mixer_channels', 'unknown')}
@@ -256,6 +446,15 @@ The visual interface will still work normally."""
         except Exception as e:
             self.update_status(f"Error showing audio info: {e}")
     
+    def format_rise_time(self, rise_time):
+        """Label for a rise/fall time in the shape selector"""
+        return "Off" if rise_time <= 0 else f"{rise_time * 1000:g} ms"
+    
+    def update_shaping(self, label):
+        """Apply the selected keying envelope"""
+        self.main_app.audio_manager.set_rise_time(self.shape_options[label])
+        self.update_status(f"Keying shape: {label}")
+    
     def update_volume(self, value):
         """Update audio volume"""
         try:
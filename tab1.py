@@ -42,7 +42,7 @@ class StraightKeyTab:
         instructions = tk.Label(self.frame, 
                                text="Press and hold 'A' key to operate the straight key\n" +
                                     "Short press = DOT (.) | Long press = DASH (-)\n" +
-                                    "Timing automatically adjusts based on WPM setting",
+                                    "Timing follows your sending speed when 'Follow my speed' is on",
                                font=('Courier', 10), fg='#95a5a6', bg='#2c3e50', justify='center')
         instructions.pack(pady=20)
         
@@ -95,6 +95,7 @@ class StraightKeyTab:
         if not self.is_transmitting:
             self.is_transmitting = True
             self.key_down_time = time.time()
+            self.main_app.record_gap(self.key_down_time - self.main_app.last_release_time)
             
             # Update UI
             self.key_status.config(text="KEY DOWN", fg='#2ecc71')
@@ -116,11 +117,9 @@ class StraightKeyTab:
             # Stop playing tone
             self.main_app.audio_manager.stop_tone()
             
-            # Determine if it's a dot or dash based on WPM timing
-            if key_duration < self.main_app.dash_threshold:
-                self.main_app.add_morse_element('.')
-            else:
-                self.main_app.add_morse_element('-')
+            # Dot or dash by the adaptive estimate (or WPM timing)
+            self.main_app.record_mark(key_duration)
+            self.main_app.add_morse_element(self.main_app.classify_mark(key_duration), key_duration)
     
     def get_timing_info(self):
         """Get current timing information for display"""
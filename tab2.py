@@ -6,6 +6,11 @@ Handles iambic paddle key operation
 
 import tkinter as tk
 import time
+from gap_timer import ms_until
+
+# How often buffered keying looks again while the keyer audio runs behind its
+# expected end, in milliseconds; on time, each element needs no polling at all
+KEYER_LATE_POLL_MS = 2
 
 class PaddleKeyTab:
     def __init__(self, parent, main_app):
@@ -19,6 +24,9 @@ class PaddleKeyTab:
         self.last_paddle_element = None
         self.current_element_start = None
         
+        # Buffered keying: perf_counter() time at which the queued elements' audio should run out
+        self.buffer_end_time = 0.0
+        
         # Create the tab frame
         self.frame = tk.Frame(parent, bg='#2c3e50')
         
@@ -59,6 +67,13 @@ class PaddleKeyTab:
                                        fg='#f39c12', bg='#34495e', width=5)
         self.current_element.pack(side='left', padx=10)
         
+        # Keying mode: time elements from the audio clock or from Tk timers
+        self.buffered_keying = tk.BooleanVar(value=True)
+        tk.Checkbutton(paddle_frame, text="Sample-accurate keying (audio clock)",
+                      variable=self.buffered_keying, font=('Courier', 9),
+                      fg='#bdc3c7', bg='#34495e', selectcolor='#2c3e50',
+                      activebackground='#34495e', activeforeground='#ecf0f1').pack(pady=(0, 5))
+        
         # Instructions for paddle key
         instructions = tk.Label(self.frame, 
                                text="Press 'A' for DIT (dot) | Press 'B' for DAH (dash)\n" +
@@ -186,6 +201,10 @@ class PaddleKeyTab:
         # Add element to morse sequence
         self.main_app.add_morse_element(element)
         
+        if self.use_buffered_keying():
+            self.queue_buffered_element(element)
+            return
+        
         # Play tone for the appropriate duration
         self.main_app.audio_manager.start_tone()
         
@@ -211,19 +230,71 @@ class PaddleKeyTab:
         self.paddle_transmitting = False
         
         # Check if keys are still pressed and send appropriate element
+        next_element = self.next_paddle_element()
+        if next_element:
+            self.send_paddle_element(next_element)
+        else:
+            # No keys pressed, time the letter/word spacing from here
+            self.main_app.schedule_gaps()
+    
+    def next_paddle_element(self):
+        """
+        Decide which element the held paddles call for next
+        
+        Returns:
+            str: '.', '-' or None when no paddle is held
+        """
         if self.dit_pressed and self.dah_pressed:
             # Alternate elements when both are pressed (iambic keying)
-            if self.last_paddle_element == '.':
-                self.send_paddle_element('-')
-            else:
-                self.send_paddle_element('.')
+            return '-' if self.last_paddle_element == '.' else '.'
         elif self.dit_pressed:
-            self.send_paddle_element('.')
+            return '.'
         elif self.dah_pressed:
-            self.send_paddle_element('-')
+            return '-'
+        return None
+    
+    def use_buffered_keying(self):
+        """Check if elements should be timed by the audio clock"""
+        return self.buffered_keying.get() and self.main_app.audio_manager.audio_available
+    
+    def queue_buffered_element(self, element):
+        """Queue a pre-rendered mark+gap buffer on the keyer channel"""
+        audio_manager = self.main_app.audio_manager
+        if audio_manager.element_pending():
+            # The channel holds one waiting buffer; queueing now would replace it
+            self.main_app.root.after(self.recheck_ms(), self.queue_buffered_element, element)
+            return
+        dot_duration = self.main_app.dot_duration
+        duration = audio_manager.queue_element(element, dot_duration)
+        mark = dot_duration if element == '.' else dot_duration * 3
+        # It cannot start before the element ahead of it has played out
+        start = max(time.perf_counter(), self.buffer_end_time)
+        self.buffer_end_time = start + duration
+        # Pick the next element at the end of this mark, so it is queued
+        # while this element's gap is still playing
+        self.main_app.root.after(ms_until(start + mark), self.buffered_element_done)
+    
+    def recheck_ms(self):
+        """Milliseconds until the queued audio should have run out, or a short poll once overdue"""
+        return ms_until(self.buffer_end_time) or KEYER_LATE_POLL_MS
+    
+    def buffered_element_done(self):
+        """Mark finished: queue the next element or wait for the channel to drain"""
+        self.current_element.config(text="")
+        
+        next_element = self.next_paddle_element()
+        if next_element:
+            self.paddle_transmitting = False
+            self.send_paddle_element(next_element)
         else:
-            # No keys pressed, reset timing for letter/word spacing
-            self.main_app.last_release_time = time.time()
+            self.wait_for_drain()
+    
+    def wait_for_drain(self):
+        """Follow the channel until the last element's gap has played"""
+        if self.main_app.audio_manager.keyer_busy():
+            self.main_app.root.after(self.recheck_ms(), self.wait_for_drain)
+            return
+        self.check_paddle_continue()
     
     def is_transmitting(self):
         """Check if paddle is currently transmitting"""
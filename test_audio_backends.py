@@ -0,0 +1,52 @@
+"""Tests for the silent NullBackend's timeline rendering"""
+
+import numpy as np
+
+from audio_backends import NullBackend
+
+
+class FakeClock:
+    """Manually advanced time source"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_backend(sample_rate=8000):
+    clock = FakeClock()
+    backend = NullBackend(clock)
+    backend.open(sample_rate)
+    backend.configure(600, 0.5, 0.0)
+    return backend, clock
+
+
+def test_pcm_is_rendered_and_queues_later_elements():
+    backend, clock = open_backend()
+    pcm = np.full(8000, 1000, dtype=np.int16)
+    assert backend.play_pcm(pcm) == 1.0
+    clock.now = 0.1
+    length = backend.queue_element('.', 0.05)
+
+    # The element waits for the buffer, as keyer_busy() reports
+    assert backend.keyer_busy()
+    marks = backend.marks()
+    assert len(marks) == 1
+    assert marks[0][0] == 1.0
+
+    out = backend.render()
+    assert len(out) == 8000 + 400
+    assert np.all(out[:8000] == 1000)
+    assert np.abs(out[8000:8400]).max() > 0
+    assert length == 0.1
+
+
+def test_pcm_follows_volume_and_output_rate():
+    backend, clock = open_backend()
+    backend.set_volume(0.5)
+    backend.play_pcm(np.full(800, 1000, dtype=np.int16))
+    out = backend.render(16000)
+    assert len(out) == 1600
+    assert np.all(out == 500)
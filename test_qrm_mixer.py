@@ -0,0 +1,14 @@
+"""Tests for QRMMixer's block stream"""
+
+import numpy as np
+
+from qrm_mixer import QRMMixer, Station
+
+
+def test_kept_blocks_are_independent():
+    mixer = QRMMixer([Station('TEST', 20, 600, 0.5, 0.0)], sample_rate=8000)
+    blocks = list(mixer.iter_blocks(1024))
+    assert len(blocks) >= 2
+    assert not np.shares_memory(blocks[0], blocks[1])
+    assert not np.array_equal(blocks[0], blocks[1])
+    assert np.array_equal(np.concatenate(blocks), np.concatenate(list(mixer.iter_blocks(1024))))
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Text to WAV Module - Offline morse practice audio renderer
+Streams a text file of any size into a 16-bit WAV one word at a time.
+Runs headless: no Tk and no pygame mixer are needed.
+"""
+
+import argparse
+import sys
+import time
+import wave
+
+import numpy as np
+
+from morse_decoder import MorseDecoder
+from tone_generator import render_element, DEFAULT_AMPLITUDE
+
+# Characters read from the text file per chunk
+READ_CHUNK = 64 * 1024
+
+# RIFF sizes are 32-bit, so a WAV data chunk cannot grow past this
+WAV_MAX_DATA_BYTES = 0xFFFFFFFF - 36
+
+
+def iter_words(stream, chunk_size=READ_CHUNK):
+    """
+    Yield whitespace-separated words from a text stream without reading it all
+
+    Args:
+        stream: Text file object
+        chunk_size (int): Characters read per chunk
+
+    Yields:
+        str: One word at a time
+    """
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        words = (pending + chunk).split()
+        # The last word may continue in the next chunk unless whitespace ended this one
+        pending = '' if chunk[-1].isspace() else (words.pop() if words else '')
+        yield from words
+    if pending:
+        yield pending
+
+
+class MorseRenderer:
+    """Turns words into PCM using pre-rendered element buffers"""
+
+    def __init__(self, wpm=20, frequency=600, sample_rate=22050,
+                 amplitude=DEFAULT_AMPLITUDE, rise_time=0.005, decoder=None):
+        """
+        Args:
+            wpm (int): Sending speed, PARIS timing
+            frequency (float): Tone frequency in Hz
+            sample_rate (int): Output sample rate in Hz
+            amplitude (float): Tone level, 0.0 to 1.0
+            rise_time (float): Raised-cosine rise/fall time in seconds
+            decoder (MorseDecoder): Code table to encode with (a new one if None)
+        """
+        self.wpm = wpm
+        self.frequency = frequency
+        self.sample_rate = sample_rate
+        self.amplitude = amplitude
+        self.rise_time = rise_time
+        self.decoder = decoder or MorseDecoder()
+
+        # Same PARIS timing as MorseCodeSimulator.update_timing_from_wpm
+        self.dot_duration = 60.0 / (wpm * 50)
+        self.dot_frames = int(round(self.dot_duration * sample_rate))
+
+        # Each element buffer carries its one-dot gap; letter and word gaps are
+        # the extra silence on top of that
+        self.elements = {
+            '.': render_element(self.dot_duration, self.dot_duration, frequency, sample_rate,
+                                amplitude, channels=1, rise_time=rise_time),
+            '-': render_element(self.dot_duration * 3, self.dot_duration, frequency, sample_rate,
+                                amplitude, channels=1, rise_time=rise_time),
+        }
+        self.letter_space = np.zeros(self.dot_frames * 2, dtype=np.int16)
+        self.word_space = np.zeros(self.dot_frames * 4, dtype=np.int16)
+        self.letter_cache = {}
+
+    def render_letter(self, code):
+        """
+        PCM for one letter's code, ending with a full letter gap
+
+        Args:
+            code (str): Dot/dash sequence such as '-.-'
+
+        Returns:
+            numpy.ndarray: int16 samples
+        """
+        pcm = self.letter_cache.get(code)
+        if pcm is None:
+            parts = [self.elements[e] for e in code if e in self.elements]
+            parts.append(self.letter_space)
+            pcm = np.concatenate(parts)
+            self.letter_cache[code] = pcm
+        return pcm
+
+    def word_codes(self, word):
+        """
+        Letter codes for one word, skipping characters with no code
+
+        Args:
+            word (str): Plain-text word
+
+        Returns:
+            list: Dot/dash sequences
+        """
+        return [c for c in self.decoder.encode_text(word).split(' ')
+                if c and not c.startswith('[')]
+
+    def render_word(self, word):
+        """
+        PCM for one word, ending with a full word gap
+
+        Characters with no code are skipped.
+
+        Args:
+            word (str): Plain-text word
+
+        Returns:
+            numpy.ndarray: int16 samples, empty if nothing in the word is encodable
+        """
+        codes = self.word_codes(word)
+        if not codes:
+            return self.word_space[:0]
+        return np.concatenate([self.render_letter(c) for c in codes] + [self.word_space])
+
+    def iter_pcm(self, words):
+        """
+        Lazily render a word stream
+
+        Args:
+            words: Iterable of words
+
+        Yields:
+            numpy.ndarray: int16 samples for each word
+        """
+        for word in words:
+            pcm = self.render_word(word)
+            if len(pcm):
+                yield pcm
+
+
+def open_output(path, sample_rate, raw_pcm=False):
+    """
+    Open a mono 16-bit output for writeframes()
+
+    Args:
+        path (str): Output file; with raw_pcm also a FIFO or '-' for stdout
+        sample_rate (int): Sample rate in Hz
+        raw_pcm (bool): Headerless s16le through a PCMSink instead of a WAV
+
+    Returns:
+        Context manager with a writeframes(bytes) method
+    """
+    if raw_pcm:
+        # pcm_sink also holds the live PCMBackend, which pulls in pygame; headless
+        # renders and batch workers only load it when raw output is asked for
+        from pcm_sink import PCMSink
+        return PCMSink(path)
+    wav = wave.open(path, 'wb')
+    wav.setnchannels(1)
+    wav.setsampwidth(2)
+    wav.setframerate(sample_rate)
+    return wav
+
+
+def render_text_file(input_path, output_path, wpm=20, frequency=600, sample_rate=22050,
+                     amplitude=DEFAULT_AMPLITUDE, rise_time=0.005, impairment=None,
+                     raw_pcm=False, use_bank=False):
+    """
+    Render a text file to a mono 16-bit WAV, writing as it goes
+
+    Args:
+        input_path (str): Text file to read
+        output_path (str): WAV file to write (with raw_pcm: file, FIFO or '-')
+        wpm (int): Sending speed
+        frequency (float): Tone frequency in Hz
+        sample_rate (int): Output sample rate in Hz
+        amplitude (float): Tone level, 0.0 to 1.0
+        rise_time (float): Raised-cosine rise/fall time in seconds
+        impairment: Optional block processor (e.g. ChannelImpairment) applied
+            to each word's PCM before it is written
+        raw_pcm (bool): Write headerless s16le PCM instead of a WAV
+        use_bank (bool): Slice letters from the shared memory-mapped PCMBank
+            instead of rendering them in this process
+
+    Returns:
+        dict: words, audio_seconds, wall_seconds and realtime_factor (None if
+            no wall time was measured, so results stay valid JSON)
+    """
+    start = time.perf_counter()
+    if use_bank:
+        from pcm_bank import PCMBank  # pcm_bank imports this module
+        renderer = PCMBank(wpm, frequency, sample_rate, amplitude, rise_time)
+    else:
+        renderer = MorseRenderer(wpm, frequency, sample_rate, amplitude, rise_time)
+    words = 0
+    frames = 0
+
+    with open(input_path, 'r', encoding='utf-8', errors='replace') as text, \
+            open_output(output_path, sample_rate, raw_pcm) as wav:
+        for pcm in renderer.iter_pcm(iter_words(text)):
+            if impairment is not None:
+                pcm = impairment.process(pcm)
+            if not raw_pcm and (frames + len(pcm)) * 2 > WAV_MAX_DATA_BYTES:
+                raise ValueError("Output would exceed the 4 GB WAV limit; split the input text")
+            wav.writeframes(pcm.astype('<i2', copy=False).tobytes())
+            words += 1
+            frames += len(pcm)
+
+    wall = time.perf_counter() - start
+    audio = frames / sample_rate
+    return {
+        'words': words,
+        'audio_seconds': audio,
+        'wall_seconds': wall,
+        'realtime_factor': audio / wall if wall > 0 else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render text to morse code practice audio")
+    parser.add_argument('input', help="Text file to render")
+    parser.add_argument('output', nargs='?', help="WAV file to write")
+    parser.add_argument('--pcm-out', metavar='PATH',
+                        help="Write raw s16le mono PCM to PATH (file or FIFO) or '-' for stdout")
+    parser.add_argument('--wpm', type=int, default=20, help="Sending speed (default 20)")
+    parser.add_argument('--frequency', type=float, default=600, help="Tone in Hz (default 600)")
+    parser.add_argument('--sample-rate', type=int, default=22050, help="Sample rate (default 22050)")
+    parser.add_argument('--rise-time', type=float, default=5.0,
+                        help="Rise/fall time in ms, 0 for hard keying (default 5)")
+    parser.add_argument('--bank', action='store_true',
+                        help="Use the cached memory-mapped letter bank (see pcm_bank.py)")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Report seconds of audio rendered per second of wall time")
+    args = parser.parse_args(argv)
+    if not args.output and not args.pcm_out:
+        parser.error("give an output WAV or --pcm-out PATH")
+
+    output = args.pcm_out or args.output
+    try:
+        result = render_text_file(args.input, output, args.wpm, args.frequency,
+                                  args.sample_rate, rise_time=args.rise_time / 1000.0,
+                                  raw_pcm=bool(args.pcm_out), use_bank=args.bank)
+    except BrokenPipeError:
+        print("✗ PCM reader closed the stream")
+        return 1
+    print(f"✓ {result['words']} words, {result['audio_seconds']:.1f}s of audio -> {output}")
+    if args.benchmark and result['realtime_factor'] is not None:
+        print(f"Rendered in {result['wall_seconds']:.3f}s "
+              f"({result['realtime_factor']:.0f}x real time)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
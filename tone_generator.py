@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Tone Generator Module - NumPy sidetone synthesis
+Builds int16 sine buffers in a single vectorized expression so they can be
+handed straight to pygame.sndarray or written to a file
+"""
+
+import numpy as np
+from collections import deque
+from fractions import Fraction
+from functools import lru_cache
+
+# Same level as the original per-sample loop (wave * 0.3)
+DEFAULT_AMPLITUDE = 0.3
+INT16_MAX = 32767
+
+
+def tone_frames(duration, sample_rate):
+    """
+    Number of frames needed for a buffer of the given duration
+
+    Args:
+        duration (float): Length in seconds
+        sample_rate (int): Sample rate in Hz
+
+    Returns:
+        int: Frame count
+    """
+    return int(round(duration * sample_rate))
+
+
+def make_tone(frequency, sample_rate, amplitude=DEFAULT_AMPLITUDE, duration=0.1, channels=2):
+    """
+    Generate a sine tone as int16 PCM
+
+    Args:
+        frequency (float): Tone frequency in Hz
+        sample_rate (int): Sample rate in Hz
+        amplitude (float): Peak level, 0.0 to 1.0
+        duration (float): Length in seconds
+        channels (int): 1 for a flat mono array, 2 or more for (frames, channels)
+
+    Returns:
+        numpy.ndarray: int16 samples ready for pygame.sndarray.make_sound
+    """
+    frames = tone_frames(duration, sample_rate)
+    scale = amplitude * INT16_MAX
+    wave = (np.sin(np.arange(frames) * (2 * np.pi * frequency / sample_rate)) * scale).astype(np.int16)
+    if channels == 1:
+        return wave
+    # Duplicate across channels without another pass over the float data
+    return np.repeat(wave[:, np.newaxis], channels, axis=1)
+
+
+@lru_cache(maxsize=None)
+def envelope_kernel(rise_time, sample_rate):
+    """
+    Raised-cosine rise ramp, computed once per (rise time, sample rate)
+    
+    The fall ramp is the same kernel reversed. The array is read-only because
+    it is shared by every caller.
+
+    Args:
+        rise_time (float): Ramp length in seconds
+        sample_rate (int): Sample rate in Hz
+
+    Returns:
+        numpy.ndarray: float32 gains rising from near 0 to near 1
+    """
+    n = tone_frames(rise_time, sample_rate)
+    kernel = (0.5 - 0.5 * np.cos(np.pi * (np.arange(n) + 0.5) / max(n, 1))).astype(np.float32)
+    kernel.setflags(write=False)
+    return kernel
+
+
+def apply_envelope(samples, mark_frames, rise_time, sample_rate):
+    """
+    Shape the leading and trailing edge of a mark in place
+
+    Args:
+        samples (numpy.ndarray): int16 buffer whose first mark_frames are tone
+        mark_frames (int): Length of the keyed mark in frames
+        rise_time (float): Rise/fall time in seconds, 0 for hard keying
+        sample_rate (int): Sample rate in Hz
+
+    Returns:
+        numpy.ndarray: The same buffer, for chaining
+    """
+    if rise_time <= 0 or mark_frames <= 0:
+        return samples
+    kernel = envelope_kernel(rise_time, sample_rate)
+    # Very short marks get a shorter ramp rather than overlapping edges
+    n = min(len(kernel), mark_frames // 2)
+    if n == 0:
+        return samples
+    rise = kernel[:n] if samples.ndim == 1 else kernel[:n, np.newaxis]
+    fall = rise[::-1]
+    samples[:n] = samples[:n] * rise
+    samples[mark_frames - n:mark_frames] = samples[mark_frames - n:mark_frames] * fall
+    return samples
+
+
+def render_element(mark_duration, gap_duration, frequency, sample_rate,
+                   amplitude=DEFAULT_AMPLITUDE, channels=2, rise_time=0.0):
+    """
+    Render one keyed element: a tone mark followed by silence
+
+    Args:
+        mark_duration (float): Key-down time in seconds
+        gap_duration (float): Silence after the mark in seconds
+        frequency (float): Tone frequency in Hz
+        sample_rate (int): Sample rate in Hz
+        amplitude (float): Peak level, 0.0 to 1.0
+        channels (int): Output channel count
+        rise_time (float): Raised-cosine rise/fall time in seconds, 0 for none
+
+    Returns:
+        numpy.ndarray: int16 samples, mark then gap
+    """
+    mark_frames = int(round(mark_duration * sample_rate))
+    gap_frames = int(round(gap_duration * sample_rate))
+    mark = make_tone(frequency, sample_rate, amplitude, mark_frames / sample_rate, channels)
+    shape = (mark_frames + gap_frames,) if channels == 1 else (mark_frames + gap_frames, channels)
+    out = np.zeros(shape, dtype=np.int16)
+    out[:len(mark)] = mark
+    return apply_envelope(out, mark_frames, rise_time, sample_rate)
+
+
+def make_loop_tone(frequency, sample_rate, amplitude=DEFAULT_AMPLITUDE, duration=0.5, channels=2):
+    """
+    Steady tone that loops seamlessly: a whole number of cycles in a whole number of frames
+
+    Args:
+        frequency (float): Tone frequency in Hz
+        sample_rate (int): Sample rate in Hz
+        amplitude (float): Peak level, 0.0 to 1.0
+        duration (float): Approximate loop length in seconds
+        channels (int): Output channel count
+
+    Returns:
+        numpy.ndarray: int16 samples
+    """
+    # Shortest span where the cycle and the frame grid line up again
+    period = Fraction(sample_rate) / Fraction(frequency).limit_denominator(1000)
+    repeats = max(1, int(round(duration * sample_rate / period.numerator)))
+    return make_tone(frequency, sample_rate, amplitude, repeats * period.numerator / sample_rate,
+                     channels)
+
+
+class StreamingOscillator:
+    """
+    Phase-accumulator sine source rendered in small blocks on demand
+
+    Frequency, volume and key state are plain attributes read once per
+    block, so a change takes effect within one block with continuous phase
+    and nothing is rebuilt. Key transitions follow the raised-cosine ramp
+    sample by sample, including elements scheduled at exact sample positions.
+    Ready-made PCM buffers can be scheduled the same way and are mixed in.
+    """
+
+    def __init__(self, sample_rate, frequency=600, amplitude=DEFAULT_AMPLITUDE, rise_time=0.005):
+        """
+        Args:
+            sample_rate (int): Sample rate in Hz
+            frequency (float): Tone frequency in Hz
+            amplitude (float): Peak level, 0.0 to 1.0
+            rise_time (float): Raised-cosine rise/fall time in seconds
+        """
+        self.sample_rate = sample_rate
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.volume = 1.0
+        self.rise_time = rise_time
+        self.key_down = False
+        # Keyed marks as (first sample, end sample), appended by another thread
+        self.marks = deque()
+        # Ready-made PCM as (first sample, int16 samples), appended by another thread
+        self.buffers = deque()
+        # Next sample index to render
+        self.position = 0
+        self.phase = 0.0
+        # Steps into the envelope ramp, 0 = silent, len(ramp) - 1 = full level
+        self.ramp_position = 0
+        self.level = amplitude
+
+    def ramp(self):
+        """Envelope gains from silent to full level for the current rise time"""
+        return np.concatenate(([0.0], envelope_kernel(self.rise_time, self.sample_rate), [1.0]))
+
+    def schedule_mark(self, start, frames):
+        """
+        Key the tone for a span of samples
+
+        Args:
+            start (int): First sample (compare with position)
+            frames (int): Mark length in samples
+        """
+        self.marks.append((start, start + frames))
+
+    def schedule_pcm(self, start, samples):
+        """
+        Play a ready-made buffer from a sample position
+
+        Args:
+            start (int): First sample (compare with position)
+            samples (numpy.ndarray): int16 mono samples at this rate
+        """
+        self.buffers.append((start, samples))
+
+    def mix_buffers(self, block, start):
+        """Add the scheduled PCM overlapping the block starting at sample 'start'"""
+        end = start + len(block)
+        while self.buffers and self.buffers[0][0] + len(self.buffers[0][1]) <= start:
+            self.buffers.popleft()
+        for first, samples in list(self.buffers):
+            if first >= end:
+                break
+            low, high = max(first, start), min(first + len(samples), end)
+            block[low - start:high - start] += samples[low - first:high - first] * self.volume
+
+    def gate(self, start, frames):
+        """Key state for each sample of the block starting at sample 'start'"""
+        end = start + frames
+        gate = np.full(frames, self.key_down)
+        while self.marks and self.marks[0][1] <= start:
+            self.marks.popleft()
+        for mark_start, mark_end in list(self.marks):
+            if mark_start >= end:
+                break
+            gate[max(mark_start - start, 0):min(mark_end, end) - start] = True
+        return gate
+
+    def envelope(self, gate):
+        """
+        Per-sample envelope gains, stepping up while keyed and down while not
+
+        Returns:
+            numpy.ndarray: float gains for the block
+        """
+        ramp = self.ramp()
+        top = len(ramp) - 1
+        # Each run of equal key state is a clipped straight line through the ramp
+        edges = np.concatenate(([0], np.flatnonzero(np.diff(gate)) + 1, [len(gate)]))
+        steps = np.empty(len(gate), dtype=np.int64)
+        position = self.ramp_position
+        for first, last in zip(edges[:-1], edges[1:]):
+            direction = 1 if gate[first] else -1
+            run = np.clip(position + direction * np.arange(1, last - first + 1), 0, top)
+            steps[first:last] = run
+            position = int(run[-1])
+        self.ramp_position = position
+        return ramp[steps]
+
+    def render(self, frames):
+        """
+        Render the next block
+
+        Args:
+            frames (int): Block length in samples
+
+        Returns:
+            numpy.ndarray: int16 mono samples
+        """
+        gate = self.gate(self.position, frames)
+        envelope = self.envelope(gate)
+
+        step = 2 * np.pi * self.frequency / self.sample_rate
+        phases = self.phase + step * np.arange(frames)
+        self.phase = (self.phase + step * frames) % (2 * np.pi)
+
+        # Level changes slide across the block instead of stepping
+        target = self.amplitude * self.volume
+        level = target if target == self.level else np.linspace(self.level, target, frames)
+        self.level = target
+
+        block = np.sin(phases) * envelope * level * INT16_MAX
+        if self.buffers:
+            self.mix_buffers(block, self.position)
+            np.clip(block, -INT16_MAX, INT16_MAX, out=block)
+
+        self.position += frames
+        return block.astype(np.int16)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Viterbi Decoder Module - Most likely text for a stream of key timings
+Instead of cutting each mark and space at a hard threshold, every duration
+is scored as a log-normal around the sender's current dot/dash and gap
+lengths (from AdaptiveTiming), and Viterbi search over MorseDecoder's
+dit/dah state table picks the reading that spells valid characters. A
+borderline dash or a short letter gap is resolved by what comes after it
+instead of turning into an unknown [...] character.
+
+Decisions are committed a fixed number of elements behind the newest one,
+so latency and memory stay bounded however long the stream runs. Run this
+file directly to compare it with threshold decoding on timing logs.
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from adaptive_timing import (AdaptiveTiming, FixedTiming, load_log, synthesize_log, replay,
+                             character_error_rate)
+from morse_decoder import MorseDecoder
+
+# Elements (marks and spaces) held back before a decision is committed
+DEFAULT_LOOKBACK = 24
+
+# Spread of log(duration / expected) for marks and for spaces
+MARK_SIGMA = 0.3
+GAP_SIGMA = 0.4
+
+# Log-odds against punctuation and prosigns, which are rarer than letters
+# and digits and otherwise absorb many garbled letters
+PUNCTUATION_PRIOR = -2.5
+
+# Space kinds recorded for the state a space leads to
+GAP_ELEMENT = 0
+GAP_LETTER = 1
+GAP_WORD = 2
+
+
+class ViterbiDecoder:
+    """Streaming fixed-lag Viterbi decoder for signed mark/space durations"""
+
+    def __init__(self, decoder=None, timing=None, lookback=DEFAULT_LOOKBACK,
+                 mark_sigma=MARK_SIGMA, gap_sigma=GAP_SIGMA):
+        """
+        Args:
+            decoder (MorseDecoder): Code table (a new one if None)
+            timing (AdaptiveTiming): Speed tracker, updated by this decoder
+                (a new one at 20 WPM if None)
+            lookback (int): Elements held back before committing, None to
+                keep everything until flush()
+            mark_sigma (float): Log-duration spread of marks
+            gap_sigma (float): Log-duration spread of spaces
+        """
+        decoder = decoder or MorseDecoder()
+        self.timing = timing or AdaptiveTiming()
+        self.lookback = lookback
+        self.mark_sigma = mark_sigma
+        self.gap_sigma = gap_sigma
+
+        # The tree from build_state_table, as arrays indexed by state
+        table = np.array(decoder.next_state)
+        self.size = len(table)
+        self.chars = decoder.state_char
+        self.parent = np.full(self.size, -1)
+        self.branch = np.zeros(self.size, dtype=np.int8)
+        for element in (0, 1):
+            reached = table[:, element] >= 0
+            self.parent[table[reached, element]] = np.flatnonzero(reached)
+            self.branch[table[reached, element]] = element
+        self.children = np.flatnonzero(self.parent >= 0)
+        self.complete = np.array([char is not None for char in self.chars])
+        self.complete_states = np.flatnonzero(self.complete)
+        self.prior = np.array([0.0 if char is not None and len(char) == 1 and char.isalnum()
+                               else PUNCTUATION_PRIOR for char in self.chars])
+        self.reset()
+
+    def reset(self):
+        """Forget the stream (the speed estimate is kept)"""
+        self.score = np.full(self.size, -np.inf)
+        self.score[0] = 0.0
+        # One entry per element: None for a mark, and for a space the best
+        # (state, kind) to end a letter from, used when the path is at state 0
+        self.history = deque()
+        self.marks = 0
+
+    def log_likelihood(self, duration, means, sigma):
+        """Log-normal score of a duration against each expected length"""
+        deviation = (np.log(duration) - np.log(means)) / sigma
+        return -0.5 * deviation * deviation
+
+    def add_mark(self, duration):
+        """
+        Feed a key-down
+
+        Args:
+            duration (float): Mark length in seconds
+
+        Returns:
+            str: Text committed by this step (usually empty)
+        """
+        scores = self.log_likelihood(duration, self.timing.marks, self.mark_sigma)
+        new = np.full(self.size, -np.inf)
+        new[self.children] = (self.score[self.parent[self.children]] +
+                              scores[self.branch[self.children]])
+        self.score = new - new.max()
+        self.history.append(None)
+        self.marks += 1
+        self.timing.add_mark(duration)
+        return self.commit()
+
+    def add_space(self, duration):
+        """
+        Feed a key-up
+
+        Args:
+            duration (float): Space length in seconds
+
+        Returns:
+            str: Text committed by this step (usually empty)
+        """
+        if self.marks == 0:
+            return ''  # Silence before the first mark tells us nothing
+        scores = self.log_likelihood(duration, self.timing.gaps, self.gap_sigma)
+        # Inside a letter every state can carry on; ending a letter is only
+        # possible from states that spell a character, and leads back to 0
+        endings = self.score[self.complete_states] + self.prior[self.complete_states]
+        ending = self.complete_states[np.argmax(endings)]
+        best_end = endings.max()
+        kind = GAP_LETTER if scores[GAP_LETTER] >= scores[GAP_WORD] else GAP_WORD
+        new = self.score + scores[GAP_ELEMENT]
+        new[0] = best_end + scores[kind]
+        self.score = new - new.max()
+        self.history.append((int(ending), kind))
+        self.timing.add_gap(duration)
+        return self.commit()
+
+    def add(self, duration):
+        """Feed one signed duration (positive mark, negative space)"""
+        return self.add_mark(duration) if duration > 0 else self.add_space(-duration)
+
+    def trace(self, state, steps):
+        """
+        Walk the newest history entries back from a state
+
+        Returns:
+            list: (step index, text) for each letter ended along the path
+        """
+        letters = []
+        for index in range(len(self.history) - 1, len(self.history) - 1 - steps, -1):
+            entry = self.history[index]
+            if entry is None:
+                state = self.parent[state]
+            elif state == 0:
+                ending, kind = entry
+                letters.append((index, self.chars[ending] + (' ' if kind == GAP_WORD else '')))
+                state = ending
+        letters.reverse()
+        return letters
+
+    def commit(self):
+        """Emit the decision for the element that has fallen out of the lookback window"""
+        if self.lookback is None or len(self.history) <= self.lookback:
+            return ''
+        letters = self.trace(int(np.argmax(self.score)), len(self.history))
+        self.history.popleft()
+        return ''.join(text for index, text in letters if index == 0)
+
+    def flush(self):
+        """
+        End the stream: commit everything pending, closing the last letter
+
+        Returns:
+            str: The remaining text
+        """
+        if self.marks == 0:
+            self.reset()
+            return ''
+        endings = self.score[self.complete_states] + self.prior[self.complete_states]
+        if self.score[0] >= endings.max():
+            # The stream ended on a letter gap: nothing is left open
+            state, last = 0, ''
+        else:
+            state = self.complete_states[np.argmax(endings)]
+            last = self.chars[state]
+        letters = self.trace(state, len(self.history))
+        text = ''.join(text for index, text in letters) + last
+        self.reset()
+        return text
+
+    def decode(self, durations):
+        """
+        Decode a whole timing log
+
+        Args:
+            durations: Signed durations in seconds
+
+        Returns:
+            str: Decoded text
+        """
+        out = [self.add(duration) for duration in durations]
+        out.append(self.flush())
+        return ''.join(out)
+
+
+def hour_log(text, seconds=3600.0, seed=0):
+    """
+    Hand-sent logs of a text at varying speeds, joined to at least the given length
+
+    Returns:
+        tuple: (signed durations, total seconds)
+    """
+    rng = random.Random(seed)
+    durations = []
+    total = 0.0
+    while total < seconds:
+        part = synthesize_log(text, rng.randint(12, 30), rng.randint(12, 30),
+                              jitter=rng.uniform(0.1, 0.25), seed=rng.randrange(1 << 30))
+        durations.extend(part + [-1.0])
+        total += sum(abs(d) for d in part) + 1.0
+    return durations, total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Viterbi and threshold decoding of timing logs")
+    parser.add_argument('logs', nargs='*', help="Timing logs (ms per line, + key down, - key up)")
+    parser.add_argument('--wpm', type=int, default=20, help="Starting speed estimate (default 20)")
+    parser.add_argument('--text', help="Reference text for logs without a '# text:' line")
+    parser.add_argument('--lookback', type=int, default=DEFAULT_LOOKBACK,
+                        help=f"Elements held back before committing (default {DEFAULT_LOOKBACK})")
+    parser.add_argument('--synthesize', type=int, default=10, metavar='N',
+                        help="Generated sloppy-fist logs to add (default 10)")
+    parser.add_argument('--hour', action='store_true', help="Also time an hour-long generated log")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for path in args.logs:
+        try:
+            durations, text = load_log(path)
+        except (OSError, ValueError) as e:
+            print(f"✗ {path}: {e}")
+            return 1
+        runs.append((path, durations, text or args.text))
+    sample = "CQ CQ DE K1ABC K1ABC PSE K THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 73"
+    for n in range(args.synthesize):
+        rng = random.Random(n)
+        start, end = rng.randint(10, 30), rng.randint(10, 30)
+        durations = synthesize_log(sample, start, end, jitter=rng.uniform(0.15, 0.3),
+                                   dash_ratio=rng.uniform(2.5, 3.5), seed=n)
+        runs.append((f"synthetic {start}->{end} WPM", durations, sample))
+
+    print(f"{'log':<28} {'fixed CER':>9} {'adaptive CER':>12} {'Viterbi CER':>11}")
+    totals = np.zeros(3)
+    scored = 0
+    for name, durations, text in runs:
+        results = (replay(durations, FixedTiming(args.wpm)),
+                   replay(durations, AdaptiveTiming(args.wpm)),
+                   ViterbiDecoder(timing=AdaptiveTiming(args.wpm),
+                                  lookback=args.lookback).decode(durations))
+        if text is None:
+            print(f"{name}\n    fixed:    {results[0]}\n    adaptive: {results[1]}\n"
+                  f"    Viterbi:  {results[2]}")
+            continue
+        errors = [character_error_rate(result, text) for result in results]
+        totals += errors
+        scored += 1
+        print(f"{name:<28} {errors[0]:>9.1%} {errors[1]:>12.1%} {errors[2]:>11.1%}")
+    if scored:
+        totals /= scored
+        print(f"{'mean':<28} {totals[0]:>9.1%} {totals[1]:>12.1%} {totals[2]:>11.1%}")
+
+    if args.hour:
+        durations, seconds = hour_log(sample)
+        start = time.perf_counter()
+        decoded = ViterbiDecoder(timing=AdaptiveTiming(args.wpm), lookback=args.lookback).decode(durations)
+        elapsed = time.perf_counter() - start
+        print(f"✓ {seconds / 60:.0f} min log, {len(durations)} elements decoded in {elapsed:.2f}s "
+              f"({len(decoded)} characters)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Word Corrector Module - Fixes decoded words using a dictionary of on-air words
+One mis-timed element turns CQ into CK. At each word gap the last word is
+checked against a trie of Q-codes, abbreviations, common words and any user
+word list, plus a callsign grammar. If the word fits nothing, each letter is
+swapped for the characters whose codes are a short edit away (the same
+neighbours MorseDecoder.get_similar_sequences suggests) and the cheapest
+fitting word wins.
+
+The trie and the per-character substitution table are built once and
+pickled under ~/.cw_simulator/lexicon, keyed by the word list and the code
+table, so starting up only loads them.
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import random
+import re
+import sys
+import time
+
+from morse_decoder import MorseDecoder, edit_distance
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cw_simulator', 'lexicon')
+
+# Bumped whenever the cache layout or scoring changes
+CACHE_VERSION = 2
+
+# Built-in vocabulary, most likely first: Q-codes, operating abbreviations,
+# then common English words
+VOCABULARY = """
+CQ DE K KN R TU 73 599 5NN RST UR ES FB OM HR PSE AGN TNX TKS QTH QSL QRZ QRM QRN
+QSB QRP QRO QRS QRQ QRT QRU QRV QRX QRL QSO QSY QRG QRK QSK QST NAME OP RIG ANT PWR WX
+TEMP HW CPY GM GA GE GN CUL BURO SRI FER NR ABT ALL HI DX CONDX NW OK SIG RPT VY GUD GL
+YL XYL BK AR SK BT KN WID WKD WKG TEST CFM INFO MNI BEST 88 55 ZERO DR FM TO ON
+THE OF AND A IN IS IT YOU THAT HE WAS FOR ARE AS WITH HIS THEY I AT BE THIS HAVE FROM
+OR ONE HAD BY WORD BUT NOT WHAT WERE WE WHEN YOUR CAN SAID THERE USE AN EACH WHICH SHE
+DO HOW THEIR IF WILL UP OTHER ABOUT OUT MANY THEN THEM THESE SO SOME HER WOULD MAKE LIKE
+HIM INTO TIME HAS LOOK TWO MORE WRITE GO SEE NUMBER NO WAY COULD PEOPLE MY THAN FIRST
+WATER BEEN CALL WHO OIL ITS NOW FIND LONG DOWN DAY DID GET COME MADE MAY PART OVER NEW
+SOUND TAKE ONLY LITTLE WORK KNOW PLACE YEAR LIVE ME BACK GIVE MOST VERY AFTER THING OUR
+JUST GOOD SENTENCE MAN THINK SAY GREAT WHERE HELP THROUGH MUCH BEFORE LINE RIGHT TOO MEAN
+OLD ANY SAME TELL BOY FOLLOW CAME WANT SHOW ALSO AROUND FORM THREE SMALL SET PUT END DOES
+ANOTHER WELL LARGE MUST BIG EVEN SUCH BECAUSE TURN HERE WHY ASK WENT MEN READ NEED LAND
+DIFFERENT HOME US MOVE TRY KIND HAND PICTURE AGAIN CHANGE OFF PLAY SPELL AIR AWAY ANIMAL
+HOUSE POINT PAGE LETTER MOTHER ANSWER FOUND STUDY STILL LEARN SHOULD AMERICA WORLD QUICK
+BROWN FOX JUMPS LAZY DOG RADIO HAM STATION SIGNAL REPORT POWER ANTENNA WEATHER THANKS
+"""
+
+# Callsign grammar over letter/digit classes: optional digit, one or two
+# letters, a digit, then one to four letters. Each entry maps a class to
+# the next state; states in CALLSIGN_ACCEPT end a valid callsign.
+CALLSIGN_STATES = (
+    {'D': 1, 'L': 2},  # 0: start
+    {'L': 2},          # 1: after a leading digit
+    {'L': 3, 'D': 4},  # 2: one prefix letter
+    {'D': 4},          # 3: two prefix letters
+    {'L': 5},          # 4: area digit
+    {'L': 6},          # 5: one suffix letter
+    {'L': 7},          # 6: two suffix letters
+    {'L': 8},          # 7: three suffix letters
+    {},                # 8: four suffix letters
+)
+CALLSIGN_ACCEPT = frozenset((5, 6, 7, 8))
+
+# Alternatives considered per letter
+NEIGHBOURS = 12
+
+# Most element edits a correction may cost, by word length
+MAX_COST_SHORT = 1
+MAX_COST = 2
+
+# Decoded letters and [unknown] sequences, as MorseDecoder writes them
+TOKEN_PATTERN = re.compile(r'\[([.-]+)\]|(.)')
+
+
+def char_class(char):
+    """'D' for a digit, 'L' for a letter, None for anything else"""
+    if char.isdigit():
+        return 'D'
+    return 'L' if char.isalpha() and len(char) == 1 else None
+
+
+class WordCorrector:
+    """Dictionary trie plus callsign grammar, searched over per-letter alternatives"""
+
+    def __init__(self, decoder=None, word_file=None, cache_dir=CACHE_DIR):
+        """
+        Loads the cached trie for this word list and code table, building it first if needed.
+
+        Args:
+            decoder (MorseDecoder): Code table (a new one if None)
+            word_file (str): Extra words, whitespace separated, most likely first
+            cache_dir (str): Directory holding cache files
+        """
+        self.decoder = decoder or MorseDecoder()
+        words = VOCABULARY.split()
+        if word_file:
+            with open(word_file, 'r', encoding='utf-8') as f:
+                words += f.read().upper().split()
+        codes = sorted(self.decoder.morse_dict.items())
+        key = hashlib.sha1(repr((words, codes)).encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"v{CACHE_VERSION}_{key}.pickle")
+
+        self.built = False
+        tables = self.load()
+        if tables is None:
+            tables = self.build(words)
+            self.save(tables)
+            self.built = True
+        self.trie = tables['trie']
+        self.alternatives = tables['alternatives']
+
+    def build(self, words):
+        """
+        Compile the word trie and the substitution table
+
+        Returns:
+            dict: 'version' (CACHE_VERSION), 'trie' (nested dicts, '' maps to a
+                word's rank) and 'alternatives' (char -> [(char, cost)], cheapest first)
+        """
+        trie = {}
+        for rank, word in enumerate(words):
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node.setdefault('', rank)
+        alternatives = {}
+        for code, char in self.decoder.morse_dict.items():
+            if len(char) == 1:
+                alternatives[char] = self.neighbours(code)
+        return {'version': CACHE_VERSION, 'trie': trie, 'alternatives': alternatives}
+
+    def load(self):
+        """
+        Read the cached tables
+
+        Returns:
+            dict: The tables, or None if the cache is missing, unreadable or
+                written by another version
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                tables = pickle.load(f)
+        except Exception:  # Truncated or stale pickles fail in many ways; all mean rebuild
+            return None
+        if not isinstance(tables, dict) or tables.get('version') != CACHE_VERSION:
+            return None
+        return tables
+
+    def save(self, tables):
+        """Write the tables to the cache, whole or not at all"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as f:
+                pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"✗ Could not cache word tables: {e}")
+
+    def neighbours(self, sequence):
+        """
+        Characters a sent sequence might have been meant as
+
+        Returns:
+            list: (char, cost) pairs, cost being the element edit distance
+        """
+        found = self.decoder.get_similar_sequences(sequence, max_suggestions=NEIGHBOURS)
+        return [(char, edit_distance(code, sequence)) for code, char in found if len(char) == 1]
+
+    def options(self, word):
+        """
+        Per-letter alternatives for a decoded word
+
+        Returns:
+            list: One list of (char, cost) per letter, or None if the word
+                holds something that cannot be corrected
+        """
+        options = []
+        for match in TOKEN_PATTERN.finditer(word):
+            unknown, char = match.groups()
+            if unknown is not None:
+                choices = self.neighbours(unknown)
+            else:
+                choices = self.alternatives.get(char)
+            if not choices:
+                return None
+            options.append(choices)
+        return options
+
+    def correct(self, word):
+        """
+        Best dictionary word or callsign for a decoded word
+
+        Args:
+            word (str): Decoded word, possibly holding [..-..] unknowns
+
+        Returns:
+            str: The correction, or the word unchanged if it already fits or
+                nothing fits within the edit budget
+        """
+        options = self.options(word.upper())
+        if not options or len(options) < 2:
+            return word
+        budget = MAX_COST_SHORT if len(options) <= 3 else MAX_COST
+        # (cost, callsign?, rank, text); the tuple order is the preference
+        best = [(budget + 1, 1, 0, word)]
+        last = len(options)
+
+        def walk(position, node, call_state, cost, chars):
+            if position == last:
+                if node is not None and '' in node:
+                    candidate = (cost, 0, node[''], ''.join(chars))
+                elif call_state in CALLSIGN_ACCEPT:
+                    candidate = (cost, 1, 0, ''.join(chars))
+                else:
+                    return
+                if candidate < best[0]:
+                    best[0] = candidate
+                return
+            for char, step in options[position]:
+                total = cost + step
+                if total > budget or total > best[0][0]:
+                    break  # Alternatives are cheapest first
+                child = node.get(char) if node is not None else None
+                call_next = None
+                if call_state is not None:
+                    call_next = CALLSIGN_STATES[call_state].get(char_class(char))
+                if child is None and call_next is None:
+                    continue
+                chars.append(char)
+                walk(position + 1, child, call_next, total, chars)
+                chars.pop()
+
+        walk(0, self.trie, 0, 0, [])
+        return best[0][3]
+
+
+def corrupt(word, decoder, rng):
+    """The word with one element of one letter flipped, as a sloppy fist sends it"""
+    codes = [decoder.letter_dict[char] for char in word]
+    index = rng.randrange(len(codes))
+    code = list(codes[index])
+    flip = rng.randrange(len(code))
+    code[flip] = '-' if code[flip] == '.' else '.'
+    code = ''.join(code)
+    return ''.join(decoder.morse_dict.get(c, f'[{c}]') if i == index else word[i]
+                   for i, c in enumerate(codes[:index] + [code] + codes[index + 1:]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Correct decoded words against on-air vocabulary")
+    parser.add_argument('words', nargs='*', help="Decoded words to correct, e.g. CK '[..-..]EL'")
+    parser.add_argument('--word-list', help="Extra vocabulary file")
+    parser.add_argument('--benchmark', type=int, default=0, metavar='N',
+                        help="Correct N words with one flipped element and report accuracy/time")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        corrector = WordCorrector(word_file=args.word_list)
+    except OSError as e:
+        print(f"✗ {e}")
+        return 1
+    print(f"{'✓ Built' if corrector.built else '✓ Loaded'} {corrector.path} "
+          f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for word in args.words:
+        print(f"{word} -> {corrector.correct(word)}")
+
+    if args.benchmark:
+        rng = random.Random(1)
+        decoder = corrector.decoder
+        vocabulary = [w for w in VOCABULARY.split() if len(w) >= 2]
+        fixed = unchanged = 0
+        elapsed = 0.0
+        for _ in range(args.benchmark):
+            word = rng.choice(vocabulary)
+            sent = corrupt(word, decoder, rng)
+            start = time.perf_counter()
+            result = corrector.correct(sent)
+            elapsed += time.perf_counter() - start
+            fixed += result == word
+            unchanged += result == sent
+        print(f"✓ {args.benchmark} corrupted words: {fixed / args.benchmark:.1%} restored, "
+              f"{unchanged / args.benchmark:.1%} left as sent, "
+              f"{elapsed / args.benchmark * 1e6:.0f}µs per word")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())